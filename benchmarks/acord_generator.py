@@ -0,0 +1,493 @@
+"""
+Synthetic ACORD 125/140 packet generator for load testing the parser.
+
+    python -m benchmarks.acord_generator corpus/ --files 200 --pages 30 --noise 0.5
+    python -m benchmarks.acord_generator corpus/ --files 20 --verify
+    python -m benchmarks.acord_generator corpus/ --files 50 --fillable 0.8 --verify
+
+Writes valid PDFs with only the standard library (no network, no reportlab).
+Each packet has an ACORD 125 page (NAMED INSURED, EFFECTIVE DATE), an ACORD 140
+page (CONSTRUCTION, YEAR BUILT, NO. OF STORIES, TOTAL INSURABLE VALUE) and filler
+pages (appraisal, loss runs, SOV, financials). Layout noise varies label spellings,
+separators, spacing, positions, fonts, form-id placement, page order and can add
+decoy labels on filler pages. --fillable makes a share of packets fillable forms:
+their ACORD pages carry only the labels as text and the values in AcroForm
+fields, named the way ACORD's fillable forms name them. Every PDF gets a sidecar
+<name>.json holding the ground truth, in the same shape AcordParser.extract_fields
+returns.
+--verify parses the corpus afterwards and reports per-field accuracy.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import zlib
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import CONSTRUCTION_TYPES
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+FONTS = {"F1": "Helvetica", "F2": "Courier", "F3": "Times-Roman"}
+
+# (x, y, font, size, text)
+TextRun = Tuple[float, float, str, float, str]
+# (name, value, (x0, y0, x1, y1)); a value starting with "/" is written as a name (checkbox state)
+FormField = Tuple[str, str, Tuple[float, float, float, float]]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class PdfWriter:
+    """
+    Minimal PDF 1.4 writer: text pages with the standard Type 1 fonts, optionally
+    with AcroForm widget fields. With form_parent set, every field is nested under
+    one parent field of that name, as form designers such as LiveCycle write them.
+    """
+
+    def __init__(self, compress: bool = False, form_parent: Optional[str] = None):
+        self.compress = compress
+        self.form_parent = form_parent
+        self._pages: List[bytes] = []
+        self._fields: List[List[FormField]] = []
+
+    def add_page(self, runs: Sequence[TextRun], fields: Sequence[FormField] = ()) -> None:
+        ops = [
+            f"BT /{font} {size:g} Tf 1 0 0 1 {x:.2f} {y:.2f} Tm ({_escape(text)}) Tj ET"
+            for x, y, font, size, text in runs
+        ]
+        self._pages.append("\n".join(ops).encode("latin-1", "replace"))
+        self._fields.append(list(fields))
+
+    @staticmethod
+    def _field_object(name: str, value: str, rect, page_id: int, parent_id: Optional[int]) -> bytes:
+        if value.startswith("/"):
+            kind, value_entry = "/Btn", f"/V {value} /AS {value}"
+        else:
+            kind, value_entry = "/Tx", f"/V ({_escape(value)})"
+        parent = f" /Parent {parent_id} 0 R" if parent_id else ""
+        return (
+            f"<< /Type /Annot /Subtype /Widget /FT {kind} /T ({_escape(name)}) {value_entry} "
+            f"/Rect [{' '.join(f'{v:.2f}' for v in rect)}] /P {page_id} 0 R /F 4 /DA (/F1 9 Tf 0 g){parent} >>"
+        ).encode("latin-1", "replace")
+
+    def add_lines(self, lines: Sequence[str], font: str = "F1", size: float = 10) -> None:
+        """Lines top to bottom from the upper-left margin"""
+        self.add_page([(50, 750 - 14 * i, font, size, line) for i, line in enumerate(lines)])
+
+    def to_bytes(self) -> bytes:
+        font_ids = {name: 3 + i for i, name in enumerate(FONTS)}
+        objects: List[bytes] = [b"", b""]
+        objects += [
+            f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} >>".encode() for base in FONTS.values()
+        ]
+        resources = " ".join(f"/{name} {font_ids[name]} 0 R" for name in FONTS)
+        has_fields = any(self._fields)
+        parent_id = None
+        if has_fields and self.form_parent:
+            objects.append(b"")
+            parent_id = len(objects)
+        kids = []
+        field_ids = []
+        for content, fields in zip(self._pages, self._fields):
+            page_id = len(objects) + 1
+            kids.append(f"{page_id} 0 R")
+            annot_ids = list(range(page_id + 2, page_id + 2 + len(fields)))
+            annots = f" /Annots [{' '.join(f'{i} 0 R' for i in annot_ids)}]" if fields else ""
+            objects.append(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << {resources} >> >> /Contents {page_id + 1} 0 R{annots} >>".encode()
+            )
+            if self.compress:
+                content = zlib.compress(content)
+                header = f"<< /Length {len(content)} /Filter /FlateDecode >>"
+            else:
+                header = f"<< /Length {len(content)} >>"
+            objects.append(header.encode() + b"\nstream\n" + content + b"\nendstream")
+            for name, value, rect in fields:
+                objects.append(self._field_object(name, value, rect, page_id, parent_id))
+            field_ids += annot_ids
+        objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+        catalog = "<< /Type /Catalog /Pages 2 0 R"
+        if has_fields:
+            refs = " ".join(f"{i} 0 R" for i in field_ids)
+            if parent_id:
+                objects[parent_id - 1] = f"<< /T ({_escape(self.form_parent)}) /Kids [{refs}] >>".encode()
+                refs = f"{parent_id} 0 R"
+            catalog += f" /AcroForm << /Fields [{refs}] /DA (/F1 9 Tf 0 g) /NeedAppearances true >>"
+        objects[0] = (catalog + " >>").encode()
+
+        data = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(data))
+            data += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref = len(data)
+        data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            data += f"{offset:010d} 00000 n \n".encode()
+        data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(data)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+def write_text_pdf(path: str, pages: Sequence[Sequence[str]]) -> None:
+    """Write a PDF with one Helvetica text line per entry on each page"""
+    writer = PdfWriter()
+    for lines in pages:
+        writer.add_lines(lines)
+    writer.save(path)
+
+
+@dataclass
+class PacketSpec:
+    """Ground truth for one generated packet"""
+    association_name: str
+    effective_date: date
+    construction_type: str
+    year_built: int
+    stories: int
+    tiv: float
+    fillable: bool = False
+    pages: int = 0
+    acord_pages: Dict[int, str] = field(default_factory=dict)
+    decoy_pages: List[int] = field(default_factory=list)
+
+    def expected_fields(self) -> Dict:
+        """The fields as AcordParser.extract_fields should return them"""
+        return {
+            "association_name": self.association_name,
+            "effective_date": self.effective_date,
+            "construction_type": self.construction_type.upper(),
+            "year_built": self.year_built,
+            "stories": self.stories,
+            "tiv": self.tiv,
+        }
+
+    def to_json(self) -> Dict:
+        data = asdict(self)
+        data["effective_date"] = self.effective_date.isoformat()
+        data["acord_pages"] = {str(page): form for page, form in self.acord_pages.items()}
+        return data
+
+
+_NAME_PARTS = (
+    ["Palm", "Harbor", "Bay", "Ocean", "Coral", "Gulf", "Royal", "Sun", "Pine", "Lake", "River", "Vista",
+     "Sand", "Island", "Key", "Heron", "Pelican", "Mariner", "Seagrape", "Tarpon"],
+    ["Shores", "Point", "Towers", "Villas", "Club", "Landing", "Place", "Pointe", "Cove", "Terrace",
+     "Gardens", "Court", "Isle", "Bluff", "Commons"],
+    ["Condominium Association, Inc.", "Condominium Association", "Homeowners Association, Inc.",
+     "Association, Inc.", "Condo Association", "Owners Association"],
+)
+
+# Label spellings the parser is expected to accept, per field
+LABEL_VARIANTS = {
+    "construction_type": ["CONSTRUCTION TYPE", "CONSTRUCTION", "Construction Type"],
+    "year_built": ["YEAR BUILT", "Year Built", "YEAR  BUILT"],
+    "stories": ["NO. OF STORIES", "NUMBER OF STORIES", "NO. STORIES", "# OF STORIES"],
+    "tiv": ["TOTAL INSURABLE VALUE", "TOTAL VALUE", "Total Insurable Value"],
+}
+
+# AcroForm field names on fillable ACORD 125/140 pages
+FORM_FIELD_NAMES = {
+    "association_name": "NamedInsured_FullName_A",
+    "effective_date": "Policy_EffectiveDate_A",
+    "construction_type": "Construction_BuildingConstructionCode_A",
+    "year_built": "Construction_BuildingYearBuilt_A",
+    "stories": "Construction_StoreyCount_A",
+    "tiv": "CommercialProperty_Premises_TotalInsurableValueAmount_A",
+}
+
+_FILLER_KINDS = ("appraisal", "loss_runs", "sov", "financials", "narrative")
+_LOREM = (
+    "Lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua Ut enim ad minim veniam quis nostrud exercitation ullamco laboris nisi"
+).split()
+
+
+class AcordPacketGenerator:
+    """
+    Deterministic generator: the same seed and settings give byte-identical files
+    on a given day (effective dates are relative to today).
+    noise (0-1) is the probability each layout variation is applied.
+    """
+
+    def __init__(self, seed: int = 0, noise: float = 0.3, compress: bool = False, decoys: bool = False,
+                 fillable: float = 0.0):
+        self.rng = random.Random(seed)
+        self.noise = noise
+        self.compress = compress
+        self.decoys = decoys
+        self.fillable = fillable
+
+    def _noisy(self) -> bool:
+        return self.rng.random() < self.noise
+
+    def random_spec(self) -> PacketSpec:
+        rng = self.rng
+        name = " ".join(rng.choice(part) for part in _NAME_PARTS)
+        return PacketSpec(
+            association_name=name,
+            effective_date=date.today() + timedelta(days=rng.randint(1, 120)),
+            construction_type=rng.choice(CONSTRUCTION_TYPES),
+            year_built=rng.randint(1950, date.today().year),
+            stories=rng.randint(1, 30),
+            tiv=float(rng.randint(1, 400) * 250_000),
+        )
+
+    # -- page builders ------------------------------------------------------------
+
+    def _label(self, field_name: str) -> str:
+        variants = LABEL_VARIANTS[field_name]
+        return self.rng.choice(variants) if self._noisy() else variants[0]
+
+    def _separator(self) -> str:
+        return self.rng.choice([": ", ":", " ", "   ", " : "]) if self._noisy() else " "
+
+    def _form_id_runs(self, form: str, title: str) -> List[TextRun]:
+        """Form number/title in the header strip, the footer strip or both"""
+        header = (50, 760, "F1", 12, f"ACORD {form} {title}")
+        footer = (50, 30, "F1", 7, f"ACORD {form} (2016/03)  The ACORD name and logo are registered marks of ACORD")
+        if not self._noisy():
+            return [header, footer]
+        return [self.rng.choice([header, footer, (50, 775, "F1", 9, title)])]
+
+    def _field_runs(self, lines: List[str], top: float) -> List[TextRun]:
+        runs = []
+        y = top
+        x = 50.0
+        font, size = "F1", 9.0
+        for line in lines:
+            if self._noisy():
+                x = 50 + self.rng.uniform(-10, 40)
+                font = self.rng.choice(list(FONTS))
+                size = self.rng.choice([8, 9, 10, 11])
+            runs.append((x, y, font, size, line))
+            y -= self.rng.choice([16, 18, 22, 30]) if self._noisy() else 18
+        return runs
+
+    def _acord_125(self, spec: PacketSpec) -> List[TextRun]:
+        date_sep = "-" if self._noisy() and self.rng.random() < 0.5 else "/"
+        effective = spec.effective_date.strftime(f"%m{date_sep}%d{date_sep}%Y")
+        lines = [
+            f"AGENCY  {self.rng.choice(['Acme Insurance Partners', 'Coastal Risk Advisors'])}",
+            f"NAMED INSURED{self.rng.choice([' ', '  ', '   ']) if self._noisy() else ' '}{spec.association_name}",
+            f"MAILING ADDRESS  {self.rng.randint(100, 9999)} Gulf Blvd",
+            f"EFFECTIVE DATE {effective}",
+            f"FEIN  {self.rng.randint(10, 99)}-{self.rng.randint(1000000, 9999999)}",
+            "LINES OF BUSINESS  PROPERTY  GENERAL LIABILITY",
+        ]
+        if self._noisy():
+            self.rng.shuffle(lines)
+        return self._form_id_runs("125", "COMMERCIAL INSURANCE APPLICATION") + self._field_runs(lines, 700)
+
+    def _acord_140(self, spec: PacketSpec) -> List[TextRun]:
+        tiv = f"{spec.tiv:,.0f}"
+        if self._noisy():
+            tiv = self.rng.choice([f"${tiv}", f"$ {tiv}", tiv])
+        lines = [
+            "PREMISES #: 1  BUILDING #: 1",
+            f"{self._label('construction_type')}{self._separator()}{spec.construction_type}",
+            f"{self._label('year_built')}{self._separator()}{spec.year_built}",
+            f"{self._label('stories')}{self._separator()}{spec.stories}",
+            f"{self._label('tiv')}{self._separator()}{tiv}",
+            "ROOF TYPE  SHINGLE",
+        ]
+        if self._noisy():
+            self.rng.shuffle(lines)
+        return self._form_id_runs("140", "PROPERTY SECTION") + self._field_runs(lines, 700)
+
+    def _form_name(self, name: str) -> str:
+        # Designer-built forms index every field name, e.g. "NamedInsured_FullName_A[0]"
+        return f"{name}[0]" if self._noisy() else name
+
+    def _fillable_page(self, form: str, title: str, rows: List[Tuple[str, str, str]]) -> Tuple[List[TextRun], List[FormField]]:
+        """Labels as page text and values as form fields; rows are (label, field name, value)"""
+        runs = self._form_id_runs(form, title)
+        fields: List[FormField] = []
+        for i, (label, name, value) in enumerate(rows):
+            y = 700 - 24 * i
+            runs.append((50, y, "F1", 8, label))
+            fields.append((self._form_name(name), value, (220, y - 4, 560, y + 12)))
+        return runs, fields
+
+    def _fillable_125(self, spec: PacketSpec) -> Tuple[List[TextRun], List[FormField]]:
+        return self._fillable_page("125", "COMMERCIAL INSURANCE APPLICATION", [
+            ("AGENCY", "Producer_FullName_A", self.rng.choice(["Acme Insurance Partners", "Coastal Risk Advisors"])),
+            ("NAMED INSURED", FORM_FIELD_NAMES["association_name"], spec.association_name),
+            ("MAILING ADDRESS", "NamedInsured_MailingAddress_LineOne_A", f"{self.rng.randint(100, 9999)} Gulf Blvd"),
+            ("EFFECTIVE DATE", FORM_FIELD_NAMES["effective_date"], spec.effective_date.strftime("%m/%d/%Y")),
+            ("PROPERTY", "LineOfBusiness_CommercialProperty_A", "/Yes"),
+            ("GENERAL LIABILITY", "LineOfBusiness_GeneralLiability_A", "/Off"),
+        ])
+
+    def _fillable_140(self, spec: PacketSpec) -> Tuple[List[TextRun], List[FormField]]:
+        tiv = f"{spec.tiv:,.0f}"
+        if self._noisy():
+            tiv = self.rng.choice([f"${tiv}", f"$ {tiv}"])
+        return self._fillable_page("140", "PROPERTY SECTION", [
+            ("PREMISES #", "CommercialProperty_Premises_LocationProducerIdentifier_A", "1"),
+            ("CONSTRUCTION TYPE", FORM_FIELD_NAMES["construction_type"], spec.construction_type),
+            ("YEAR BUILT", FORM_FIELD_NAMES["year_built"], str(spec.year_built)),
+            ("NO. OF STORIES", FORM_FIELD_NAMES["stories"], str(spec.stories)),
+            ("TOTAL INSURABLE VALUE", FORM_FIELD_NAMES["tiv"], tiv),
+            ("ROOF TYPE", "Construction_RoofMaterialCode_A", "SHINGLE"),
+        ])
+
+    def _filler(self, kind: str, decoy: bool) -> List[TextRun]:
+        rng = self.rng
+        if kind == "appraisal":
+            lines = ["APPRAISAL REPORT", "Replacement cost valuation of the subject property"]
+        elif kind == "loss_runs":
+            lines = ["LOSS RUN REPORT"] + [
+                f"{2015 + i}-{2016 + i}   Claims: {rng.randint(0, 3)}   Incurred: ${rng.randint(0, 250000):,}"
+                for i in range(8)
+            ]
+        elif kind == "sov":
+            lines = ["STATEMENT OF VALUES", "BLDG  ADDRESS                 SQ FT     VALUE"] + [
+                f"{i + 1:<5} {rng.randint(100, 9999)} Ocean Dr          {rng.randint(5000, 90000):<9} "
+                f"${rng.randint(1, 40) * 250000:,}"
+                for i in range(20)
+            ]
+        elif kind == "financials":
+            lines = ["BALANCE SHEET"] + [
+                f"{rng.choice(['Operating fund', 'Reserve fund', 'Receivables', 'Payables'])}   "
+                f"${rng.randint(1000, 900000):,}"
+                for _ in range(15)
+            ]
+        else:
+            lines = [" ".join(rng.choice(_LOREM) for _ in range(12)) for _ in range(30)]
+        if decoy:
+            # Label-like text a naive full-document scan would pick up
+            lines.insert(1, f"YEAR BUILT {rng.randint(1900, 1949)}  NO. OF STORIES {rng.randint(31, 60)}")
+        return [(50, 750 - 14 * i, "F1", 9, line) for i, line in enumerate(lines)]
+
+    # -- packets --------------------------------------------------------------------
+
+    def packet(self, pages: int, spec: Optional[PacketSpec] = None) -> Tuple[bytes, PacketSpec]:
+        """Render one packet of at least two pages; returns the PDF bytes and its ground truth"""
+        spec = spec or self.random_spec()
+        pages = max(pages, 2)
+        # Only drawn when enabled, so corpora without fillable forms are unchanged
+        spec.fillable = self.fillable > 0 and self.rng.random() < self.fillable
+
+        # ACORD pages first by default; with noise they can land anywhere in the packet
+        if self._noisy():
+            slots = sorted(self.rng.sample(range(pages), 2))
+        else:
+            slots = [0, 1]
+        form_parent = "form1[0]" if spec.fillable and self._noisy() else None
+        writer = PdfWriter(compress=self.compress, form_parent=form_parent)
+        spec.pages = pages
+        spec.acord_pages = {}
+        spec.decoy_pages = []
+        if spec.fillable:
+            acord = iter([("125", self._fillable_125), ("140", self._fillable_140)])
+        else:
+            acord = iter([("125", self._acord_125), ("140", self._acord_140)])
+        for index in range(pages):
+            number = index + 1
+            if index in slots:
+                form, build = next(acord)
+                spec.acord_pages[number] = form
+                page = build(spec)
+                if spec.fillable:
+                    writer.add_page(*page)
+                else:
+                    writer.add_page(page)
+            else:
+                decoy = self.decoys and self.rng.random() < 0.3
+                if decoy:
+                    spec.decoy_pages.append(number)
+                writer.add_page(self._filler(self.rng.choice(_FILLER_KINDS), decoy))
+        return writer.to_bytes(), spec
+
+    def write_corpus(self, directory: str, files: int, pages: int, page_jitter: int = 0) -> List[str]:
+        """Write files packets plus ground-truth sidecars; returns the PDF paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for i in range(files):
+            count = pages + (self.rng.randint(-page_jitter, page_jitter) if page_jitter else 0)
+            data, spec = self.packet(count)
+            path = os.path.join(directory, f"acord_{i:05d}.pdf")
+            with open(path, "wb") as f:
+                f.write(data)
+            with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+                json.dump(spec.to_json(), f, indent=2)
+            paths.append(path)
+        return paths
+
+
+def load_expected(pdf_path: str) -> Dict:
+    """Ground-truth fields for a generated PDF, from its sidecar manifest"""
+    with open(os.path.splitext(pdf_path)[0] + ".json", encoding="utf-8") as f:
+        data = json.load(f)
+    data["effective_date"] = date.fromisoformat(data["effective_date"])
+    spec = PacketSpec(**{
+        k: v for k, v in data.items() if k not in ("pages", "acord_pages", "decoy_pages", "fillable")
+    })
+    return spec.expected_fields()
+
+
+def verify(paths: Sequence[str], parse_paths: Optional[Dict[str, int]] = None) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse each file and compare with its manifest; returns field -> (correct, total).
+    parse_paths, if given, is filled with how many files were read each way.
+    """
+    from utils.acord_parser import AcordParser
+
+    scores: Dict[str, List[int]] = {}
+    for path in paths:
+        expected = load_expected(path)
+        parser = AcordParser(path)
+        try:
+            actual = parser.extract_fields()
+        except ValueError:
+            actual = {}
+        if parse_paths is not None:
+            parse_paths[parser.parse_path] = parse_paths.get(parser.parse_path, 0) + 1
+        for name, value in expected.items():
+            correct, total = scores.setdefault(name, [0, 0])
+            scores[name] = [correct + (actual.get(name) == value), total + 1]
+    return {name: (correct, total) for name, (correct, total) in scores.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="Output directory")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20, help="Pages per packet, including the two ACORD pages")
+    parser.add_argument("--page-jitter", type=int, default=0, help="Vary page counts by up to +/- this many")
+    parser.add_argument("--noise", type=float, default=0.3, help="Probability of each layout variation (0-1)")
+    parser.add_argument("--decoys", action="store_true", help="Put label-like text on some filler pages")
+    parser.add_argument("--compress", action="store_true", help="Flate-compress page content streams")
+    parser.add_argument("--fillable", type=float, default=0.0, help="Share of packets that are fillable forms (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true", help="Parse the corpus and report field accuracy")
+    args = parser.parse_args(argv)
+
+    generator = AcordPacketGenerator(args.seed, args.noise, args.compress, args.decoys, args.fillable)
+    paths = generator.write_corpus(args.directory, args.files, args.pages, args.page_jitter)
+    print(f"Wrote {len(paths)} packets to {args.directory}")
+
+    if args.verify:
+        parse_paths: Dict[str, int] = {}
+        scores = verify(paths, parse_paths)
+        for name, (correct, total) in scores.items():
+            print(f"{name:<18} {correct}/{total} ({correct / total:.0%})")
+        print("parse paths: " + ", ".join(f"{path} {count}" for path, count in sorted(parse_paths.items())))
+        if any(correct != total for correct, total in scores.values()):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
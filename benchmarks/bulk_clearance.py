@@ -0,0 +1,48 @@
+"""
+Benchmark the vectorized bulk clearance engine against PropertySubmission.validate.
+
+    python -m benchmarks.bulk_clearance --rows 50000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.fixtures import synthetic_submission_records
+from models import PropertySubmission
+from utils.bulk_clearance import clear_submissions, reasons_from_matrix
+
+
+def synthetic_submissions(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Deterministic random submissions covering every rule"""
+    return pd.DataFrame.from_records(synthetic_submission_records(rows, seed))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = synthetic_submissions(args.rows, args.seed)
+
+    start = time.perf_counter()
+    scalar = [PropertySubmission(**record).validate() for record in df.to_dict("records")]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = clear_submissions(df)
+    vector_seconds = time.perf_counter() - start
+
+    if reasons_from_matrix(result) != scalar:
+        raise SystemExit("Vectorized results differ from PropertySubmission.validate")
+
+    print(f"rows:       {args.rows}")
+    print(f"scalar:     {scalar_seconds:.3f}s ({args.rows / scalar_seconds:,.0f} rows/sec)")
+    print(f"vectorized: {vector_seconds:.3f}s ({args.rows / vector_seconds:,.0f} rows/sec)")
+    print(f"speedup:    {scalar_seconds / vector_seconds:.1f}x")
+    print(result["outcome"].value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the precompiled email templates and check them against golden output.
+
+    python -m benchmarks.email_templates --emails 20000
+
+benchmarks/golden_emails.json holds inputs and the emails the original
+string-concatenation generators rendered for them, with "today" pinned.
+Fails if any templated email differs byte-for-byte from its golden copy.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.fixtures import synthetic_email_inputs
+from email_generators import (
+    generate_declined_email,
+    generate_not_cleared_email,
+    generate_reserved_email,
+    render_batch
+)
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_emails.json")
+
+GENERATORS = {
+    "declined": generate_declined_email,
+    "not_cleared": generate_not_cleared_email,
+    "reserved": generate_reserved_email,
+}
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def load_golden(path: str = GOLDEN_PATH) -> Tuple[datetime, Dict[str, List[Dict]]]:
+    """The pinned "today" and, per generator, the golden {fields, email} cases"""
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f, object_hook=_decode)
+    return datetime.fromisoformat(golden["today"]), golden["emails"]
+
+
+def check_golden(path: str = GOLDEN_PATH) -> int:
+    """Render every golden case with the templated generators; returns the number checked"""
+    today, emails = load_golden(path)
+    checked = 0
+    for kind, cases in emails.items():
+        generate = GENERATORS[kind]
+        for i, case in enumerate(cases):
+            fields = dict(case["fields"], today=today) if kind == "reserved" else case["fields"]
+            if generate(**fields) != case["email"]:
+                raise SystemExit(f"{kind}: templated output differs from golden case {i}")
+            checked += 1
+    return checked
+
+
+def _time(generate, inputs, repeat: int = 5) -> float:
+    """Best of several runs, to keep timings stable"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for fields in inputs:
+            generate(**fields)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=20_000, help="Emails per generator")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"golden: {check_golden()} emails match the original generators")
+
+    cases = synthetic_email_inputs(args.emails, args.seed)
+    print(f"{'generator':<12} {'emails/s':>12}")
+    for kind, generate in GENERATORS.items():
+        seconds = _time(generate, cases[kind])
+        print(f"{kind:<12} {args.emails / seconds:>12,.0f}")
+
+    stream = [(kind, fields) for kind in GENERATORS for fields in cases[kind]]
+    start = time.perf_counter()
+    rendered = sum(1 for _ in render_batch(stream))
+    seconds = time.perf_counter() - start
+    print(f"render_batch: {rendered} emails in {seconds:.3f}s ({rendered / seconds:,.0f} emails/sec)")
+
+
+if __name__ == "__main__":
+    main()
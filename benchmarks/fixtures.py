@@ -0,0 +1,143 @@
+"""Deterministic synthetic inputs shared by the benchmarks."""
+import csv
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from benchmarks.acord_generator import AcordPacketGenerator
+from config import AGENCIES, COUNTIES, CONSTRUCTION_TYPES, DECLINE_REASONS, SUBMISSION_STATUSES, get_region_for_county
+from models import PropertySubmission
+from utils.clearance import build_document_submission
+from utils.document_utils import filter_loss_run_years
+from utils.history_store import HistoryRecord
+
+
+def synthetic_submission_records(rows: int, seed: int = 0, today: Optional[date] = None) -> List[Dict]:
+    """PropertySubmission keyword arguments covering every decline rule"""
+    rng = random.Random(seed)
+    today = today or datetime.today().date()
+    records = []
+    for i in range(rows):
+        year_built = rng.randint(1950, today.year)
+        records.append({
+            "association_name": f"Association {i}",
+            "agency": rng.choice(AGENCIES),
+            "county": rng.choice(COUNTIES),
+            "effective_date": today + timedelta(days=rng.randint(0, 200)),
+            "year_built": year_built,
+            "roof_replacement": rng.randint(year_built, today.year),
+            "stories": rng.randint(1, 12),
+            "tiv": float(rng.randint(1, 150) * 1_000_000),
+            "construction_type": rng.choice(CONSTRUCTION_TYPES),
+        })
+    return records
+
+
+def synthetic_history_records(rows: int, seed: int = 0, years: int = 3) -> List[HistoryRecord]:
+    """History records spread evenly over the past few years"""
+    rng = random.Random(seed)
+    end = datetime.today()
+    span_minutes = years * 365 * 24 * 60
+    records = []
+    for i in range(rows):
+        county = rng.choice(COUNTIES)
+        records.append(HistoryRecord(
+            association=f"Association {i}",
+            agency=rng.choice(AGENCIES),
+            status=rng.choice(SUBMISSION_STATUSES),
+            created_at=end - timedelta(minutes=rng.randint(0, span_minutes)),
+            county=county,
+            region=get_region_for_county(county),
+            construction_type=rng.choice(CONSTRUCTION_TYPES),
+            tiv=float(rng.randint(1, 150) * 1_000_000)
+        ))
+    return records
+
+
+SOV_HEADER = [
+    "Loc #", "Address", "Total Insured Value", "Year Built", "# of Stories", "Construction", "Sq Ft", "Roof Replaced"
+]
+SOV_CONSTRUCTION = ["Frame", "Joisted Masonry", "Masonry Non-Combustible", "Fire Resistive", "MNC", "6"]
+
+
+def write_sov_csv(path: str, locations: int, seed: int = 0) -> str:
+    """A statement of values CSV with title rows above the header, formatted as agents send them"""
+    rng = random.Random(seed)
+    this_year = datetime.today().year
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerows([["Statement of Values"], ["Synthetic Condominium Association"], []])
+        writer.writerow(SOV_HEADER)
+        for i in range(locations):
+            year_built = rng.randint(1960, this_year)
+            square_feet = rng.randint(2_000, 80_000)
+            writer.writerow([
+                i + 1, f"{100 + i} Ocean Dr", f"${square_feet * rng.randint(90, 400):,}", year_built,
+                rng.randint(1, 12), rng.choice(SOV_CONSTRUCTION), f"{square_feet:,}", rng.randint(year_built, this_year)
+            ])
+    return path
+
+
+DOC_NAMES = [
+    "Acord 125/140", "SOV", "Supplemental Application", "Appraisal", "Financials",
+    "Reserve Study", "Wind Mitigation", "Flood Policy", "Target Premium", "Renewal Premium",
+    "Expiring Premium", "Producer", "Site Map", "Building Updates", "Roof Condition Inspection",
+]
+
+
+def synthetic_email_inputs(count: int, seed: int = 0, today: Optional[date] = None):
+    """Deterministic keyword arguments for each generator"""
+    rng = random.Random(seed)
+    today = today or datetime.today().date()
+    cases = {"declined": [], "not_cleared": [], "reserved": []}
+    for i in range(count):
+        year_built = rng.randint(1950, today.year)
+        submission = PropertySubmission(
+            association_name=rng.choice([f"Harbor Point {i}", f"Bayside Condominium {i}"]),
+            agency=rng.choice(AGENCIES),
+            county=rng.choice(COUNTIES),
+            effective_date=today + timedelta(days=rng.randint(0, 150)),
+            year_built=year_built,
+            roof_replacement=rng.randint(year_built, today.year),
+            stories=rng.randint(1, 12),
+            tiv=float(rng.randint(1, 150) * 1_000_000),
+            construction_type=rng.choice(CONSTRUCTION_TYPES)
+        )
+        received = [doc for doc in DOC_NAMES + filter_loss_run_years(year_built) if rng.random() < 0.6]
+        docs = build_document_submission(submission, received)
+        common = dict(
+            association_name=submission.association_name,
+            agency=submission.agency,
+            year_built=submission.year_built,
+            roof_replacement=submission.roof_replacement,
+            stories=submission.stories
+        )
+        cases["declined"].append(dict(
+            common,
+            construction_type=submission.construction_type,
+            tiv=submission.tiv,
+            effective_date=submission.effective_date,
+            required_docs={},
+            selected_reasons=rng.sample(list(DECLINE_REASONS.values()), rng.randint(1, 4))
+        ))
+        cases["not_cleared"].append(dict(
+            common,
+            county=submission.county,
+            received_docs=docs.required_docs,
+            received_additional_docs=docs.additional_docs
+        ))
+        cases["reserved"].append(dict(
+            common,
+            county=submission.county,
+            received_docs=docs.required_docs,
+            received_additional_docs=docs.additional_docs,
+            effective_date=submission.effective_date
+        ))
+    return cases
+
+
+def acord_corpus(directory: str, files: int = 5, filler_pages: int = 10, seed: int = 0,
+                 fillable: float = 0.0) -> List[str]:
+    """Write ACORD 125/140 packets with filler pages and ground-truth sidecars; returns the PDF paths"""
+    generator = AcordPacketGenerator(seed=seed, fillable=fillable)
+    return generator.write_corpus(directory, files, pages=filler_pages + 2)
@@ -0,0 +1,99 @@
+"""Timing, memory and baseline comparison shared by the benchmark suite."""
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class Measurement:
+    """Per-operation timings (microseconds) and peak traced memory (bytes) of one case"""
+    name: str
+    ops: int
+    median_us: float
+    iqr_us: float
+    min_us: float
+    peak_bytes: int
+
+    @property
+    def ops_per_sec(self) -> float:
+        return 1e6 / self.median_us if self.median_us else 0.0
+
+
+def measure(name: str, run: Callable[[], object], ops: int, repeat: int = 15, warmup: int = 2) -> Measurement:
+    """
+    Time run() repeat times after warmup calls; run performs ops operations.
+    Median and interquartile range are reported per operation so noisy runs do not
+    move the headline number. Peak memory is traced in a separate call, since
+    tracemalloc itself slows the code down.
+    """
+    for _ in range(warmup):
+        run()
+
+    samples: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - start) * 1e6 / ops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return Measurement(
+        name=name,
+        ops=ops,
+        median_us=statistics.median(samples),
+        iqr_us=quartiles[2] - quartiles[0],
+        min_us=min(samples),
+        peak_bytes=peak,
+    )
+
+
+def load_baseline(path: str) -> Dict[str, Measurement]:
+    with open(path, encoding="utf-8") as f:
+        return {name: Measurement(**data) for name, data in json.load(f).items()}
+
+
+def save_baseline(path: str, results: List[Measurement]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({result.name: asdict(result) for result in results}, f, indent=2)
+        f.write("\n")
+
+
+def regression(
+    current: Measurement,
+    baseline: Optional[Measurement],
+    threshold: float,
+    memory_floor_bytes: int = 64 * 1024
+) -> Optional[str]:
+    """
+    A description of the regression, or None.
+    Time regresses when the median exceeds the baseline median by more than threshold
+    and by more than the baseline's own IQR; memory when the peak grows by more than
+    threshold and by more than memory_floor_bytes.
+    """
+    if baseline is None:
+        return None
+    problems = []
+    allowed = baseline.median_us * (1 + threshold)
+    if current.median_us > allowed and current.median_us - baseline.median_us > baseline.iqr_us:
+        problems.append(f"{current.median_us:.2f}us/op vs baseline {baseline.median_us:.2f}us/op")
+    growth = current.peak_bytes - baseline.peak_bytes
+    if current.peak_bytes > baseline.peak_bytes * (1 + threshold) and growth > memory_floor_bytes:
+        problems.append(f"peak {current.peak_bytes / 1024:.0f}KiB vs baseline {baseline.peak_bytes / 1024:.0f}KiB")
+    return "; ".join(problems) or None
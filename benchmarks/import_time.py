@@ -0,0 +1,105 @@
+"""
+Measure cold import time per module and check it against the import budget.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --update   # rewrite the budget from this run
+
+Each module is imported in a fresh interpreter with -X importtime, several times,
+and the median cumulative time is compared with benchmarks/import_budget.json.
+The budget also lists heavy dependencies a module must not pull in at import
+(e.g. pdfplumber for main_app). Exits non-zero on any regression.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+# Budget headroom over the measured median when --update rewrites the file; the
+# absolute slack keeps millisecond-scale modules from failing on timer noise
+HEADROOM = 1.5
+MIN_SLACK_MS = 25
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import module in a fresh interpreter.
+    Returns its cumulative import time in ms and the cumulative ms of every module loaded.
+    """
+    code = f"import {module}" if module else "pass"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    loaded: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded[name.strip()] = int(cumulative) / 1000
+    return loaded.get(module, 0.0), loaded
+
+
+def heaviest(loaded: Dict[str, float], exclude: Set[str], top: int) -> List[Tuple[str, float]]:
+    """The slowest top-level packages among the loaded modules"""
+    packages: Dict[str, float] = {}
+    for name, ms in loaded.items():
+        if "." in name or name in exclude:
+            continue
+        packages[name] = max(packages.get(name, 0.0), ms)
+    return sorted(packages.items(), key=lambda item: -item[1])[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest packages listed per module")
+    parser.add_argument("--update", action="store_true", help="Rewrite the budget from this run")
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, encoding="utf-8") as f:
+        budget = json.load(f)
+
+    # Modules every interpreter loads at startup (site, .pth hooks) are not the module's cost
+    startup = set(measure("")[1])
+    failures = []
+    measured = {}
+    print(f"{'module':<28} {'median ms':>10} {'budget ms':>10}  heaviest imports")
+    for module, limit in budget["modules"].items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        median = statistics.median(ms for ms, _ in runs)
+        loaded = runs[-1][1]
+        measured[module] = median
+
+        top = ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest(loaded, startup | {module}, args.top))
+        print(f"{module:<28} {median:>10.1f} {limit:>10.0f}  {top}")
+
+        if not args.update and median > limit:
+            failures.append(f"{module}: {median:.1f}ms exceeds budget of {limit}ms")
+        for forbidden in budget.get("forbidden", {}).get(module, []):
+            if forbidden in loaded:
+                failures.append(f"{module}: imports {forbidden} at import time")
+
+    if args.update:
+        budget["modules"] = {
+            module: round(max(ms * HEADROOM, ms + MIN_SLACK_MS)) for module, ms in measured.items()
+        }
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Budget written to {BUDGET_PATH}")
+
+    if failures:
+        raise SystemExit("Import-time regressions:\n" + "\n".join(f"  {failure}" for failure in failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark suite for the clearance hot paths.
+
+    python -m benchmarks.suite --save        # record a baseline on this machine
+    python -m benchmarks.suite               # compare against it
+    python -m benchmarks.suite -k email      # only cases whose name contains "email"
+
+Inputs are deterministic (seeded). Each case reports the median and IQR per
+operation and the peak traced memory. With a baseline present, the run fails if
+any case is slower or uses more memory than the baseline by more than --threshold.
+Baselines are machine-specific, so they live in the git-ignored .cache directory.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fixtures import (
+    DOC_NAMES, acord_corpus, synthetic_email_inputs, synthetic_history_records, synthetic_submission_records, write_sov_csv
+)
+from benchmarks.harness import Measurement, load_baseline, measure, regression, save_baseline
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, ".cache", "benchmark_baseline.json")
+
+# Case name -> (run callable, operations per run)
+Cases = Dict[str, Tuple[Callable[[], object], int]]
+
+
+def build_cases(size: int, corpus_dir: str) -> Cases:
+    from config import get_pipeline_data, get_region_for_county
+    from email_generators import generate_declined_email, generate_not_cleared_email, generate_reserved_email
+    from email_generators.not_cleared import consolidate_years
+    from models import PropertySubmission
+    from pages.account_info import validate_submission
+    from utils.acord_parser import AcordParser
+    from utils.clearance import build_document_submission
+    from utils.document_utils import sort_additional_docs
+    from utils.history_store import HistoryStore
+    from utils.sov_reader import review_sov
+
+    records = synthetic_submission_records(size, seed=1)
+    submissions = [PropertySubmission(**record) for record in records]
+    validate_inputs = [
+        {key: value for key, value in record.items() if key != "county"} for record in records
+    ]
+    emails = synthetic_email_inputs(size, seed=2)
+
+    loss_runs = [
+        [f"Loss Runs {year}-{year + 1}" for year in range(2020, 2026) if (i >> (year - 2020)) & 1]
+        for i in range(1, 64)
+    ]
+    received_docs = [DOC_NAMES[i % 7::3] + ["Loss Runs 2022-2023"] for i in range(size)]
+    doc_labels = [
+        "Site Map: Labeled map identifying the location of all buildings", "Financials", "Producer: Confirm",
+        "Wind Mitigation", "Building Updates: Provide", "Reserve Study", "Flood Policy", "Unlisted Item",
+        "Roof Condition Inspection: Provide", "Association Documents: Declarations and Bylaws",
+    ]
+    pipeline_inputs = [
+        dict(
+            effective_date=record["effective_date"],
+            association_name=record["association_name"],
+            agency=record["agency"],
+            region=get_region_for_county(record["county"]),
+            stories=record["stories"],
+            year_built=record["year_built"],
+            tiv=record["tiv"],
+            submission_status="Reserved"
+        )
+        for record in records
+    ]
+    pdfs = acord_corpus(corpus_dir, files=5, filler_pages=10, seed=3)
+    # Same packets as fillable forms, read from their AcroForm fields
+    fillable_pdfs = acord_corpus(os.path.join(corpus_dir, "fillable"), files=5, filler_pages=10, seed=3, fillable=1.0)
+
+    # A few years of history; queries read the pipeline cube, never the raw rows
+    history = HistoryStore(os.path.join(corpus_dir, "history.sqlite3"))
+    history.add_many(synthetic_history_records(size * 20, seed=4))
+    sov_locations = size * 10
+    sov_path = write_sov_csv(os.path.join(corpus_dir, "sov.csv"), sov_locations, seed=5)
+    cube_queries = [
+        dict(group_by=["region", "status"]),
+        dict(group_by=["agency"], since=date.today() - timedelta(weeks=13)),
+        dict(group_by=["week"], region="Tri-County"),
+        dict(group_by=["week", "status"], since=date.today() - timedelta(weeks=52)),
+    ]
+
+    return {
+        "validate.property_submission": (lambda: [s.validate() for s in submissions], size),
+        "validate.validate_submission": (lambda: [validate_submission(**v) for v in validate_inputs], size),
+        "email.declined": (lambda: [generate_declined_email(**e) for e in emails["declined"]], size),
+        "email.not_cleared": (lambda: [generate_not_cleared_email(**e) for e in emails["not_cleared"]], size),
+        "email.reserved": (lambda: [generate_reserved_email(**e) for e in emails["reserved"]], size),
+        "docs.consolidate_years": (lambda: [consolidate_years(years) for years in loss_runs], len(loss_runs)),
+        "docs.sort_additional_docs": (lambda: [sort_additional_docs(doc_labels) for _ in range(size)], size),
+        "docs.checklist": (
+            lambda: [
+                build_document_submission(s, received).get_missing_docs()
+                for s, received in zip(submissions, received_docs)
+            ],
+            size
+        ),
+        "pipeline.get_pipeline_data": (lambda: [get_pipeline_data(**p) for p in pipeline_inputs], size),
+        "parser.extract_fields": (lambda: [AcordParser(path).extract_fields() for path in pdfs], len(pdfs)),
+        "parser.extract_fields_acroform": (
+            lambda: [AcordParser(path).extract_fields() for path in fillable_pdfs], len(fillable_pdfs)
+        ),
+        "sov.review_sov": (lambda: review_sov(sov_path), sov_locations),
+        "history.cube_query": (lambda: [history.cube(**query) for query in cube_queries], len(cube_queries)),
+    }
+
+
+def report(results: List[Measurement], baseline: Dict[str, Measurement]) -> None:
+    print(f"{'case':<30} {'median us/op':>13} {'IQR':>9} {'ops/sec':>12} {'peak KiB':>9} {'vs base':>8}")
+    for result in results:
+        base = baseline.get(result.name)
+        change = f"{result.median_us / base.median_us - 1:+.0%}" if base else "-"
+        print(
+            f"{result.name:<30} {result.median_us:>13.2f} {result.iqr_us:>9.2f} "
+            f"{result.ops_per_sec:>12,.0f} {result.peak_bytes / 1024:>9.0f} {change:>8}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="pattern", default="", help="Only run cases containing this text")
+    parser.add_argument("--size", type=int, default=500, help="Inputs per case")
+    parser.add_argument("--repeat", type=int, default=15, help="Timed runs per case")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--save", action="store_true", help="Save this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, e.g. 0.25 for 25%%")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) and not args.save else {}
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        cases = build_cases(args.size, corpus_dir)
+        results = [
+            measure(name, run, ops, repeat=args.repeat)
+            for name, (run, ops) in cases.items() if args.pattern in name
+        ]
+
+    report(results, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    failures = []
+    for result in results:
+        problem = regression(result, baseline.get(result.name), args.threshold)
+        if problem:
+            failures.append(f"{result.name}: {problem}")
+    if failures:
+        print("Regressions past the threshold:\n" + "\n".join(f"  {failure}" for failure in failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
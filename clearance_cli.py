@@ -0,0 +1,155 @@
+"""
+Headless batch clearance from a CSV/TSV of submissions.
+
+    python clearance_cli.py submissions.csv --out-dir clearance_output
+
+Input columns: association_name, agency, county, effective_date (YYYY-MM-DD or
+MM/DD/YYYY), year_built, roof_replacement, stories, tiv, construction_type and an
+optional received_docs column listing document names separated by ";".
+
+Writes outcomes.csv and emails.jsonl to the output directory and upserts the
+pipeline rows into pipeline.tsv there, so re-running a batch updates rows instead
+of duplicating them. Rows are read and written in chunks, so memory stays flat
+regardless of input size.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from models import PropertySubmission
+from utils.clearance import clear_submission
+from utils.pipeline_exporter import PipelineExporter
+from utils.reference_data import AGENCY_TABLE, COUNTY_TABLE, CONSTRUCTION_TABLE
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y")
+OUTCOME_COLUMNS = ["row", "association_name", "agency", "outcome", "decline_reasons", "error"]
+
+
+def parse_date(value: str) -> date:
+    # Zero-padded ISO dates are the common case and fromisoformat is much faster than
+    # strptime; the formats cover everything else, e.g. 2025-1-5 and 01/05/2025
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+
+def canonical(table, value: str) -> str:
+    """Reference-table spelling of value (e.g. hyphen vs en dash), or value itself if unknown"""
+    value = value.strip()
+    return table.canonical(value) or value
+
+
+def field(row: Dict[str, str], name: str) -> str:
+    """A required column's value; csv.DictReader fills the cells of short rows with None"""
+    value = row[name]
+    if value is None:
+        raise ValueError(f"Missing {name}")
+    return value
+
+
+def row_to_submission(row: Dict[str, str]) -> PropertySubmission:
+    """Convert one CSV row into a PropertySubmission"""
+    return PropertySubmission(
+        association_name=field(row, "association_name").strip(),
+        agency=canonical(AGENCY_TABLE, field(row, "agency")),
+        county=canonical(COUNTY_TABLE, field(row, "county")),
+        effective_date=parse_date(field(row, "effective_date")),
+        year_built=int(field(row, "year_built")),
+        roof_replacement=int(field(row, "roof_replacement")),
+        stories=int(field(row, "stories")),
+        tiv=float(field(row, "tiv").replace("$", "").replace(",", "")),
+        construction_type=canonical(CONSTRUCTION_TABLE, field(row, "construction_type"))
+    )
+
+
+def read_chunks(path: str, chunk_size: int, delimiter: Optional[str] = None) -> Iterator[List[Dict[str, str]]]:
+    """Stream rows from a CSV/TSV in lists of at most chunk_size rows"""
+    if delimiter is None:
+        delimiter = "\t" if path.lower().endswith((".tsv", ".txt")) else ","
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def run(input_path: str, out_dir: str, chunk_size: int = 1000, delimiter: Optional[str] = None) -> Dict[str, int]:
+    """Clear every row of input_path, writing results to out_dir. Returns outcome counts."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts: Dict[str, int] = {}
+    row_number = 0
+
+    with open(os.path.join(out_dir, "outcomes.csv"), "w", newline="", encoding="utf-8") as outcomes_file, \
+            open(os.path.join(out_dir, "emails.jsonl"), "w", encoding="utf-8") as emails_file, \
+            PipelineExporter(os.path.join(out_dir, "pipeline.tsv")) as pipeline:
+        outcomes = csv.writer(outcomes_file)
+        outcomes.writerow(OUTCOME_COLUMNS)
+
+        for chunk in read_chunks(input_path, chunk_size, delimiter):
+            outcome_rows, email_lines, pipeline_rows = [], [], []
+            for row in chunk:
+                row_number += 1
+                try:
+                    submission = row_to_submission(row)
+                    received = (row.get("received_docs") or "").split(";")
+                    result = clear_submission(submission, received)
+                except (KeyError, ValueError) as e:
+                    outcome_rows.append([row_number, row.get("association_name", ""), row.get("agency", ""),
+                                         "Error", "", str(e)])
+                    counts["Error"] = counts.get("Error", 0) + 1
+                    continue
+
+                counts[result.outcome] = counts.get(result.outcome, 0) + 1
+                outcome_rows.append([row_number, submission.association_name, submission.agency,
+                                     result.outcome, " | ".join(result.decline_reasons), ""])
+                email_lines.append(json.dumps({
+                    "row": row_number,
+                    "association_name": submission.association_name,
+                    "outcome": result.outcome,
+                    "email": result.email
+                }, ensure_ascii=False) + "\n")
+                pipeline_rows.append(result.pipeline_row)
+
+            outcomes.writerows(outcome_rows)
+            emails_file.writelines(email_lines)
+            pipeline.upsert(pipeline_rows)
+
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run batch submission clearance from a CSV/TSV file.")
+    parser.add_argument("input", help="CSV or TSV file of submissions")
+    parser.add_argument("--out-dir", default="clearance_output", help="Directory for output files")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows read and written per chunk")
+    parser.add_argument("--delimiter", default=None, help="Field delimiter (default: from file extension)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = run(args.input, args.out_dir, args.chunk_size, args.delimiter)
+    seconds = max(time.perf_counter() - start, 1e-9)
+    rows = sum(counts.values())
+
+    for outcome, count in sorted(counts.items()):
+        print(f"{outcome}: {count}")
+    print(f"{rows} rows in {seconds:.2f}s ({rows / seconds:,.0f} rows/sec)")
+    return 1 if counts.get("Error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
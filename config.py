@@ -1,3 +1,5 @@
+import os
+from types import MappingProxyType
 from datetime import datetime, date
 
 # Agency and location constants
@@ -40,6 +42,20 @@ REGION_COUNTY_MAPPING = {
                 "Seminole", "Sumter"]
 }
 
+# County -> region, inverted once from REGION_COUNTY_MAPPING
+COUNTY_REGIONS = MappingProxyType({
+    county: region for region, counties in REGION_COUNTY_MAPPING.items() for county in counties
+})
+
+# Outcomes recorded in the submission history
+SUBMISSION_STATUSES = [
+    "Reserved", "Not Cleared - RFI", "Not Cleared - OOA", "Declined", "Referred to Manager"
+]
+
+# Regional capacity caps on reserved business; None leaves a region uncapped
+REGION_TIV_CAPS = MappingProxyType({region: None for region in REGION_COUNTY_MAPPING})
+REGION_ACCOUNT_CAPS = MappingProxyType({region: None for region in REGION_COUNTY_MAPPING})
+
 # Basic required documents
 BASIC_REQUIRED_DOCS = ["Acord 125/140", "SOV", "Supplemental Application", "Appraisal"]
 
@@ -59,12 +75,95 @@ BASE_ADDITIONAL_DOCS = [
     ("Prior Claims Experience", "Our objective is to build a book of business with clients who are inclined to file a claim with us directly before engaging third party assistance. Please supply any additional information you feel pertinent to our evaluation of the applicant's prior claim experience.")
 ]
 
+# Additional documents that apply only to some buildings; see get_additional_docs
+CONDITIONAL_ADDITIONAL_DOCS = [
+    ("Roof Condition Inspection", "Provide a current roof inspection for all roofs that are 15+ years old"),
+    ("Building Updates", "Provide documentation confirming the condition, type, and history of any updates to wiring and plumbing systems"),
+    ("Structural Inspection", "Most recent structural or milestone inspection for buildings 3+ stories and 30+ years old"),
+    ("Association Documents", "Declarations and Bylaws"),
+    ("Additional Loss History", "2017-2020 loss runs, if available")
+]
+
+# Earliest loss run period requested for a building
+LOSS_RUN_BASE_YEAR = 2020
+
 # Validation constants
 MIN_TIV = 5_000_000
 MAX_TIV = 100_000_000
 MAX_GARDEN_STYLE_TIV = 60_000_000
 MAX_FRAME_STORIES = 5
+MAX_GARDEN_STYLE_STORIES = 3
 MAX_EFFECTIVE_DATE_DAYS = 120
+MAX_BUILDING_AGE = 30
+MAX_ROOF_AGE = 15
+
+# ACORD parse cache
+PARSE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "acord_parse_cache.sqlite3")
+PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+PARSE_CACHE_MAX_AGE_DAYS = 30
+
+# ACORD parse worker pool shared by all sessions: jobs beyond workers + queue size
+# wait up to PARSE_POOL_WAIT_SECONDS for a slot, then are refused. Each job is cut
+# off after PARSE_JOB_TIMEOUT_SECONDS or PARSE_JOB_MEMORY_MB of address space
+# (0 disables the memory limit), and workers are replaced after PARSE_WORKER_MAX_JOBS.
+PARSE_POOL_WORKERS = int(os.environ.get("CLEARANCE_PARSE_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+PARSE_POOL_QUEUE_SIZE = 8
+PARSE_POOL_WAIT_SECONDS = 5.0
+PARSE_JOB_TIMEOUT_SECONDS = 60.0
+PARSE_JOB_MEMORY_MB = 1024
+PARSE_WORKER_MAX_JOBS = 50
+
+# Submission history database
+HISTORY_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "submission_history.sqlite3")
+HISTORY_BATCH_SIZE = 50
+HISTORY_FLUSH_SECONDS = 2.0
+HISTORY_PAGE_SIZE = 20
+
+# Duplicate-submission check: trigram (Dice) similarity needed to flag a past association name
+NAME_MATCH_THRESHOLD = 0.6
+NAME_MATCH_LIMIT = 5
+
+# Span tracing, off unless CLEARANCE_TRACE=1; spans are appended as JSON lines
+TRACE_ENABLED = os.environ.get("CLEARANCE_TRACE", "") == "1"
+TRACE_PATH = os.environ.get(
+    "CLEARANCE_TRACE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "traces.jsonl")
+)
+TRACE_HISTORY = 10
+
+# Outbound email. The outbox is only started when CLEARANCE_SMTP_HOST is set.
+SMTP_HOST = os.environ.get("CLEARANCE_SMTP_HOST", "")
+SMTP_PORT = int(os.environ.get("CLEARANCE_SMTP_PORT", "25"))
+SMTP_USERNAME = os.environ.get("CLEARANCE_SMTP_USERNAME", "")
+SMTP_PASSWORD = os.environ.get("CLEARANCE_SMTP_PASSWORD", "")
+SMTP_STARTTLS = os.environ.get("CLEARANCE_SMTP_STARTTLS", "") == "1"
+SMTP_FROM = os.environ.get("CLEARANCE_SMTP_FROM", "clearance@localhost")
+OUTBOX_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "outbox.sqlite3")
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_BACKOFF_SECONDS = 2.0
+OUTBOX_MAX_BACKOFF_SECONDS = 300.0
+# A claimed batch whose worker has not recorded it within this long is claimed
+# again; comfortably longer than sending a full batch through SMTP timeouts
+OUTBOX_LEASE_SECONDS = 1800.0
+SMTP_IDLE_SECONDS = 60.0
+
+# Statement of values (SOV) review: rows per streamed chunk and the lowest
+# acceptable insured value per square foot
+SOV_CHUNK_ROWS = 1000
+SOV_MIN_VALUE_PER_SQFT = 120
+
+# In-memory PDF uploads larger than this are spilled to a memory-mapped temp file
+PDF_SPILL_THRESHOLD_BYTES = 32 * 1024 * 1024
+
+# Pipeline spreadsheet columns, in the order get_pipeline_row produces them
+PIPELINE_COLUMNS = [
+    "Effective Date", "Insured", "Agent", "Region", "# Stories", "Type", "Year Built",
+    "TIV", "Premium", "Rate", "Pr(Bind)", "Carrier", "Underwriter", "Need By", "Status"
+]
+# Columns that identify a pipeline row when re-exporting
+PIPELINE_KEY_COLUMNS = ["Effective Date", "Insured", "Agent"]
+PIPELINE_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exports")
 
 # Decline reasons mapping
 DECLINE_REASONS = {
@@ -99,12 +198,9 @@ def generate_loss_run_years():
 
 def get_region_for_county(county: str) -> str:
     """Get the region name for a given county"""
-    for region, counties in REGION_COUNTY_MAPPING.items():
-        if county in counties:
-            return region
-    return "Unknown Region"
+    return COUNTY_REGIONS.get(county, "Unknown Region")
 
-def get_pipeline_data(
+def get_pipeline_row(
     effective_date: date,
     association_name: str,
     agency: str,
@@ -113,9 +209,9 @@ def get_pipeline_data(
     year_built: int,
     tiv: float,
     submission_status: str
-) -> str:
+) -> list:
     """
-    Format data for pipeline spreadsheet in a tab-separated format
+    Build the pipeline spreadsheet row as a list of values matching PIPELINE_COLUMNS
     """
     # Determine status based on submission outcome
     if submission_status == "Not Cleared - RFI":
@@ -130,8 +226,7 @@ def get_pipeline_data(
     # Format TIV with commas and no decimals
     formatted_tiv = f"${tiv:,.0f}"
     
-    # Create tab-separated string with all fields
-    pipeline_data = [
+    return [
         effective_date.strftime("%m/%d/%Y"),  # Effective Date
         association_name,                      # Insured
         agency,                               # Agent (matches dropdown)
@@ -148,8 +243,36 @@ def get_pipeline_data(
         "",                                   # Need By
         pipeline_status                       # Status (matches dropdown)
     ]
-    
-    return "\t".join(pipeline_data)
 
-# Combine basic docs with loss run years
-REQUIRED_DOCS = BASIC_REQUIRED_DOCS + generate_loss_run_years()
\ No newline at end of file
+def get_pipeline_data(
+    effective_date: date,
+    association_name: str,
+    agency: str,
+    region: str,
+    stories: int,
+    year_built: int,
+    tiv: float,
+    submission_status: str
+) -> str:
+    """
+    Format data for pipeline spreadsheet in a tab-separated format
+    """
+    return "\t".join(get_pipeline_row(
+        effective_date=effective_date,
+        association_name=association_name,
+        agency=agency,
+        region=region,
+        stories=stories,
+        year_built=year_built,
+        tiv=tiv,
+        submission_status=submission_status
+    ))
+
+def __getattr__(name: str):
+    """
+    REQUIRED_DOCS (basic docs plus loss run years) is computed on first access
+    rather than at import, and stays current if the process outlives a year end.
+    """
+    if name == "REQUIRED_DOCS":
+        return BASIC_REQUIRED_DOCS + generate_loss_run_years()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
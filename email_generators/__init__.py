@@ -1,9 +1,11 @@
 from .declined import generate_declined_email
 from .not_cleared import generate_not_cleared_email
 from .reserved import generate_reserved_email
+from .batch import render_batch
 
 __all__ = [
     'generate_declined_email',
     'generate_not_cleared_email',
-    'generate_reserved_email'
+    'generate_reserved_email',
+    'render_batch'
 ]
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Batch rendering of outcome emails from a stream of submissions
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from .declined import generate_declined_email
+from .not_cleared import generate_not_cleared_email
+from .reserved import generate_reserved_email
+
+EMAIL_GENERATORS = {
+    "declined": generate_declined_email,
+    "not_cleared": generate_not_cleared_email,
+    "reserved": generate_reserved_email,
+}
+
+
+def render_batch(items: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[str]:
+    """
+    Render one email per (kind, fields) pair, lazily and in input order.
+    kind is one of EMAIL_GENERATORS; fields are that generator's keyword arguments.
+    The clock is read once so every reserved email in the batch gets the same deadlines.
+    """
+    today = datetime.today()
+    generators = EMAIL_GENERATORS
+    for kind, fields in items:
+        if kind == "reserved" and "today" not in fields:
+            fields = {**fields, "today": today}
+        yield generators[kind](**fields)
@@ -1,35 +1,48 @@
 from datetime import datetime
 from typing import Dict, List
+from utils.doc_catalog import parse_loss_run_label, year_intervals
+from utils.tracing import traced
 
 def consolidate_years(missing_loss_runs: List[str]) -> str:
     """
     Convert missing loss runs years into consolidated ranges.
     E.g. ["Loss Runs 2021-2022", "Loss Runs 2022-2023", "Loss Runs 2023-2024"] -> "2021-2024"
     """
-    if not missing_loss_runs:
+    years = [parse_loss_run_label(loss_run) for loss_run in missing_loss_runs]
+    if not years:
         return ""
+    if None in years:
+        raise ValueError("Loss runs must be labelled \"Loss Runs YYYY-YYYY\"")
 
-    # Parse year pairs
-    year_pairs = []
-    for loss_run in missing_loss_runs:
-        yrs = loss_run.replace("Loss Runs ", "").split("-")
-        start, end = int(yrs[0]), int(yrs[1])
-        year_pairs.append((start, end))
-    year_pairs.sort()
+    # One bit per period, so consecutive periods are adjacent bits
+    base = min(years)
+    mask = 0
+    for year in years:
+        mask |= 1 << (year - base)
+    return " and ".join(f"{start}-{end}" for start, end in year_intervals(mask, base))
 
-    # Consolidate consecutive ranges
-    ranges: List[str] = []
-    current_start, current_end = year_pairs[0]
-    for start, end in year_pairs[1:]:
-        if start == current_end:
-            current_end = end
-        else:
-            ranges.append(f"{current_start}-{current_end}")
-            current_start, current_end = start, end
-    ranges.append(f"{current_start}-{current_end}")
-
-    return " and ".join(ranges)
+# Static fragments, built once at import
+_PREFERRED_TIER_NOTE = (
+    "\n\nBased on the risk characteristics, it appears that this account may qualify "
+    "for our preferred commission tier. Eligibility will be confirmed during underwriting."
+)
+_MISSING_INITIAL_INTRO = (
+    "\n\nThe following documents are needed to reserve the account. "
+    "Please send at your earliest convenience:"
+)
+_MISSING_ADDITIONAL_INTRO = (
+    "\n\nIf reserved, we will request the additional items below. "
+    "Please note required items and advise if unavailable:"
+)
+_CLOSING = (
+    "\n\nWe appreciate your partnership!\n\n"
+    "Kindest Regards,"
+)
+_LOSS_RUNS_SUFFIX = " loss runs (outdated loss runs or SONL accepted in lieu for reservation)"
+_BULLET = "\n• "
+PRIORITY_ITEMS = ("Building Updates", "Roof Condition Inspection")
 
+@traced("email.not_cleared")
 def generate_not_cleared_email(
     association_name: str,
     agency: str,
@@ -45,61 +58,37 @@ def generate_not_cleared_email(
     preserving checkbox order and always putting Building Updates/Roof Inspection first if missing.
     """
     # Header
-    email_body = (
-        f"Hi,\n\n"
-        f"Thank you for your submission of the above referenced account for {association_name}."
-    )
+    parts = ["Hi,\n\nThank you for your submission of the above referenced account for ", association_name, "."]
 
     # Preferred commission tier note
     if year_built >= 1994 and roof_replacement >= 2010:
-        email_body += (
-            "\n\nBased on the risk characteristics, it appears that this account may qualify "
-            "for our preferred commission tier. Eligibility will be confirmed during underwriting."
-        )
+        parts.append(_PREFERRED_TIER_NOTE)
 
     # Identify missing initial documents
     missing_initial = [doc for doc, received in received_docs.items() if not received]
-    missing_loss_runs = [d for d in missing_initial if "Loss Runs" in d]
-    other_missing = [d for d in missing_initial if "Loss Runs" not in d]
 
     if missing_initial:
-        email_body += (
-            "\n\nThe following documents are needed to reserve the account. "
-            "Please send at your earliest convenience:"
-        )
-        # List non-loss runs
-        for doc in other_missing:
-            email_body += f"\n• {doc}"
-        # Consolidated loss runs
+        parts.append(_MISSING_INITIAL_INTRO)
+        # List non-loss runs, then consolidated loss runs
+        missing_loss_runs = [d for d in missing_initial if "Loss Runs" in d]
+        other_missing = [d for d in missing_initial if "Loss Runs" not in d]
+        if other_missing:
+            parts.append(_BULLET + _BULLET.join(other_missing))
         if missing_loss_runs:
             ranges = consolidate_years(missing_loss_runs)
             if ranges:
-                email_body += (
-                    f"\n• Loss Runs: Valued {ranges} loss runs "
-                    "(outdated loss runs or SONL accepted in lieu for reservation)"
-                )
+                parts.append(f"{_BULLET}Loss Runs: Valued {ranges}{_LOSS_RUNS_SUFFIX}")
 
     # Identify missing additional documents and preserve checkbox/UI order
-    priority_items = ["Building Updates", "Roof Condition Inspection"]
     missing_additional = [doc for doc, received in received_additional_docs.items() if not received]
-    priority_to_list = [item for item in priority_items if item in missing_additional]
-    rest_to_list = [doc for doc in missing_additional if doc not in priority_items]
+    priority_to_list = [item for item in PRIORITY_ITEMS if item in missing_additional]
+    rest_to_list = [doc for doc in missing_additional if doc not in PRIORITY_ITEMS]
 
     if priority_to_list or rest_to_list:
-        email_body += (
-            "\n\nIf reserved, we will request the additional items below. "
-            "Please note required items and advise if unavailable:"
-        )
-        # Priority first
-        for doc in priority_to_list:
-            email_body += f"\n• {doc}"
-        # All others in UI order (including premiums)
-        for doc in rest_to_list:
-            email_body += f"\n• {doc}"
+        parts.append(_MISSING_ADDITIONAL_INTRO)
+        # Priority first, then all others in UI order (including premiums)
+        parts.append(_BULLET + _BULLET.join(priority_to_list + rest_to_list))
 
     # Closing
-    email_body += (
-        "\n\nWe appreciate your partnership!\n\n"
-        "Kindest Regards,"
-    )
-    return email_body
\ No newline at end of file
+    parts.append(_CLOSING)
+    return "".join(parts)
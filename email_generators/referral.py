@@ -3,7 +3,9 @@ The referral email generated to send the manager for high TIV submissions
 """
 from datetime import datetime
 from typing import Optional
+from utils.tracing import traced
 
+@traced("email.referral")
 def generate_referral_email(
     association_name: str,
     agency: str,
@@ -1,8 +1,9 @@
 import streamlit as st
 from datetime import datetime
-from pages.account_info import render_step1
-from pages.document_selection import render_step2
+from pages.common import render_pipeline_export, render_outbox, render_capacity, render_memo_stats, render_trace_panel
+from pages.history import render_history_sidebar
 from utils.history_manager import initialize_history, clear_submission_data
+from utils.tracing import span
 
 def initialize_history():
     """Initialize submission history in session state if it doesn't exist"""
@@ -51,17 +52,33 @@ def main():
     # Initialize session state
     if 'step' not in st.session_state:
         st.session_state.step = 1
-    
-    initialize_history()
+
+    view = st.sidebar.radio("View", ["Clearance", "Dashboard"], key="view", horizontal=True)
+
+    with span("rerun", step=st.session_state.step, view=view):
+        initialize_history()
         
-    # Main content
-    st.title("Submission Clearance")
+        # Main content
+        st.title("Submission Clearance")
     
-    # Render appropriate step
-    if st.session_state.step == 1:
-        render_step1()
-    elif st.session_state.step == 2:
-        render_step2()
+        # Render the dashboard or the appropriate step; each page is imported on first use
+        if view == "Dashboard":
+            from pages.dashboard import render_dashboard
+            render_dashboard()
+        elif st.session_state.step == 1:
+            from pages.account_info import render_step1
+            render_step1()
+        elif st.session_state.step == 2:
+            from pages.document_selection import render_step2
+            render_step2()
+
+        render_history_sidebar()
+
+    render_pipeline_export()
+    render_outbox()
+    render_capacity()
+    render_memo_stats()
+    render_trace_panel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
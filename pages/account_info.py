@@ -10,7 +10,20 @@ from config import (
 )
 from email_generators.declined import generate_declined_email
 from email_generators.referral import generate_referral_email
-from utils.history_manager import add_to_history
+from utils.history_manager import add_to_history, find_similar_submissions, get_capacity_tracker
+from utils.name_index import normalize_name
+from utils.rule_engine import ENGINE
+from utils.acord_parser import PARSE_PATH_FORM, PARSE_PATH_MIXED, PARSE_PATH_TEXT
+from utils.reference_data import AGENCY_TABLE, COUNTY_TABLE, CONSTRUCTION_TABLE
+from utils.tracing import traced
+from pages.common import get_parse_cache, get_parse_pool, remember_email
+
+# Where the prefilled ACORD values were read from, for the prefill message
+_PARSE_PATH_LABELS = {
+    PARSE_PATH_FORM: "form fields",
+    PARSE_PATH_MIXED: "form fields + page text",
+    PARSE_PATH_TEXT: "page text"
+}
 
 
 def initialize_session_state():
@@ -33,20 +46,84 @@ def initialize_session_state():
             st.session_state[key] = default
 
 
-def check_tiv_limits(tiv: float, stories: int) -> str:
-    """
-    Check TIV limits and return status
-    Returns: 'decline', 'refer', or 'accept'
-    """
-    if tiv < 5_000_000:
-        return 'decline'
-    elif stories <= 3 and tiv > 60_000_000:
-        return 'decline'
-    elif tiv > 100_000_000:
-        return 'refer'
-    return 'accept'
+def prefill_from_acord():
+    """Prefill the property form from an uploaded ACORD 125/140"""
+    uploaded = st.file_uploader("Prefill from ACORD 125/140 (optional)", type="pdf")
+    if uploaded is None or st.session_state.get('acord_upload_id') == uploaded.file_id:
+        return
+
+    try:
+        # Parsed in the shared worker pool, so a slow or oversized PDF cannot stall the server
+        result = get_parse_pool().parse(uploaded, cache=get_parse_cache())
+    except ValueError as e:
+        # The upload stays unmarked, so the next rerun tries it again
+        st.error(str(e))
+        return
+    st.session_state.acord_upload_id = uploaded.file_id
+
+    fields = result.fields
+    today = datetime.today()
+    prefill = {}
+    if fields.get('association_name'):
+        prefill['association_name'] = fields['association_name']
+    if fields.get('effective_date') and fields['effective_date'] >= today.date():
+        prefill['effective_date'] = fields['effective_date']
+    if 1900 <= fields.get('year_built', 0) <= today.year:
+        prefill['year_built'] = fields['year_built']
+    if fields.get('stories', 0) >= 1:
+        prefill['stories'] = fields['stories']
+    if fields.get('tiv'):
+        prefill['tiv'] = fields['tiv']
+    construction = CONSTRUCTION_TABLE.canonical(fields.get('construction_type'))
+    if construction:
+        prefill['construction_type'] = construction
+
+    if prefill:
+        st.session_state.update(prefill)
+        source = _PARSE_PATH_LABELS.get(result.parse_path, "page text")
+        st.success(f"Prefilled from ACORD ({source}): {', '.join(prefill)}")
+    else:
+        st.warning("No ACORD fields could be read from this PDF.")
+
 
+def review_sov_upload():
+    """Check every location of an uploaded SOV and prefill the TIV with its total"""
+    uploaded = st.file_uploader("Review SOV (optional)", type=["csv", "xlsx"])
+    if uploaded is None:
+        return
+    if st.session_state.get('sov_upload_id') != uploaded.file_id:
+        # Imported here so sessions that never upload an SOV do not load pandas/openpyxl
+        from utils.sov_reader import review_sov
 
+        try:
+            report = review_sov(uploaded, filename=uploaded.name)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.session_state.sov_upload_id = uploaded.file_id
+        st.session_state.sov_report = report
+        if report.total_tiv:
+            st.session_state.tiv = report.total_tiv
+
+    report = st.session_state.sov_report
+    st.caption(
+        f"{report.locations:,} locations · total TIV ${report.total_tiv:,.0f} · "
+        f"tallest {report.max_stories} stories"
+    )
+    if report.missing_tiv:
+        st.warning(f"{report.missing_tiv:,} locations have no TIV.")
+    if report.missing_columns:
+        st.caption(f"Not in this SOV: {', '.join(report.missing_columns)}")
+    for reason in report.premises_reasons:
+        st.error(reason)
+    if len(report.exceptions):
+        st.warning(f"{len(report.exceptions):,} location exceptions")
+        st.dataframe(report.exceptions, use_container_width=True, hide_index=True)
+    else:
+        st.success("No location exceptions.")
+
+
+@traced("validate_submission")
 def validate_submission(
     association_name: str,
     agency: str,
@@ -55,52 +132,24 @@ def validate_submission(
     stories: int,
     construction_type: str,
     tiv: float,
-    effective_date: datetime
+    effective_date: datetime,
+    region: str = None,
+    capacity=None
 ) -> list:
     """
     Validates the submission and returns list of decline reasons if any
     """
-    decline_reasons = []
-    today = datetime.today()
-
-    if agency == "Unknown":
-        decline_reasons.append("Agency Not Appointed")
-
-    if construction_type == "Frame" and stories > 5:
-        decline_reasons.append(
-            "Frame > 5 stories: The subject property includes predominantly"
-            " frame building(s) > 5 stories."
-        )
-
-    if (effective_date - today.date()).days > 120:
-        decline_reasons.append(
-            "Effective Date: Requested effective date is > 120 days past"
-            " the submission date; account cannot be reserved at this time."
-        )
-
-    if tiv < 5_000_000:
-        decline_reasons.append("TIV < $5M: TIV is less than $5,000,000")
-    elif stories <= 3 and tiv > 60_000_000:
-        decline_reasons.append(
-            "Garden Style TIV > $60M: Per premises TIV exceeds $60M."
-            " We are generally looking for $5M-$60M TIVs for garden style risks (1-3 stories)."
-        )
-    elif tiv > 100_000_000:
-        decline_reasons.append("TIV > $100M: Per premises TIV exceeds $100M")
-
-    building_age = today.year - year_built
-    roof_age = today.year - roof_replacement
-    if decline_reasons:
-        if building_age > 30:
-            decline_reasons.append(
-                "Building Age/Updates: Building age(s) exceeds 30 years and there is insufficient documentation confirming adequate building updates."
-            )
-        if roof_age > 15:
-            decline_reasons.append(
-                "Roof Age/Updates: Roof age(s) exceeds 15 years and there is insufficient documentation confirming adequate roof condition."
-            )
-
-    return decline_reasons
+    return ENGINE.evaluate(
+        agency=agency,
+        construction_type=construction_type,
+        stories=stories,
+        tiv=tiv,
+        effective_date=effective_date,
+        year_built=year_built,
+        roof_replacement=roof_replacement,
+        region=region,
+        capacity=capacity
+    )
 
 
 def show_decline_reasons_selection():
@@ -127,15 +176,56 @@ def show_decline_reasons_selection():
             )
             st.error("### Submission Outcome: Declined")
             st.text_area("Generated Email", email_body, height=400)
+            remember_email("declined", "Declined", email_body)
             st.session_state.showing_decline_reasons = False
         else:
             st.warning("Please select at least one decline reason")
 
 
+def _own_submissions():
+    """Normalized name -> agencies this session has already recorded"""
+    own = {}
+    for entry in st.session_state.get('submission_history', []):
+        own.setdefault(normalize_name(entry['association']), set()).add(entry['agency'])
+    return own
+
+
+def warn_possible_duplicates(association_name, agency):
+    """
+    Warn about earlier submissions with a near-identical association name.
+    The warning is also kept in session state so step 2 can show it after the rerun.
+    """
+    own = _own_submissions()
+    # Entries recorded only by this session (e.g. returning to step 1 after a submission)
+    # are the submission itself, not a duplicate
+    matches = [
+        match for match in find_similar_submissions(association_name)
+        if not match.agencies <= own.get(normalize_name(match.name), set())
+    ]
+    if not matches:
+        st.session_state.duplicate_warning = None
+        return
+
+    lines = []
+    for match in matches:
+        agencies = ", ".join(sorted(match.agencies)) or "unknown agency"
+        line = f"- {match.name} ({agencies}, {match.score:.0%} match)"
+        if match.agencies - {agency}:
+            line += " - possible broker of record conflict"
+        lines.append(line)
+    st.session_state.duplicate_warning = (
+        "Possible duplicate submission. Similar associations already submitted:\n" + "\n".join(lines)
+    )
+    st.warning(st.session_state.duplicate_warning)
+
+
+@traced("render_step1")
 def render_step1():
     """Render the first step of the submission process"""
     initialize_session_state()
     st.subheader("Property Information")
+    prefill_from_acord()
+    review_sov_upload()
 
     with st.form("property_info_form"):
         effective_date = st.date_input(
@@ -153,7 +243,7 @@ def render_step1():
             agency = st.selectbox(
                 "Select Agency",
                 options=AGENCIES,
-                index=AGENCIES.index(st.session_state.agency) if st.session_state.agency in AGENCIES else 0
+                index=AGENCY_TABLE.index_of(st.session_state.agency)
             )
             year_built = st.number_input(
                 "Year Built",
@@ -169,14 +259,14 @@ def render_step1():
             construction_type = st.selectbox(
                 "Construction Type",
                 options=CONSTRUCTION_TYPES,
-                index=CONSTRUCTION_TYPES.index(st.session_state.construction_type)
+                index=CONSTRUCTION_TABLE.index_of(st.session_state.construction_type)
             )
 
         with col2:
             county = st.selectbox(
                 "Select County",
                 options=COUNTIES,
-                index=COUNTIES.index(st.session_state.county) if st.session_state.county in COUNTIES else 0
+                index=COUNTY_TABLE.index_of(st.session_state.county)
             )
             roof_replacement = st.number_input(
                 "Roof Replacement Year",
@@ -204,6 +294,8 @@ def render_step1():
             st.error("Please fill out all required fields.")
             return
 
+        warn_possible_duplicates(association_name, agency)
+
         st.session_state.update({
             'effective_date': effective_date,
             'association_name': association_name,
@@ -237,6 +329,7 @@ def render_step1():
             st.text(email_data['subject'])
             st.text("Email Body:")
             st.text_area("Referral Email", email_data['body'], height=400)
+            remember_email("referral", "Referred to Manager", email_data['body'], subject=email_data['subject'])
 
         elif decline_button:
             st.session_state.showing_decline_reasons = True
@@ -251,7 +344,9 @@ def render_step1():
                 stories=stories,
                 construction_type=construction_type,
                 tiv=tiv,
-                effective_date=effective_date
+                effective_date=effective_date,
+                region=st.session_state.region,
+                capacity=get_capacity_tracker()
             )
             if decline_reasons:
                 email_body = generate_declined_email(
@@ -269,6 +364,7 @@ def render_step1():
                 st.error("### Submission Outcome: Declined")
                 add_to_history(association_name, agency, "Declined")
                 st.text_area("Generated Email", email_body, height=400)
+                remember_email("declined", "Declined", email_body)
             else:
                 st.session_state.step = 2
                 st.rerun()
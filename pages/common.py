@@ -0,0 +1,147 @@
+"""Resources and widgets shared by the Streamlit pages."""
+import atexit
+import os
+from collections import deque
+from datetime import date
+
+import streamlit as st
+
+from config import PIPELINE_EXPORT_DIR, TRACE_HISTORY, SMTP_HOST
+from utils.history_manager import get_capacity_tracker
+from utils.memo import memo_stats
+from utils.parse_cache import ParseCache
+from utils.pipeline_exporter import export_pipeline_rows
+from utils.tracing import TRACER
+
+
+@st.cache_resource
+def get_parse_cache() -> ParseCache:
+    """One ACORD parse cache handle per server process"""
+    return ParseCache()
+
+
+@st.cache_resource
+def get_parse_pool():
+    """The process-wide ACORD parse worker pool, shared by every session"""
+    # Imported here so the multiprocessing machinery loads with the first ACORD upload
+    from utils.parse_pool import ParsePool
+
+    pool = ParsePool()
+    atexit.register(pool.shutdown)
+    return pool
+
+
+@st.cache_resource
+def get_outbox():
+    """The process-wide email outbox and its worker, or None when SMTP is not configured"""
+    if not SMTP_HOST:
+        return None
+    # Imported here so sessions that never send email do not load smtplib/asyncio machinery
+    from utils.outbox import Outbox
+
+    outbox = Outbox()
+    outbox.start()
+    atexit.register(outbox.stop)
+    return outbox
+
+
+def remember_email(kind, status, body, subject=None):
+    """Keep the email just shown so the sidebar outbox control can queue it"""
+    st.session_state.last_email = {
+        'kind': kind,
+        'subject': subject or f"{st.session_state.association_name} - {status}",
+        'body': body
+    }
+
+
+def render_outbox():
+    """Sidebar control that queues the last generated email for sending"""
+    with st.sidebar:
+        st.subheader("Outbox")
+        outbox = get_outbox()
+        if outbox is None:
+            st.caption("Email sending is off. Set CLEARANCE_SMTP_HOST to enable the outbox.")
+            return
+
+        if not outbox.alive:
+            st.error("The email worker has stopped; queued emails will not be sent until the app restarts.")
+
+        email = st.session_state.get('last_email')
+        st.caption(f"Last email: {email['subject']}" if email else "No email generated yet")
+        recipient = st.text_input("Recipient", key="outbox_recipient")
+        if st.button("Queue Email", disabled=not (email and recipient)):
+            # Queueing only writes to the local outbox; the worker thread does the sending
+            outbox.enqueue(recipient.strip(), email['subject'], email['body'], kind=email['kind'])
+            st.success(f"Queued for {recipient.strip()}")
+
+        counts = outbox.counts()
+        st.caption(" · ".join(f"{status}: {count}" for status, count in counts.items() if status != "sending"))
+
+
+def render_pipeline_export():
+    """Sidebar control that upserts this session's pipeline rows into today's export file"""
+    rows = st.session_state.get('pipeline_rows', {})
+    with st.sidebar:
+        st.subheader("Pipeline Export")
+        export_format = st.selectbox("Format", ["tsv", "csv", "xlsx"], key="pipeline_export_format")
+        if st.button(f"Export Session Pipeline ({len(rows)})", disabled=not rows):
+            path = os.path.join(PIPELINE_EXPORT_DIR, f"pipeline_{date.today():%Y-%m-%d}.{export_format}")
+            try:
+                stats = export_pipeline_rows(path, rows.values())
+            except (ImportError, ValueError) as e:
+                st.error(str(e))
+                return
+            st.success(
+                f"Exported to {path}: {stats.inserted} added, "
+                f"{stats.updated} updated, {stats.unchanged} unchanged"
+            )
+
+
+def _millions(value):
+    return f"${value / 1_000_000:,.1f}M"
+
+
+def render_capacity():
+    """Collapsed sidebar panel with reserved business per region against its caps"""
+    with st.sidebar.expander("Regional Capacity", expanded=False):
+        for status in get_capacity_tracker().regions().values():
+            tiv_cap = f" of {_millions(status.tiv_cap)}" if status.tiv_cap is not None else ""
+            account_cap = f" of {status.account_cap}" if status.account_cap is not None else ""
+            st.caption(f"**{status.region}**: {_millions(status.tiv)}{tiv_cap} TIV, {status.accounts}{account_cap} accounts")
+            if status.by_construction:
+                st.caption(" · ".join(
+                    f"{construction} {cell.accounts} / {_millions(cell.tiv)}"
+                    for construction, cell in sorted(status.by_construction.items())
+                ))
+
+
+def render_memo_stats():
+    """Collapsed sidebar panel with hit rates of the memoized derived state"""
+    with st.sidebar.expander("Debug: memo caches", expanded=False):
+        for stats in memo_stats():
+            st.caption(
+                f"{stats.name}: {stats.hit_rate:.0%} hit rate "
+                f"({stats.hits} hits, {stats.misses} misses, {stats.evictions} evicted, "
+                f"{stats.size}/{stats.maxsize} cached)"
+            )
+
+
+def render_trace_panel():
+    """Sidebar timing breakdown of this session's last reruns (only when tracing is enabled)"""
+    if not TRACER.enabled:
+        return
+    history = st.session_state.setdefault('trace_history', deque(maxlen=TRACE_HISTORY))
+    trace = TRACER.last_trace()
+    if trace is not None and (not history or history[-1] is not trace):
+        history.append(trace)
+
+    with st.sidebar.expander(f"Timing: last {len(history)} reruns", expanded=False):
+        for trace in reversed(history):
+            root = trace.root
+            st.caption(f"{root.name} {root.attrs.get('step', '')}: {trace.duration_ms:.1f} ms")
+            breakdown = [
+                f"{'  ' * (s.depth - 1)}{s.name} {s.duration_ms:.1f} ms" + (f" [{s.error}]" if s.error else "")
+                for s in trace.spans[1:]
+            ]
+            if breakdown:
+                st.text("\n".join(breakdown))
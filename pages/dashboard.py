@@ -0,0 +1,57 @@
+import time
+from datetime import date, timedelta
+
+import streamlit as st
+
+from config import AGENCIES, REGION_COUNTY_MAPPING, SUBMISSION_STATUSES
+from utils.history_manager import get_history_store
+from utils.pipeline_cube import CUBE_DIMENSIONS
+
+PERIODS = {"Last 4 weeks": 4, "Last 13 weeks": 13, "Last 52 weeks": 52, "All time": None}
+
+
+def render_dashboard():
+    """Pipeline counts and TIV grouped by agency, region, status and week"""
+    st.subheader("Pipeline Dashboard")
+    store = get_history_store()
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        period = st.selectbox("Period", list(PERIODS), index=1, key="dashboard_period")
+    with col2:
+        agency = st.selectbox("Agency", ["All"] + AGENCIES, key="dashboard_agency")
+    with col3:
+        region = st.selectbox("Region", ["All"] + list(REGION_COUNTY_MAPPING), key="dashboard_region")
+    with col4:
+        status = st.selectbox("Status", ["All"] + SUBMISSION_STATUSES, key="dashboard_status")
+    group_by = st.multiselect(
+        "Group by", list(CUBE_DIMENSIONS), default=["region", "status"], key="dashboard_group_by"
+    )
+
+    weeks = PERIODS[period]
+    filters = {
+        'since': date.today() - timedelta(weeks=weeks) if weeks else None,
+        'agency': None if agency == "All" else agency,
+        'region': None if region == "All" else region,
+        'status': None if status == "All" else status
+    }
+
+    start = time.perf_counter()
+    rows = store.cube(group_by, **filters)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    total = store.cube([], **filters)
+    submissions = total[0]['submissions'] if total else 0
+    tiv = total[0]['tiv'] if total else 0.0
+    metric1, metric2 = st.columns(2)
+    metric1.metric("Submissions", f"{submissions:,}")
+    metric2.metric("Total TIV", f"${tiv:,.0f}")
+
+    if not rows:
+        st.caption("No submissions match these filters.")
+        return
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    st.caption(f"{len(rows):,} groups in {elapsed_ms:.1f} ms")
+
+    if group_by == ["week"]:
+        st.bar_chart({row['week']: row['submissions'] for row in rows})
@@ -1,86 +1,35 @@
 import streamlit as st
-from datetime import datetime
 from models import DocumentSubmission
 from config import (
-    REQUIRED_DOCS, DECLINE_REASONS, BASIC_REQUIRED_DOCS,
-    BASE_ADDITIONAL_DOCS, get_pipeline_data
+    DECLINE_REASONS, BASIC_REQUIRED_DOCS, get_pipeline_row
 )
 from email_generators import (
     generate_declined_email,
     generate_not_cleared_email,
     generate_reserved_email
 )
-from utils.history_manager import add_to_history
-
-# ---- Updated Additional Document Logic ----
-def get_additional_docs(has_supplemental: bool = False) -> list:
-    current_year = datetime.today().year
-    applicable_docs = []
-    
-    # Base additional docs (excluding engineer and prior claims unless supplemental received)
-    for doc_name, description in BASE_ADDITIONAL_DOCS:
-        if doc_name not in ["Engineer Inspection", "Prior Claims Experience"]:
-            applicable_docs.append((doc_name, description))
-    
-    # Only add Engineer Inspection and Prior Claims Experience if supplemental is received
-    if has_supplemental:
-        applicable_docs.extend([
-            doc for doc in BASE_ADDITIONAL_DOCS 
-            if doc[0] in ["Engineer Inspection", "Prior Claims Experience"]
-        ])
-    
-    # --- Get relevant state values ---
-    building_age = current_year - st.session_state.year_built
-    roof_age = current_year - st.session_state.roof_replacement
-    stories = st.session_state.stories
-    year_built = st.session_state.year_built  # <--- Fix for NameError
-
-    # Roof Inspection: Required for roofs ≥ 15 years old
-    if roof_age >= 15:
-        applicable_docs.append(
-            ("Roof Condition Inspection", "Provide a current roof inspection for all roofs that are 15+ years old")
-        )
-    
-    # Building Updates: Only for buildings built before 1980
-    if year_built < 1980:
-        applicable_docs.append(
-            ("Building Updates", "Provide documentation confirming the condition, type, and history of any updates to wiring and plumbing systems")
-        )
-    
-    # Structural Inspection: Required for 3+ stories and 30+ years old
-    if stories >= 3 and building_age >= 30:
-        applicable_docs.append(
-            ("Structural Inspection", "Most recent structural or milestone inspection for buildings 3+ stories and 30+ years old")
-        )
-    
-    # Association Docs: Only if not a condo association
-    association_name = st.session_state.association_name.lower()
-    if not any(term in association_name for term in ['condo', 'condominium']):
-        applicable_docs.append(
-            ("Association Documents", "Declarations and Bylaws")
-        )
-    
-    # Additional Loss History: For buildings built 2017 or earlier
-    if year_built <= 2017:
-        applicable_docs.append(
-            ("Additional Loss History", "2017-2020 loss runs, if available")
-        )
-    
-    return applicable_docs
+from utils.history_manager import add_to_history, record_pipeline_row
+from utils.doc_catalog import loss_run_label, loss_run_years
+from utils.document_utils import (
+    additional_doc_label, document_checklist, get_additional_docs, required_loss_runs
+)
+from utils.memo import memoize
+from utils.tracing import traced
+from pages.common import remember_email
 
-def filter_loss_run_years(year_built: int) -> list:
-    current_year = datetime.today().year
-    all_years = []
-    start_year = max(2020, year_built)
-    while start_year < current_year:
-        all_years.append(f"Loss Runs {start_year}-{start_year + 1}")
-        start_year += 1
-    return all_years
+# Emails are pure functions of the form state, so identical submissions reuse the render
+reserved_email = memoize("reserved_email", maxsize=64)(generate_reserved_email)
+not_cleared_email = memoize("not_cleared_email", maxsize=64)(generate_not_cleared_email)
 
+@traced("render_step2")
 def render_step2():
     if 'showing_additional_docs' not in st.session_state:
         st.session_state.showing_additional_docs = False
     
+    # Raised on step 1's Continue, which reruns straight into this step
+    if st.session_state.get('duplicate_warning'):
+        st.warning(st.session_state.duplicate_warning)
+
     st.subheader("Submission Summary")
     col1, col2 = st.columns(2)
     with col1:
@@ -100,17 +49,18 @@ def render_step2():
             st.subheader("Required Documents")
             basic_docs = {doc: st.checkbox(doc) for doc in BASIC_REQUIRED_DOCS}
             st.subheader("Loss Runs")
-            available_loss_runs = filter_loss_run_years(st.session_state.year_built)
+            available_loss_runs = loss_run_years(required_loss_runs(st.session_state.year_built))
+            # Keyed by the period's start year
             loss_run_docs = {}
             if available_loss_runs:
                 col1, col2 = st.columns(2)
                 mid_point = len(available_loss_runs) // 2
                 with col1:
                     for year in available_loss_runs[:mid_point]:
-                        loss_run_docs[year] = st.checkbox(year)
+                        loss_run_docs[year] = st.checkbox(loss_run_label(year))
                 with col2:
                     for year in available_loss_runs[mid_point:]:
-                        loss_run_docs[year] = st.checkbox(year)
+                        loss_run_docs[year] = st.checkbox(loss_run_label(year))
             continue_button = st.form_submit_button("Continue to Additional Documents")
             if continue_button:
                 st.session_state.basic_docs = basic_docs
@@ -123,16 +73,22 @@ def render_step2():
             for doc, received in st.session_state.basic_docs.items():
                 if received:
                     st.write(f"- {doc}")
-            for doc, received in st.session_state.loss_run_docs.items():
+            for year, received in st.session_state.loss_run_docs.items():
                 if received:
-                    st.write(f"- {doc}")
+                    st.write(f"- {loss_run_label(year)}")
             st.markdown("---")
             st.subheader("Additional Documents")
             has_supplemental = st.session_state.basic_docs.get("Supplemental Application", False)
-            additional_docs = get_additional_docs(has_supplemental)
+            additional_docs = get_additional_docs(
+                year_built=st.session_state.year_built,
+                roof_replacement=st.session_state.roof_replacement,
+                stories=st.session_state.stories,
+                association_name=st.session_state.association_name,
+                has_supplemental=has_supplemental
+            )
             received_additional_docs = {}
             for doc_name, description in additional_docs:
-                label = f"{doc_name}: {description}" if description else doc_name
+                label = additional_doc_label(doc_name, description)
                 received_additional_docs[label] = st.checkbox(label)
             col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
             with col1:
@@ -150,19 +106,24 @@ def render_step2():
             elif decline_button:
                 st.session_state.showing_decline_reasons = True
             elif submit_button:
-                received_docs = {**st.session_state.basic_docs, **st.session_state.loss_run_docs}
-                doc_submission = DocumentSubmission(
-                    required_docs=received_docs,
-                    additional_docs=received_additional_docs
+                checklist = document_checklist(
+                    year_built=st.session_state.year_built,
+                    roof_replacement=st.session_state.roof_replacement,
+                    stories=st.session_state.stories,
+                    association_name=st.session_state.association_name,
+                    has_supplemental=has_supplemental
+                ).receive(
+                    doc for doc, received in {**st.session_state.basic_docs, **received_additional_docs}.items()
+                    if received
+                ).receive_loss_runs(
+                    year for year, received in st.session_state.loss_run_docs.items() if received
                 )
-                if doc_submission.is_complete():
-                    outcome = "Reserved"
-                elif st.session_state.year_built >= 1980:
-                    outcome = "Not Cleared - RFI"
-                else:
-                    outcome = "Not Cleared - OOA"
+                doc_submission = DocumentSubmission(checklist=checklist)
+                received_docs = doc_submission.required_docs
+                received_additional_docs = doc_submission.additional_docs
+                outcome = doc_submission.get_outcome(st.session_state.year_built)
                 if outcome == "Reserved":
-                    email_body = generate_reserved_email(
+                    email_body = reserved_email(
                         association_name=st.session_state.association_name,
                         agency=st.session_state.agency,
                         year_built=st.session_state.year_built,
@@ -174,9 +135,11 @@ def render_step2():
                         effective_date=st.session_state.effective_date
                     )
                     st.success("### Submission Outcome: Reserved")
-                    add_to_history(st.session_state.association_name, st.session_state.agency, "Reserved")
+                    add_to_history(
+                        st.session_state.association_name, st.session_state.agency, "Reserved", documents=checklist
+                    )
                 else:
-                    email_body = generate_not_cleared_email(
+                    email_body = not_cleared_email(
                         association_name=st.session_state.association_name,
                         agency=st.session_state.agency,
                         year_built=st.session_state.year_built,
@@ -187,9 +150,12 @@ def render_step2():
                         received_additional_docs=received_additional_docs
                     )
                     st.warning(f"### Submission Outcome: {outcome}")
-                    add_to_history(st.session_state.association_name, st.session_state.agency, outcome)
+                    add_to_history(
+                        st.session_state.association_name, st.session_state.agency, outcome, documents=checklist
+                    )
                 st.text_area("Generated Email", email_body, height=400)
-                pipeline_data = get_pipeline_data(
+                remember_email("reserved" if outcome == "Reserved" else "not_cleared", outcome, email_body)
+                pipeline_row = get_pipeline_row(
                     effective_date=st.session_state.effective_date,
                     association_name=st.session_state.association_name,
                     agency=st.session_state.agency,
@@ -199,6 +165,8 @@ def render_step2():
                     tiv=st.session_state.tiv,
                     submission_status=outcome
                 )
+                record_pipeline_row(pipeline_row)
+                pipeline_data = "\t".join(pipeline_row)
                 st.text_input(
                     "Pipeline Data (Click to select, then Ctrl+C to copy)",
                     value=pipeline_data,
@@ -230,6 +198,7 @@ def show_decline_reasons_selection():
             )
             st.error("### Submission Outcome: Declined")
             st.text_area("Generated Email", email_body, height=400)
+            remember_email("declined", "Declined", email_body)
             st.session_state.showing_decline_reasons = False
             add_to_history(st.session_state.association_name, st.session_state.agency, "Declined")
         else:
@@ -0,0 +1,41 @@
+import streamlit as st
+from config import AGENCIES, SUBMISSION_STATUSES, HISTORY_PAGE_SIZE
+from utils.history_manager import get_history_store
+
+
+def render_history_sidebar():
+    """Paginated, filterable submission history in the sidebar"""
+    store = get_history_store()
+    with st.sidebar:
+        st.subheader("Submission History")
+        status = st.selectbox("Status", ["All"] + SUBMISSION_STATUSES, key="history_status")
+        agency = st.selectbox("Agency", ["All"] + AGENCIES, key="history_agency")
+        filters = {
+            'status': None if status == "All" else status,
+            'agency': None if agency == "All" else agency
+        }
+
+        # Stack of page cursors; reset whenever the filters change
+        if st.session_state.get('history_filters') != filters:
+            st.session_state.history_filters = filters
+            st.session_state.history_cursors = [None]
+        cursors = st.session_state.history_cursors
+
+        records, next_cursor = store.page(limit=HISTORY_PAGE_SIZE, after=cursors[-1], **filters)
+        if not records:
+            st.caption("No submissions yet.")
+        for record in records:
+            st.caption(
+                f"{record.created_at:%m/%d %I:%M %p} · {record.association} · "
+                f"{record.agency} · {record.status}"
+            )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Newer", key="history_newer", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Older", key="history_older", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
@@ -1,85 +1,359 @@
 """ACORD PDF parser utility."""
-import pdfplumber
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Tuple
 import re
 from datetime import datetime
 import logging
 
+from utils.parse_cache import ParseCache
+from utils.pdf_utils import PdfSource, open_pdf_stream
+from utils.tracing import span
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction logic changes so cached results are not reused
+PARSER_VERSION = "5"
+
+# How a result was read: straight from the fillable form's fields, from the page
+# text (flattened or scanned forms), or the form fields with the text filling gaps
+PARSE_PATH_FORM = "acroform"
+PARSE_PATH_TEXT = "text"
+PARSE_PATH_MIXED = "acroform+text"
+
+
+def _parse_date(value: str):
+    # Handle different date separators
+    return datetime.strptime(value.replace('-', '/'), '%m/%d/%Y').date()
+
+
+def _parse_tiv(value: str) -> float:
+    return float(value.replace(',', ''))
+
+
+# Field name -> (label pattern, value pattern, converter). The label pattern is what
+# the single-pass scanner looks for; the value pattern is then matched anchored at
+# the label so each field still resolves to the first match on the page.
+FIELD_PATTERNS: Dict[str, Tuple[str, str, Callable[[str], Any]]] = {
+    "association_name": (
+        r"NAMED INSURED",
+        r"NAMED INSURED\s*(.+?)(?=\n|\s{2,}|$)",
+        str.strip
+    ),
+    "effective_date": (
+        r"EFFECTIVE DATE",
+        r"EFFECTIVE DATE\s*(\d{2}[-/]\d{2}[-/]\d{4})",
+        _parse_date
+    ),
+    "construction_type": (
+        r"(?i:CONSTRUCTION)",
+        r"(?i:CONSTRUCTION(?:\s+TYPE)?\s*[:;]?\s*(\w+))",
+        str.upper
+    ),
+    "year_built": (
+        r"(?i:YEAR\s+BUILT)",
+        r"(?i:YEAR\s+BUILT\s*[:;]?\s*(\d{4}))",
+        int
+    ),
+    "stories": (
+        r"(?i:(?:NO\.(?:\s+OF)?|#\s*OF|NUMBER\s+OF)\s+STORIES)",
+        r"(?i:(?:NO\.(?:\s+OF)?|#\s*OF|NUMBER\s+OF)\s+STORIES\s*[:;]?\s*(\d+))",
+        int
+    ),
+    "tiv": (
+        r"(?i:TOTAL\s+(?:INSURABLE\s+)?VALUE)",
+        r"(?i:TOTAL\s+(?:INSURABLE\s+)?VALUE\s*[:;]?\s*\$?\s*([\d,]+))",
+        _parse_tiv
+    ),
+}
+
+
+def _parse_form_construction(value: str) -> str:
+    match = re.match(r"\w+", value.strip())
+    if not match:
+        raise ValueError(value)
+    return match.group(0).upper()
+
+
+# Field name -> (AcroForm field names, converter). Names are matched on the
+# terminal part of the fully qualified field name, ignoring case, punctuation and
+# "[0]" index suffixes, so "form1[0].Page1[0].NamedInsured_FullName_A[0]" matches
+# "NamedInsured_FullName_A". ACORD's own names come first, then common plain ones.
+FORM_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[str], Any]]] = {
+    "association_name": (
+        ("NamedInsured_FullName_A", "NamedInsured_FullName", "NamedInsured", "InsuredName", "ApplicantName"),
+        str.strip
+    ),
+    "effective_date": (
+        ("Policy_EffectiveDate_A", "Policy_EffectiveDate", "EffectiveDate", "ProposedEffectiveDate"),
+        lambda value: _parse_date(value.strip())
+    ),
+    "construction_type": (
+        ("Construction_BuildingConstructionCode_A", "Construction_ConstructionCode_A", "ConstructionType",
+         "Construction"),
+        _parse_form_construction
+    ),
+    "year_built": (
+        ("Construction_BuildingYearBuilt_A", "Construction_YearBuilt_A", "YearBuilt"),
+        lambda value: int(value.strip())
+    ),
+    "stories": (
+        ("Construction_StoreyCount_A", "Construction_StoriesCount_A", "NumberOfStories", "Stories"),
+        lambda value: int(value.strip())
+    ),
+    "tiv": (
+        ("CommercialProperty_Premises_TotalInsurableValueAmount_A", "TotalInsurableValueAmount_A",
+         "TotalInsurableValue", "TotalValue", "TIV"),
+        lambda value: _parse_tiv(value.replace("$", "").strip())
+    ),
+}
+
+
+def _form_key(name: str) -> str:
+    terminal = re.sub(r"\[\d+\]", "", name).rsplit(".", 1)[-1]
+    return re.sub(r"[^0-9a-z]", "", terminal.lower())
+
+
+# Normalized form field name -> (field, preference); lower preference wins
+_FORM_NAMES = {
+    _form_key(form_name): (name, rank)
+    for name, (form_names, _) in FORM_FIELDS.items()
+    for rank, form_name in enumerate(form_names)
+}
+
+
+def read_form_values(document) -> Dict[str, str]:
+    """
+    Fully qualified name -> text value of every filled AcroForm field, in document
+    order. Reads only the catalog's field tree (no page content), so it costs the
+    same on a 2-page form as on a 500-page packet. Empty for forms without fields.
+    """
+    from pdfminer.pdftypes import resolve1
+    from pdfminer.psparser import PSLiteral
+    from pdfminer.utils import decode_text
+
+    acroform = resolve1(document.catalog.get("AcroForm"))
+    if not isinstance(acroform, dict):
+        return {}
+
+    values: Dict[str, str] = {}
+    queue = [(ref, "") for ref in resolve1(acroform.get("Fields")) or []]
+    seen = set()
+    index = 0
+    while index < len(queue):
+        ref, parent = queue[index]
+        index += 1
+        field = resolve1(ref)
+        if not isinstance(field, dict) or id(field) in seen:
+            continue
+        seen.add(id(field))
+
+        partial = field.get("T")
+        if isinstance(partial, bytes):
+            partial = decode_text(partial)
+        name = f"{parent}.{partial}" if parent and partial else (partial or parent)
+        value = resolve1(field.get("V"))
+        if isinstance(value, bytes):
+            value = decode_text(value)
+        elif isinstance(value, PSLiteral):
+            # Checkbox and radio states (/Off, /Yes) carry no field values we read
+            value = None
+        if name and isinstance(value, str) and value.strip():
+            values.setdefault(name, value)
+        queue.extend((kid, name) for kid in resolve1(field.get("Kids")) or [])
+    return values
+
+
+def fields_from_form(values: Dict[str, str]) -> Dict[str, Any]:
+    """ACORD fields from AcroForm values; the most specific matching field name wins"""
+    best: Dict[str, Tuple[int, str]] = {}
+    for form_name, value in values.items():
+        match = _FORM_NAMES.get(_form_key(form_name))
+        if match is not None:
+            name, rank = match
+            if name not in best or rank < best[name][0]:
+                best[name] = (rank, value)
+
+    data = {}
+    for name in FIELD_PATTERNS:
+        if name not in best:
+            continue
+        value = best[name][1]
+        try:
+            data[name] = FORM_FIELDS[name][1](value)
+        except ValueError:
+            logger.warning(f"Could not parse form field {name}: {value}")
+    return data
+
+
+# One alternation over every label, with a named group per field
+_LABEL_SCANNER = re.compile(
+    "|".join(f"(?P<{name}>{label})" for name, (label, _, _) in FIELD_PATTERNS.items())
+)
+_VALUE_PATTERNS = {
+    name: (re.compile(value), convert)
+    for name, (_, value, convert) in FIELD_PATTERNS.items()
+}
+
+# Cheap first-pass page classifier: ACORD forms carry the form number or title in
+# the header/footer strip, so only those strips are checked before full extraction.
+HEADER_STRIP_RATIO = 0.12
+_FORM_KEYWORDS = re.compile(
+    r"ACORD\s*(?P<form>125|140)\b|(?P<title_125>COMMERCIAL INSURANCE APPLICATION)|(?P<title_140>PROPERTY SECTION)",
+    re.I
+)
+
+
+def classify_page(page) -> Optional[str]:
+    """
+    Returns "125" or "140" if the page looks like an ACORD 125/140 page, else None.
+    """
+    x0, top, x1, bottom = page.bbox
+    strip = (bottom - top) * HEADER_STRIP_RATIO
+    for bbox in ((x0, top, x1, top + strip), (x0, bottom - strip, x1, bottom)):
+        match = _FORM_KEYWORDS.search(page.crop(bbox).extract_text() or "")
+        if match:
+            if match.group("form"):
+                return match.group("form")
+            return "125" if match.group("title_125") else "140"
+    return None
+
+
+@dataclass
+class PageReport:
+    """Which pages of a packet were classified, parsed or skipped."""
+    total_pages: int = 0
+    forms: Dict[int, str] = field(default_factory=dict)
+    parsed_pages: List[int] = field(default_factory=list)
+    skipped_pages: List[int] = field(default_factory=list)
+    fallback: bool = False
+    form_fields: List[str] = field(default_factory=list)
+
+    @property
+    def unread_pages(self) -> int:
+        """Pages never reached because every field was already found"""
+        return self.total_pages - len(self.parsed_pages) - len(self.skipped_pages)
+
+    def summary(self) -> str:
+        text = (
+            f"{len(self.parsed_pages)} of {self.total_pages} pages parsed, "
+            f"{len(self.skipped_pages)} skipped, {self.unread_pages} not read"
+        )
+        if self.fallback:
+            text += " (no ACORD 125/140 pages found; parsed all pages)"
+        if self.form_fields:
+            text = f"{len(self.form_fields)} fields from form fields; " + text
+        return text
+
+
 class AcordParser:
     """Parser for ACORD 125/140 forms."""
-    
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
+
+    def __init__(self, source: PdfSource, cache: Optional[ParseCache] = None):
+        """
+        source may be a path, bytes/bytearray/memoryview, or a binary file-like
+        object such as a Streamlit UploadedFile.
+        """
+        self.source = source
+        self.cache = cache
+        self.cache_hit = False
+        self.page_count = 0
+        self.page_report: Optional[PageReport] = None
+        self.parse_path: Optional[str] = None
 
     def extract_fields(self) -> Dict[str, Any]:
         """
         Extracts relevant fields from ACORD PDF.
-        Returns a dictionary of field names and values.
+        Returns a dictionary of field names and values; the first page a field
+        appears on wins, and reading stops once every field has been found.
+        Fillable forms are read from their AcroForm fields without touching page
+        content; page text is only read for fields the form did not supply.
+        Only pages classified as ACORD 125/140 are fully extracted, unless none are
+        found, in which case every page is parsed. parse_path records which way the
+        result was read.
         """
+        self.cache_hit = False
+        with span("AcordParser.extract_fields") as current:
+            data = self._extract()
+            current.set(pages=self.page_count, cache_hit=self.cache_hit, fields=len(data), path=self.parse_path)
+            return data
+
+    def _extract(self) -> Dict[str, Any]:
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                data = {}
-                
-                # Process each page
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    
-                    # Extract fields using regex patterns
-                    data.update(self._extract_named_insured(text))
-                    data.update(self._extract_effective_date(text))
-                    data.update(self._extract_construction(text))
-                    data.update(self._extract_year_built(text))
-                    data.update(self._extract_stories(text))
-                    data.update(self._extract_tiv(text))
-                    
+            with open_pdf_stream(self.source) as stream:
+                if self.cache is None:
+                    return self._parse(stream)
+
+                key = ParseCache.make_key_for_stream(stream, PARSER_VERSION)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.cache_hit = True
+                    self.page_count = cached["page_count"]
+                    self.parse_path = cached["parse_path"]
+                    self.page_report = None
+                    return cached["fields"]
+
+                data = self._parse(stream)
+                self.cache.put(key, {"fields": data, "page_count": self.page_count, "parse_path": self.parse_path})
                 return data
-                
+
         except Exception as e:
             logger.error(f"Error parsing ACORD PDF: {str(e)}")
             raise ValueError(f"Error parsing ACORD PDF: {str(e)}")
 
-    def _extract_named_insured(self, text: str) -> Dict[str, str]:
-        """Extracts the named insured (association name)."""
-        match = re.search(r"NAMED INSURED\s*(.+?)(?=\n|\s{2,})", text)
-        return {"association_name": match.group(1).strip()} if match else {}
+    def _parse(self, stream) -> Dict[str, Any]:
+        # pdfplumber/pdfminer are slow to import, so load them only when a PDF is parsed
+        import pdfplumber
 
-    def _extract_effective_date(self, text: str) -> Dict[str, datetime]:
-        """Extracts the effective date."""
-        match = re.search(r"EFFECTIVE DATE\s*(\d{2}[-/]\d{2}[-/]\d{4})", text)
-        if match:
-            date_str = match.group(1)
-            try:
-                # Handle different date separators
-                date_str = date_str.replace('-', '/')
-                return {"effective_date": datetime.strptime(date_str, '%m/%d/%Y').date()}
-            except ValueError:
-                logger.warning(f"Could not parse date: {date_str}")
-        return {}
+        with pdfplumber.open(stream) as pdf:
+            data = fields_from_form(read_form_values(pdf.doc))
+            self.page_count = len(pdf.pages)
+            report = self.page_report = PageReport(total_pages=self.page_count, form_fields=list(data))
+            if len(data) == len(FIELD_PATTERNS):
+                self.parse_path = PARSE_PATH_FORM
+                return data
+            self.parse_path = PARSE_PATH_MIXED if data else PARSE_PATH_TEXT
 
-    def _extract_construction(self, text: str) -> Dict[str, str]:
-        """Extracts the construction type."""
-        match = re.search(r"CONSTRUCTION(?:\s+TYPE)?\s*[:;]?\s*(\w+)", text, re.I)
-        return {"construction_type": match.group(1).upper()} if match else {}
+            for number, page in enumerate(pdf.pages, start=1):
+                form = classify_page(page)
+                if form is None:
+                    report.skipped_pages.append(number)
+                else:
+                    report.forms[number] = form
+                    report.parsed_pages.append(number)
+                    self._scan_page(page.extract_text() or "", data)
+                # Release pdfplumber's per-page object caches as we go
+                page.close()
+                if len(data) == len(FIELD_PATTERNS):
+                    break
 
-    def _extract_year_built(self, text: str) -> Dict[str, int]:
-        """Extracts the year built."""
-        match = re.search(r"YEAR\s+BUILT\s*[:;]?\s*(\d{4})", text, re.I)
-        return {"year_built": int(match.group(1))} if match else {}
+            if not report.forms:
+                # Not a recognisable ACORD packet; fall back to every page
+                report.fallback = True
+                report.skipped_pages = []
+                for number, page in enumerate(pdf.pages, start=1):
+                    report.parsed_pages.append(number)
+                    self._scan_page(page.extract_text() or "", data)
+                    page.close()
+                    if len(data) == len(FIELD_PATTERNS):
+                        break
 
-    def _extract_stories(self, text: str) -> Dict[str, int]:
-        """Extracts the number of stories."""
-        match = re.search(r"(?:NO\.|NUMBER\s+OF)\s+STORIES\s*[:;]?\s*(\d+)", text, re.I)
-        return {"stories": int(match.group(1))} if match else {}
+            return data
 
-    def _extract_tiv(self, text: str) -> Dict[str, float]:
-        """Extracts the Total Insurable Value."""
-        match = re.search(r"TOTAL\s+(?:INSURABLE\s+)?VALUE\s*[:;]?\s*\$?\s*([\d,]+)", text, re.I)
-        if match:
+    def _scan_page(self, text: str, data: Dict[str, Any]) -> None:
+        """
+        Walks the page text once, filling in any fields not already in data.
+        """
+        for label in _LABEL_SCANNER.finditer(text):
+            name = label.lastgroup
+            if name in data:
+                continue
+            pattern, convert = _VALUE_PATTERNS[name]
+            match = pattern.match(text, label.start())
+            if not match:
+                continue
             try:
-                value = float(match.group(1).replace(',', ''))
-                return {"tiv": value}
+                data[name] = convert(match.group(1))
             except ValueError:
-                logger.warning(f"Could not parse TIV value: {match.group(1)}")
-        return {}
\ No newline at end of file
+                logger.warning(f"Could not parse {name}: {match.group(1)}")
+            if len(data) == len(FIELD_PATTERNS):
+                return
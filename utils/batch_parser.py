@@ -0,0 +1,153 @@
+"""Batch ACORD parsing across a process pool."""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from utils.acord_parser import AcordParser, PageReport
+from utils.parse_cache import ParseCache
+
+
+@dataclass
+class BatchResult:
+    """Outcome of parsing a single PDF in a batch run."""
+    path: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    pages: int = 0
+    seconds: float = 0.0
+    report: Optional[PageReport] = None
+    cached: bool = False
+    parse_path: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def collect_pdf_paths(source: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Expand a directory or an iterable of paths into a sorted list of PDF paths
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.isdir(source):
+            return sorted(
+                os.path.join(source, name)
+                for name in os.listdir(source)
+                if name.lower().endswith(".pdf")
+            )
+        return [os.fspath(source)]
+    return [os.fspath(path) for path in source]
+
+
+def _parse_one(path: str, cache: Optional[ParseCache] = None) -> BatchResult:
+    """Worker entry point; never raises so one bad file can't stop the batch."""
+    start = time.perf_counter()
+    parser = AcordParser(path, cache=cache)
+    try:
+        data = parser.extract_fields()
+        error = None
+    except Exception as e:
+        data = {}
+        error = str(e)
+    return BatchResult(
+        path=path,
+        data=data,
+        error=error,
+        pages=parser.page_count,
+        seconds=time.perf_counter() - start,
+        report=parser.page_report,
+        cached=parser.cache_hit,
+        parse_path=parser.parse_path
+    )
+
+
+def parse_batch(
+    source: Union[str, Iterable[str]],
+    workers: Optional[int] = None,
+    cache: Optional[ParseCache] = None
+) -> Iterator[BatchResult]:
+    """
+    Parse many ACORD PDFs across a process pool, yielding results as each file finishes.
+    Per-file errors are reported on the result instead of being raised.
+    If a cache is given, each worker reads and writes it (it is safe to share).
+    """
+    paths = collect_pdf_paths(source)
+    if not paths:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            yield _parse_one(path, cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = {pool.submit(_parse_one, path, cache): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. killed by the OS)
+                yield BatchResult(path=futures[future], error=f"Worker failed: {e}")
+
+
+def format_throughput(files: int, pages: int, seconds: float) -> str:
+    """Format a throughput summary line for a batch run"""
+    seconds = max(seconds, 1e-9)
+    return (
+        f"{files} files, {pages} pages in {seconds:.2f}s "
+        f"({files / seconds:.1f} files/sec, {pages / seconds:.1f} pages/sec)"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse a directory or list of ACORD PDFs in parallel.")
+    parser.add_argument("paths", nargs="+", help="PDF files or a directory of PDFs")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--cache", action="store_true", help="Reuse results from the on-disk parse cache")
+    args = parser.parse_args(argv)
+
+    sources = args.paths[0] if len(args.paths) == 1 else args.paths
+    cache = ParseCache() if args.cache else None
+    files = pages = report_pages = parsed_pages = cached = failures = 0
+    parse_paths: Dict[str, int] = {}
+    start = time.perf_counter()
+    for result in parse_batch(sources, workers=args.workers, cache=cache):
+        files += 1
+        pages += result.pages
+        if result.parse_path:
+            parse_paths[result.parse_path] = parse_paths.get(result.parse_path, 0) + 1
+        if result.report:
+            report_pages += result.report.total_pages
+            parsed_pages += len(result.report.parsed_pages)
+        if result.cached:
+            cached += 1
+            print(f"CACHE {result.path} ({result.pages} pages, {result.seconds:.3f}s): {result.data}")
+        elif result.ok:
+            print(
+                f"OK    {result.path} ({result.report.summary()}, {result.seconds:.2f}s): {result.data}"
+            )
+        else:
+            failures += 1
+            print(f"ERROR {result.path}: {result.error}")
+
+    print(format_throughput(files, pages, time.perf_counter() - start))
+    if report_pages:
+        print(
+            f"{parsed_pages} of {report_pages} pages fully parsed "
+            f"({report_pages - parsed_pages} skipped or not read)"
+        )
+    if parse_paths:
+        print("Read via " + ", ".join(f"{path}: {count}" for path, count in sorted(parse_paths.items())))
+    if cache is not None:
+        print(f"{cached} of {files} files served from cache")
+    if failures:
+        print(f"{failures} file(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+"""Vectorized clearance of many submissions at once over a pandas DataFrame."""
+from datetime import date
+from typing import List, Optional
+
+import pandas as pd
+
+from utils.reference_data import encode_frame
+from utils.rule_engine import ENGINE, REASONS
+
+# Matrix column -> decline reason, in the order the rule engine reports them
+REASON_COLUMNS = REASONS
+
+
+def decline_matrix(df: pd.DataFrame, today: Optional[date] = None, capacity=None) -> pd.DataFrame:
+    """
+    Evaluate every clearance rule as a column operation.
+    Returns a boolean DataFrame (one column per rule in REASON_COLUMNS) aligned to df.
+    Agency and construction type are compared as reference-table categoricals, so
+    alias spellings match and each comparison is an integer code test.
+    With a CapacityTracker, each row is also checked against current regional capacity.
+    """
+    return ENGINE.evaluate_frame(encode_frame(df), today, capacity)
+
+
+def clear_submissions(df: pd.DataFrame, today: Optional[date] = None, capacity=None) -> pd.DataFrame:
+    """
+    Clear a DataFrame of submissions in bulk.
+    Returns the decline-reason matrix plus an "outcome" column ("Declined" or "Cleared").
+    """
+    matrix = decline_matrix(df, today, capacity)
+    matrix["outcome"] = matrix.any(axis=1).map({True: "Declined", False: "Cleared"})
+    return matrix
+
+
+def reasons_from_matrix(matrix: pd.DataFrame) -> List[List[str]]:
+    """Expand a decline-reason matrix back into per-row reason lists, as validate() returns"""
+    columns = list(REASON_COLUMNS)
+    flags = matrix[columns].to_numpy()
+    texts = [REASON_COLUMNS[col] for col in columns]
+    return [[text for text, hit in zip(texts, row) if hit] for row in flags]
@@ -0,0 +1,128 @@
+"""
+Running totals of reserved business per region and construction type, checked
+against the per-region caps in config.py.
+"""
+import math
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from config import REGION_TIV_CAPS, REGION_ACCOUNT_CAPS
+
+# Status whose submissions count against regional capacity
+RESERVED_STATUS = "Reserved"
+
+
+@dataclass
+class CapacityCell:
+    accounts: int = 0
+    tiv: float = 0.0
+
+
+@dataclass
+class RegionCapacity:
+    """One region's reserved totals against its caps; a None cap means uncapped"""
+    region: str
+    accounts: int
+    tiv: float
+    account_cap: Optional[int]
+    tiv_cap: Optional[float]
+    by_construction: Dict[str, CapacityCell]
+
+    @property
+    def tiv_remaining(self) -> float:
+        return math.inf if self.tiv_cap is None else self.tiv_cap - self.tiv
+
+    @property
+    def accounts_remaining(self) -> float:
+        return math.inf if self.account_cap is None else self.account_cap - self.accounts
+
+
+class CapacityTracker:
+    """
+    Reserved account count and TIV per (region, construction type), with region
+    totals kept alongside so a capacity check is two dict lookups.
+    Built once from the history store's grouped totals, then kept current by
+    add() as each reservation is recorded; nothing rescans the book.
+    """
+
+    def __init__(
+        self,
+        tiv_caps: Mapping[str, Optional[float]] = REGION_TIV_CAPS,
+        account_caps: Mapping[str, Optional[int]] = REGION_ACCOUNT_CAPS
+    ):
+        self.tiv_caps = tiv_caps
+        self.account_caps = account_caps
+        self._cells: Dict[Tuple[str, str], CapacityCell] = defaultdict(CapacityCell)
+        self._regions: Dict[str, CapacityCell] = defaultdict(CapacityCell)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_totals(cls, totals: Iterable[Tuple[str, str, int, float]], **caps) -> "CapacityTracker":
+        """Build from (region, construction_type, accounts, tiv) rows"""
+        tracker = cls(**caps)
+        for region, construction_type, accounts, tiv in totals:
+            tracker.add(region, construction_type, tiv, accounts)
+        return tracker
+
+    def add(self, region: Optional[str], construction_type: Optional[str], tiv: Optional[float],
+            accounts: int = 1) -> None:
+        """Count reserved business against a region; records without a region are ignored"""
+        if not region:
+            return
+        tiv = float(tiv or 0.0)
+        with self._lock:
+            cell = self._cells[(region, construction_type or "Unknown")]
+            cell.accounts += accounts
+            cell.tiv += tiv
+            total = self._regions[region]
+            total.accounts += accounts
+            total.tiv += tiv
+
+    def exceeded(self, region: Optional[str], tiv: float) -> bool:
+        """Whether reserving one more account of this TIV would take the region past a cap"""
+        if not region:
+            return False
+        total = self._regions.get(region)
+        accounts, reserved_tiv = (total.accounts, total.tiv) if total else (0, 0.0)
+        tiv_cap = self.tiv_caps.get(region)
+        account_cap = self.account_caps.get(region)
+        return (
+            (tiv_cap is not None and reserved_tiv + tiv > tiv_cap)
+            or (account_cap is not None and accounts + 1 > account_cap)
+        )
+
+    def exceeded_frame(self, regions, tivs):
+        """Column form of exceeded() over aligned pandas Series of regions and TIVs"""
+        tiv_room = {}
+        account_full = {}
+        for region in set(self.tiv_caps) | set(self.account_caps):
+            status = self.region(region)
+            tiv_room[region] = status.tiv_remaining
+            account_full[region] = status.accounts_remaining < 1
+        regions = regions.astype(object)
+        room = regions.map(tiv_room).astype(float).fillna(math.inf)
+        full = regions.map(account_full).fillna(False).astype(bool)
+        return (tivs.astype(float) > room) | full
+
+    def region(self, region: str) -> RegionCapacity:
+        with self._lock:
+            total = self._regions.get(region, CapacityCell())
+            by_construction = {
+                construction: CapacityCell(cell.accounts, cell.tiv)
+                for (cell_region, construction), cell in self._cells.items() if cell_region == region
+            }
+            return RegionCapacity(
+                region=region,
+                accounts=total.accounts,
+                tiv=total.tiv,
+                account_cap=self.account_caps.get(region),
+                tiv_cap=self.tiv_caps.get(region),
+                by_construction=by_construction
+            )
+
+    def regions(self) -> Dict[str, RegionCapacity]:
+        """Every capped or reserved-in region, for display"""
+        names = sorted(set(self.tiv_caps) | set(self.account_caps) | set(self._regions))
+        return {name: self.region(name) for name in names}
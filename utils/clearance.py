@@ -0,0 +1,104 @@
+"""Headless clearance of a single submission, mirroring render_step1/render_step2."""
+from dataclasses import dataclass, field
+from typing import Iterable, List
+
+from config import get_region_for_county, get_pipeline_row
+from email_generators import (
+    generate_declined_email,
+    generate_not_cleared_email,
+    generate_reserved_email
+)
+from models import PropertySubmission, DocumentSubmission
+from utils.document_utils import document_checklist
+
+
+@dataclass
+class ClearanceResult:
+    outcome: str
+    email: str
+    pipeline_row: List[str]
+    decline_reasons: List[str] = field(default_factory=list)
+
+
+def build_document_submission(submission: PropertySubmission, received: Iterable[str]):
+    """
+    Build the required and additional checklists for a submission, as step 2 shows them.
+    received holds the names of documents on file (e.g. "SOV", "Loss Runs 2022-2023",
+    "Financials"); additional documents match on their name or full checkbox label.
+    """
+    received = {name.strip() for name in received if name.strip()}
+    checklist = document_checklist(
+        year_built=submission.year_built,
+        roof_replacement=submission.roof_replacement,
+        stories=submission.stories,
+        association_name=submission.association_name,
+        has_supplemental="Supplemental Application" in received
+    )
+    return DocumentSubmission(checklist=checklist.receive(received))
+
+
+def clear_submission(submission: PropertySubmission, received: Iterable[str] = ()) -> ClearanceResult:
+    """
+    Run the underwriting rules and document checks for one submission and build
+    the resulting email and pipeline row.
+    """
+    region = get_region_for_county(submission.county)
+    decline_reasons = submission.validate()
+
+    if decline_reasons:
+        outcome = "Declined"
+        email = generate_declined_email(
+            association_name=submission.association_name,
+            agency=submission.agency,
+            year_built=submission.year_built,
+            roof_replacement=submission.roof_replacement,
+            stories=submission.stories,
+            construction_type=submission.construction_type,
+            tiv=submission.tiv,
+            effective_date=submission.effective_date,
+            required_docs={},
+            selected_reasons=decline_reasons
+        )
+    else:
+        doc_submission = build_document_submission(submission, received)
+        outcome = doc_submission.get_outcome(submission.year_built)
+        if outcome == "Reserved":
+            email = generate_reserved_email(
+                association_name=submission.association_name,
+                agency=submission.agency,
+                year_built=submission.year_built,
+                roof_replacement=submission.roof_replacement,
+                stories=submission.stories,
+                county=submission.county,
+                received_docs=doc_submission.required_docs,
+                received_additional_docs=doc_submission.additional_docs,
+                effective_date=submission.effective_date
+            )
+        else:
+            email = generate_not_cleared_email(
+                association_name=submission.association_name,
+                agency=submission.agency,
+                year_built=submission.year_built,
+                roof_replacement=submission.roof_replacement,
+                stories=submission.stories,
+                county=submission.county,
+                received_docs=doc_submission.required_docs,
+                received_additional_docs=doc_submission.additional_docs
+            )
+
+    pipeline_row = get_pipeline_row(
+        effective_date=submission.effective_date,
+        association_name=submission.association_name,
+        agency=submission.agency,
+        region=region,
+        stories=submission.stories,
+        year_built=submission.year_built,
+        tiv=submission.tiv,
+        submission_status=outcome
+    )
+    return ClearanceResult(
+        outcome=outcome,
+        email=email,
+        pipeline_row=pipeline_row,
+        decline_reasons=decline_reasons
+    )
@@ -0,0 +1,294 @@
+"""
+Catalog of clearance documents with stable integer ids, and the bitset checklist
+recording which documents apply to a submission and which were received.
+"""
+import functools
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import (
+    BASIC_REQUIRED_DOCS, BASE_ADDITIONAL_DOCS, CONDITIONAL_ADDITIONAL_DOCS, LOSS_RUN_BASE_YEAR
+)
+
+REQUIRED = "required"
+ADDITIONAL = "additional"
+
+# Each document's id is its bit in a checklist, and checklists are stored with the
+# submission history: add new documents at the end and never reorder or reuse ids.
+# Additional documents are numbered in checkbox order, so iterating a mask in id
+# order lists them the way step 2 shows them.
+_DOCUMENT_ORDER = (
+    "Acord 125/140", "SOV", "Supplemental Application", "Appraisal",
+    "Financials", "Reserve Study", "Board Meeting Minutes (3-5 years)", "Wind Mitigation",
+    "Flood Policy", "Target Premium", "Renewal Premium", "Expiring Premium", "Producer",
+    "Site Map", "Engineer Inspection", "Prior Claims Experience", "Roof Condition Inspection",
+    "Building Updates", "Structural Inspection", "Association Documents", "Additional Loss History"
+)
+
+# Order missing additional documents are listed in by sort_additional_docs
+_PRIORITY_ORDER = (
+    "Building Updates", "Roof Condition Inspection", "Financials", "Reserve Study",
+    "Board Meeting Minutes (3-5 years)", "Wind Mitigation", "Flood Policy", "Target Premium",
+    "Renewal Premium", "Expiring Premium", "Association Documents", "Additional Loss History",
+    "Producer", "Site Map", "Structural Inspection", "Engineer Inspection", "Prior Claims Experience"
+)
+
+# Priority of documents outside the priority order; they sort last
+UNLISTED_PRIORITY = len(_PRIORITY_ORDER)
+
+_LOSS_RUN_PREFIX = "Loss Runs "
+
+# Serialized checklist layout version, written as the first byte
+_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Document:
+    id: int
+    name: str
+    description: str = ""
+    kind: str = ADDITIONAL
+    priority: int = UNLISTED_PRIORITY
+
+    @property
+    def bit(self) -> int:
+        return 1 << self.id
+
+    @property
+    def label(self) -> str:
+        """Checkbox label, as additional_doc_label builds it"""
+        return f"{self.name}: {self.description}" if self.description else self.name
+
+
+class DocumentCatalog:
+    """Documents indexed by id, name and checkbox label"""
+
+    def __init__(self, documents: Iterable[Document]):
+        self.documents = tuple(sorted(documents, key=lambda doc: doc.id))
+        if [doc.id for doc in self.documents] != list(range(len(self.documents))):
+            raise ValueError("Document ids must be 0..n-1 with no gaps")
+        self._by_key = {}
+        for doc in self.documents:
+            self._by_key[doc.name] = doc
+            self._by_key[doc.label] = doc
+        self.required_mask = self.mask(doc.name for doc in self.documents if doc.kind == REQUIRED)
+        self.additional_mask = self.mask(doc.name for doc in self.documents if doc.kind == ADDITIONAL)
+
+    def __getitem__(self, id: int) -> Document:
+        return self.documents[id]
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def get(self, key: str) -> Optional[Document]:
+        """A document by name or checkbox label"""
+        return self._by_key.get(key)
+
+    def mask(self, keys: Iterable[str]) -> int:
+        """Bits of the named documents; raises KeyError for names outside the catalog"""
+        mask = 0
+        for key in keys:
+            mask |= self._by_key[key].bit
+        return mask
+
+    def iter_mask(self, mask: int) -> Iterator[Document]:
+        """Documents whose bits are set, in id order; touches only the set bits"""
+        documents = self.documents
+        while mask:
+            low = mask & -mask
+            yield documents[low.bit_length() - 1]
+            mask ^= low
+
+
+def _build_catalog() -> DocumentCatalog:
+    descriptions = dict(BASE_ADDITIONAL_DOCS + CONDITIONAL_ADDITIONAL_DOCS)
+    priority = {name: rank for rank, name in enumerate(_PRIORITY_ORDER)}
+    required = set(BASIC_REQUIRED_DOCS)
+    return DocumentCatalog(
+        Document(
+            id=id,
+            name=name,
+            description=descriptions.get(name, ""),
+            kind=REQUIRED if name in required else ADDITIONAL,
+            priority=priority.get(name, UNLISTED_PRIORITY)
+        )
+        for id, name in enumerate(_DOCUMENT_ORDER)
+    )
+
+
+CATALOG = _build_catalog()
+
+
+# Loss runs are yearly periods. Bit i of a loss-run mask stands for the period
+# starting in LOSS_RUN_BASE_YEAR + i, so consecutive periods are adjacent bits.
+
+def loss_run_label(start_year: int) -> str:
+    return f"{_LOSS_RUN_PREFIX}{start_year}-{start_year + 1}"
+
+
+# Labels come from a handful of periods, so each is parsed once
+@functools.lru_cache(maxsize=256)
+def parse_loss_run_label(label: str) -> Optional[int]:
+    """Start year of a "Loss Runs YYYY-YYYY" label, or None if label is not one"""
+    if not label.startswith(_LOSS_RUN_PREFIX):
+        return None
+    start, _, end = label[len(_LOSS_RUN_PREFIX):].partition("-")
+    try:
+        return int(start) if int(end) == int(start) + 1 else None
+    except ValueError:
+        return None
+
+
+def loss_run_mask(start_years: Iterable[int]) -> int:
+    mask = 0
+    for year in start_years:
+        if year < LOSS_RUN_BASE_YEAR:
+            raise ValueError(f"Loss run periods start no earlier than {LOSS_RUN_BASE_YEAR}")
+        mask |= 1 << (year - LOSS_RUN_BASE_YEAR)
+    return mask
+
+
+def loss_run_years(mask: int) -> List[int]:
+    """Start years of the periods in a loss-run mask, ascending"""
+    years = []
+    while mask:
+        low = mask & -mask
+        years.append(LOSS_RUN_BASE_YEAR + low.bit_length() - 1)
+        mask ^= low
+    return years
+
+
+def year_intervals(mask: int, base: int = LOSS_RUN_BASE_YEAR) -> List[Tuple[int, int]]:
+    """
+    Consecutive periods in a loss-run mask (bit i = period starting in base + i)
+    merged into (first year, last year) intervals,
+    e.g. 2021-2022, 2022-2023 and 2024-2025 -> [(2021, 2023), (2024, 2025)]
+    """
+    intervals = []
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        run = mask >> start
+        # run + 1 clears the trailing ones and sets the bit just above them
+        length = (~run & (run + 1)).bit_length() - 1
+        intervals.append((base + start, base + start + length))
+        mask &= ~(((1 << length) - 1) << start)
+    return intervals
+
+
+def _write_varint(value: int, out: bytearray) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated document checklist")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+@dataclass(frozen=True)
+class DocumentChecklist:
+    """
+    Which catalog documents and loss-run periods apply to a submission and which
+    were received, as bitmasks. Completeness is a mask test, missing items cost
+    one step per missing item, and the whole state packs into a few bytes.
+    """
+    applicable: int = 0
+    received: int = 0
+    loss_runs: int = 0
+    loss_runs_received: int = 0
+
+    def receive(self, keys: Iterable[str]) -> "DocumentChecklist":
+        """
+        Mark documents received by name or checkbox label. "Loss Runs YYYY-YYYY"
+        labels mark loss-run periods; names that do not apply are ignored.
+        """
+        received, loss_runs_received = self.received, self.loss_runs_received
+        for key in keys:
+            doc = CATALOG.get(key)
+            if doc is not None:
+                received |= doc.bit
+                continue
+            year = parse_loss_run_label(key)
+            if year is not None and year >= LOSS_RUN_BASE_YEAR:
+                loss_runs_received |= 1 << (year - LOSS_RUN_BASE_YEAR)
+        return replace(
+            self,
+            received=received & self.applicable,
+            loss_runs_received=loss_runs_received & self.loss_runs
+        )
+
+    def receive_loss_runs(self, start_years: Iterable[int]) -> "DocumentChecklist":
+        return replace(self, loss_runs_received=(self.loss_runs_received | loss_run_mask(start_years)) & self.loss_runs)
+
+    def has(self, name: str) -> bool:
+        doc = CATALOG.get(name)
+        return doc is not None and bool(self.received & doc.bit)
+
+    @property
+    def missing(self) -> int:
+        return self.applicable & ~self.received
+
+    @property
+    def missing_loss_runs(self) -> int:
+        return self.loss_runs & ~self.loss_runs_received
+
+    def is_complete(self) -> bool:
+        """All required documents and loss-run periods received"""
+        return not (self.missing & CATALOG.required_mask or self.missing_loss_runs)
+
+    def missing_required(self) -> List[Document]:
+        return list(CATALOG.iter_mask(self.missing & CATALOG.required_mask))
+
+    def missing_additional(self) -> List[Document]:
+        """Missing additional documents in checkbox order"""
+        return list(CATALOG.iter_mask(self.missing & CATALOG.additional_mask))
+
+    def missing_loss_run_intervals(self) -> List[Tuple[int, int]]:
+        return year_intervals(self.missing_loss_runs)
+
+    def required_docs(self) -> Dict[str, bool]:
+        """Required checkbox label -> received, basic documents then loss runs"""
+        docs = {
+            doc.label: bool(self.received & doc.bit)
+            for doc in CATALOG.iter_mask(self.applicable & CATALOG.required_mask)
+        }
+        for year in loss_run_years(self.loss_runs):
+            docs[loss_run_label(year)] = bool(self.loss_runs_received >> (year - LOSS_RUN_BASE_YEAR) & 1)
+        return docs
+
+    def additional_docs(self) -> Dict[str, bool]:
+        """Additional checkbox label -> received, in checkbox order"""
+        return {
+            doc.label: bool(self.received & doc.bit)
+            for doc in CATALOG.iter_mask(self.applicable & CATALOG.additional_mask)
+        }
+
+    def to_bytes(self) -> bytes:
+        out = bytearray([_FORMAT_VERSION])
+        for value in (self.applicable, self.received, self.loss_runs, self.loss_runs_received):
+            _write_varint(value, out)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DocumentChecklist":
+        if not data or data[0] != _FORMAT_VERSION:
+            raise ValueError("Unknown document checklist format")
+        values, pos = [], 1
+        for _ in range(4):
+            value, pos = _read_varint(data, pos)
+            values.append(value)
+        return cls(*values)
@@ -1,41 +1,132 @@
 """Utilities for handling document ordering and formatting"""
+from datetime import datetime
 
-def sort_additional_docs(docs_list):
+from config import BASE_ADDITIONAL_DOCS, LOSS_RUN_BASE_YEAR
+from utils.doc_catalog import (
+    CATALOG, UNLISTED_PRIORITY, DocumentChecklist, loss_run_label, loss_run_mask, loss_run_years
+)
+from utils.memo import memoize
+
+SUPPLEMENTAL_ONLY_DOCS = ["Engineer Inspection", "Prior Claims Experience"]
+
+
+def is_condo_association(association_name: str) -> bool:
+    name = association_name.lower()
+    return any(term in name for term in ['condo', 'condominium'])
+
+
+def _additional_docs_key(year_built, roof_replacement, stories, association_name, has_supplemental=False):
+    # Only the condo flag of the name affects the list
+    return (year_built, roof_replacement, stories, is_condo_association(association_name), has_supplemental)
+
+
+@memoize("additional_docs", key=_additional_docs_key)
+def additional_docs_mask(
+    year_built: int,
+    roof_replacement: int,
+    stories: int,
+    association_name: str,
+    has_supplemental: bool = False
+) -> int:
     """
-    Sort additional documents according to predetermined priority order
-    """
-    # Define the order for documents
-    doc_order = [
-        "Building Updates",
-        "Roof Condition Inspection",
-        "Financials",
-        "Reserve Study",
-        "Board Meeting Minutes (3-5 years)",
-        "Wind Mitigation",
-        "Flood Policy",
-        "Target Premium",
-        "Renewal Premium",
-        "Expiring Premium",
-        "Association Documents",
-        "Additional Loss History",
-        "Producer",
-        "Site Map",
-        "Structural Inspection",
-        "Engineer Inspection",
-        "Prior Claims Experience"
+    Catalog bits of the additional documents that apply to a submission
+    """
+    current_year = datetime.today().year
+    building_age = current_year - year_built
+    roof_age = current_year - roof_replacement
+
+    # Base additional docs (excluding engineer and prior claims unless supplemental received)
+    names = [
+        doc_name for doc_name, _ in BASE_ADDITIONAL_DOCS
+        if has_supplemental or doc_name not in SUPPLEMENTAL_ONLY_DOCS
     ]
-    
-    # Create a dictionary mapping doc names to their order
-    order_dict = {name: index for index, name in enumerate(doc_order)}
-    
-    # Sort the documents based on the predefined order
-    def get_sort_key(doc):
-        # Extract the document name (everything before the colon)
-        doc_name = doc.split(':')[0].strip()
-        # Return its position in the order dict, or a large number if not found
-        return order_dict.get(doc_name, len(doc_order))
-    
-    return sorted(docs_list, key=get_sort_key)
+
+    # Roof Inspection: Required for roofs ≥ 15 years old
+    if roof_age >= 15:
+        names.append("Roof Condition Inspection")
+
+    # Building Updates: Only for buildings built before 1980
+    if year_built < 1980:
+        names.append("Building Updates")
+
+    # Structural Inspection: Required for 3+ stories and 30+ years old
+    if stories >= 3 and building_age >= 30:
+        names.append("Structural Inspection")
+
+    # Association Docs: Only if not a condo association
+    if not is_condo_association(association_name):
+        names.append("Association Documents")
+
+    # Additional Loss History: For buildings built 2017 or earlier
+    if year_built <= 2017:
+        names.append("Additional Loss History")
+
+    return CATALOG.mask(names)
+
+
+def get_additional_docs(
+    year_built: int,
+    roof_replacement: int,
+    stories: int,
+    association_name: str,
+    has_supplemental: bool = False
+) -> list:
+    """
+    Build the (name, description) list of additional documents that apply to a submission,
+    in checkbox order
+    """
+    mask = additional_docs_mask(year_built, roof_replacement, stories, association_name, has_supplemental)
+    return [(doc.name, doc.description) for doc in CATALOG.iter_mask(mask)]
+
+
+def additional_doc_label(doc_name: str, description: str) -> str:
+    """Checkbox label for an additional document"""
+    return f"{doc_name}: {description}" if description else doc_name
+
+
+@memoize("loss_run_years")
+def required_loss_runs(year_built: int) -> int:
+    """Loss-run mask of the periods required for a building, starting no earlier than LOSS_RUN_BASE_YEAR"""
+    current_year = datetime.today().year
+    return loss_run_mask(range(max(LOSS_RUN_BASE_YEAR, year_built), current_year))
+
+
+def filter_loss_run_years(year_built: int) -> list:
+    """Loss run period labels required for a building"""
+    return [loss_run_label(year) for year in loss_run_years(required_loss_runs(year_built))]
+
+
+def document_checklist(
+    year_built: int,
+    roof_replacement: int,
+    stories: int,
+    association_name: str,
+    has_supplemental: bool = False
+) -> DocumentChecklist:
+    """Checklist of the documents and loss-run periods that apply to a submission, none received yet"""
+    return DocumentChecklist(
+        applicable=CATALOG.required_mask | additional_docs_mask(
+            year_built, roof_replacement, stories, association_name, has_supplemental
+        ),
+        loss_runs=required_loss_runs(year_built)
+    )
+
+
+# Position of each document in the priority order, built once
+_PRIORITY = {doc.name: doc.priority for doc in CATALOG.documents}
+
+
+def _priority_of(label: str) -> int:
+    # The document name is everything before the colon
+    return _PRIORITY.get(label.split(':', 1)[0].strip(), UNLISTED_PRIORITY)
+
+
+def sort_additional_docs(docs_list):
+    """
+    Sort additional documents according to the catalog's priority order; unknown documents go last
+    """
+    return sorted(docs_list, key=_priority_of)
+
 
 def format_premium_text(premiums_missing):
     """
@@ -1,5 +1,34 @@
+import atexit
 import streamlit as st
 from datetime import datetime
+from utils.pipeline_exporter import row_key
+from utils.history_store import HistoryStore, HistoryRecord
+from utils.name_index import NameIndex
+from utils.capacity import CapacityTracker, RESERVED_STATUS
+from config import NAME_MATCH_THRESHOLD, NAME_MATCH_LIMIT
+
+@st.cache_resource
+def get_history_store() -> HistoryStore:
+    """One durable history store per server process, shared by every session"""
+    store = HistoryStore()
+    atexit.register(store.flush)
+    return store
+
+@st.cache_resource
+def get_name_index() -> NameIndex:
+    """Trigram index of every association name in the history store, built once per process"""
+    index = NameIndex()
+    index.add_many(get_history_store().iter_names())
+    return index
+
+@st.cache_resource
+def get_capacity_tracker() -> CapacityTracker:
+    """Reserved totals per region and construction type, built once per process from the history store"""
+    return CapacityTracker.from_totals(get_history_store().totals_by_region(RESERVED_STATUS))
+
+def find_similar_submissions(association_name):
+    """Previously submitted associations whose names closely match association_name"""
+    return get_name_index().search(association_name, limit=NAME_MATCH_LIMIT, threshold=NAME_MATCH_THRESHOLD)
 
 def initialize_history():
     """Initialize submission history in session state if it doesn't exist"""
@@ -26,7 +55,8 @@ def clear_submission_data():
         'construction_type',
         'showing_decline_reasons',
         'needs_referral',
-        'submission_status'
+        'submission_status',
+        'duplicate_warning'
     ]
     
     # Clear only submission-related keys
@@ -40,16 +70,44 @@ def clear_submission_data():
     # Restore history
     st.session_state.submission_history = current_history
 
-def add_to_history(association_name, agency, status):
-    """Add a submission to the history"""
+def add_to_history(association_name, agency, status, documents=None):
+    """
+    Add a submission to the session history and the durable history store.
+    documents is the submission's DocumentChecklist, if it got as far as step 2.
+    """
     if 'submission_history' not in st.session_state:
         st.session_state.submission_history = []
     
+    now = datetime.now()
     submission = {
-        'timestamp': datetime.now().strftime('%I:%M %p'),
+        'timestamp': now.strftime('%I:%M %p'),
         'association': association_name,
         'agency': agency,
         'status': status
     }
     
-    st.session_state.submission_history.append(submission)
\ No newline at end of file
+    st.session_state.submission_history.append(submission)
+
+    # The rest of the submission details come from the current form state
+    record = HistoryRecord(
+        association=association_name,
+        agency=agency,
+        status=status,
+        created_at=now,
+        county=st.session_state.get('county'),
+        region=st.session_state.get('region'),
+        construction_type=st.session_state.get('construction_type'),
+        tiv=st.session_state.get('tiv'),
+        effective_date=st.session_state.get('effective_date'),
+        documents=documents.to_bytes() if documents is not None else None
+    )
+    get_history_store().add(record)
+    get_name_index().add(association_name, agency)
+    if status == RESERVED_STATUS:
+        get_capacity_tracker().add(record.region, record.construction_type, record.tiv)
+
+def record_pipeline_row(row):
+    """Keep the latest pipeline row per (effective date, insured, agency) for session export"""
+    if 'pipeline_rows' not in st.session_state:
+        st.session_state.pipeline_rows = {}
+    st.session_state.pipeline_rows[row_key(row)] = row
\ No newline at end of file
@@ -0,0 +1,333 @@
+"""Durable, indexed submission history backed by SQLite."""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import HISTORY_DB_PATH, HISTORY_BATCH_SIZE, HISTORY_FLUSH_SECONDS
+from utils import pipeline_cube
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    association TEXT NOT NULL,
+    agency TEXT NOT NULL,
+    status TEXT NOT NULL,
+    county TEXT,
+    region TEXT,
+    construction_type TEXT,
+    tiv REAL,
+    effective_date TEXT,
+    documents BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_created ON submissions(created_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_association ON submissions(association COLLATE NOCASE, created_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_agency ON submissions(agency, created_at);
+CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions(status, created_at);
+"""
+
+# Cursor for keyset pagination: (created_at, id) of the last row on the previous page
+Cursor = Tuple[str, int]
+
+
+@dataclass
+class HistoryRecord:
+    association: str
+    agency: str
+    status: str
+    created_at: datetime = field(default_factory=datetime.now)
+    county: Optional[str] = None
+    region: Optional[str] = None
+    construction_type: Optional[str] = None
+    tiv: Optional[float] = None
+    effective_date: Optional[date] = None
+    # DocumentChecklist.to_bytes() of the documents on file at the outcome
+    documents: Optional[bytes] = None
+    id: Optional[int] = None
+
+    def __post_init__(self):
+        if isinstance(self.effective_date, datetime):
+            self.effective_date = self.effective_date.date()
+
+    @property
+    def timestamp(self) -> str:
+        """Display timestamp, matching the session history format"""
+        return self.created_at.strftime('%I:%M %p')
+
+
+_COLUMNS = [f.name for f in fields(HistoryRecord) if f.name != "id"]
+
+
+def _to_row(record: HistoryRecord) -> tuple:
+    values = []
+    for name in _COLUMNS:
+        value = getattr(record, name)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        values.append(value)
+    return tuple(values)
+
+
+def _from_row(row: sqlite3.Row) -> HistoryRecord:
+    data = dict(row)
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    if data["effective_date"]:
+        data["effective_date"] = date.fromisoformat(data["effective_date"])
+    return HistoryRecord(**data)
+
+
+class HistoryStore:
+    """
+    Submission history in SQLite (WAL mode), shared by every session and process
+    pointed at the same file. Writes are buffered and flushed in batches, either
+    once batch_size records are pending or batch_seconds after the oldest one.
+    A failed flush keeps its records pending for the next attempt.
+    page() does not flush, since the sidebar calls it on every rerun; it merges
+    pending records into the first page instead, so a session still sees its own
+    writes. The other reads flush first.
+    Queries are paginated by (created_at, id) keyset, so each page is an index
+    range scan regardless of how deep into the history it is.
+    Each flushed batch also updates the pipeline cube in the same transaction, so
+    aggregate queries never scan the raw submissions.
+    """
+
+    def __init__(
+        self,
+        path: str = HISTORY_DB_PATH,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        batch_seconds: float = HISTORY_FLUSH_SECONDS
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self._pending: List[HistoryRecord] = []
+        self._oldest_pending = 0.0
+        self._timer: Optional[threading.Timer] = None
+        # _lock guards _pending and the read connection; _flush_lock serializes
+        # flushes, which write through their own connection so a busy database
+        # never holds up readers
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(submissions)")}
+        if "documents" not in columns:
+            # Histories created before document checklists were stored
+            self._conn.execute("ALTER TABLE submissions ADD COLUMN documents BLOB")
+        pipeline_cube.create(self._conn)
+        self._writer = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self) -> None:
+        self.flush()
+        with self._flush_lock, self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._writer.close()
+            self._conn.close()
+
+    def add(self, record: HistoryRecord) -> None:
+        """Queue a record; it is written with the next batch"""
+        with self._lock:
+            if not self._pending:
+                self._oldest_pending = time.monotonic()
+            self._pending.append(record)
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._oldest_pending >= self.batch_seconds
+            )
+            if not due:
+                self._schedule_flush()
+        if due:
+            self._flush_logged()
+
+    def add_many(self, records: List[HistoryRecord]) -> None:
+        """Write many records in one transaction"""
+        with self._lock:
+            self._pending.extend(records)
+        self.flush()
+
+    def _schedule_flush(self) -> None:
+        # Lock held. A batch that never fills is written batch_seconds after its first record.
+        if self._timer is None or not self._timer.is_alive():
+            self._timer = threading.Timer(self.batch_seconds, self._flush_logged)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_logged(self) -> None:
+        """Flush, logging a failure and retrying later instead of raising"""
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            logger.warning(f"History flush failed, {len(self._pending)} records kept for retry: {e}")
+            with self._lock:
+                self._timer = None
+                self._schedule_flush()
+
+    def flush(self) -> None:
+        """
+        Write all pending records in a single transaction. The records leave the
+        buffer only once it commits; on failure they stay pending and the error is raised.
+        _lock is only taken to copy the buffer and around the commit, not while
+        waiting for the database's write lock.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            placeholders = ", ".join("?" for _ in _COLUMNS)
+            try:
+                self._writer.executemany(
+                    f"INSERT INTO submissions ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                    [_to_row(record) for record in pending]
+                )
+                pipeline_cube.apply(self._writer, pending)
+                # Committing and trimming together, so page() never sees a record both
+                # stored and pending; records added meanwhile are after the flushed ones
+                with self._lock:
+                    self._writer.commit()
+                    del self._pending[:len(pending)]
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def _where(self, agency, status, association, since, until) -> Tuple[List[str], list]:
+        clauses, params = [], []
+        if agency:
+            clauses.append("agency = ?")
+            params.append(agency)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if association:
+            clauses.append("association = ? COLLATE NOCASE")
+            params.append(association)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since.isoformat())
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until.isoformat())
+        return clauses, params
+
+    @staticmethod
+    def _matches(record: HistoryRecord, agency, status, association, since, until) -> bool:
+        """The in-memory counterpart of _where, for pending records"""
+        return (
+            (not agency or record.agency == agency)
+            and (not status or record.status == status)
+            and (not association or record.association.casefold() == association.casefold())
+            and (not since or record.created_at >= since)
+            and (not until or record.created_at < until)
+        )
+
+    def page(
+        self,
+        limit: int = 20,
+        after: Optional[Cursor] = None,
+        agency: Optional[str] = None,
+        status: Optional[str] = None,
+        association: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Tuple[List[HistoryRecord], Optional[Cursor]]:
+        """
+        Newest-first page of records matching the filters.
+        Returns the records and the cursor for the next page (None on the last page).
+        Does not flush: matching pending records are merged into the results.
+        """
+        clauses, params = self._where(agency, status, association, since, until)
+        if after is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            # Read the buffer and the table under one lock so a flush cannot show a record twice
+            pending = [
+                record for record in self._pending
+                if self._matches(record, agency, status, association, since, until)
+                and (after is None or record.created_at.isoformat() < after[0])
+            ]
+            rows = self._conn.execute(
+                f"SELECT * FROM submissions {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+        merged = sorted(
+            pending + [_from_row(row) for row in rows],
+            key=lambda record: record.created_at, reverse=True
+        )
+        records = merged[:limit]
+        next_cursor = None
+        if len(merged) > limit:
+            last = records[-1]
+            # Pending records have no id yet; 0 sorts below every stored id
+            next_cursor = (last.created_at.isoformat(), last.id or 0)
+        return records, next_cursor
+
+    def count(
+        self,
+        agency: Optional[str] = None,
+        status: Optional[str] = None,
+        association: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        self.flush()
+        clauses, params = self._where(agency, status, association, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM submissions {where}", params).fetchone()[0]
+
+    def get(self, record_id: int) -> Optional[HistoryRecord]:
+        self.flush()
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM submissions WHERE id = ?", (record_id,)).fetchone()
+        return _from_row(row) if row else None
+
+    def iter_names(self, batch_size: int = 5000) -> Iterator[Tuple[str, str]]:
+        """Every distinct (association, agency) pair, fetched in batches"""
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute("SELECT DISTINCT association, agency FROM submissions")
+            rows = cursor.fetchmany(batch_size)
+        while rows:
+            yield from ((row[0], row[1]) for row in rows)
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+
+    def totals_by_region(self, status: str) -> List[Tuple[str, str, int, float]]:
+        """(region, construction_type, count, total TIV) of every record with this status"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT region, construction_type, COUNT(*), COALESCE(SUM(tiv), 0) FROM submissions"
+                " WHERE status = ? AND region IS NOT NULL GROUP BY region, construction_type",
+                (status,)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def cube(
+        self,
+        group_by: Sequence[str],
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        agency: Optional[str] = None,
+        region: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[Dict]:
+        """Submission count and TIV grouped by any of the pipeline cube dimensions"""
+        self.flush()
+        with self._lock:
+            return pipeline_cube.query(self._conn, group_by, since, until, agency, region, status)
@@ -0,0 +1,119 @@
+"""Bounded LRU memoization for derived state that Streamlit recomputes on every rerun."""
+import functools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+DEFAULT_MAXSIZE = 256
+
+
+@dataclass
+class MemoStats:
+    name: str
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MemoCache:
+    """Thread-safe LRU mapping with hit, miss and eviction counters."""
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_MAXSIZE):
+        self.name = name
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> MemoStats:
+        with self._lock:
+            return MemoStats(self.name, self.hits, self.misses, self.evictions, len(self._data), self.maxsize)
+
+
+_REGISTRY: Dict[str, MemoCache] = {}
+_MISSING = object()
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable form of value; dicts keep their insertion order, which emails depend on"""
+    if isinstance(value, dict):
+        return tuple((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
+def memoize(
+    name: Optional[str] = None,
+    maxsize: int = DEFAULT_MAXSIZE,
+    key: Optional[Callable[..., Hashable]] = None
+) -> Callable[[Callable], Callable]:
+    """
+    Decorator caching a function's results in a named, bounded LRU.
+
+    The key is key(*args, **kwargs) when given (use it to reduce the inputs to the
+    ones that matter), otherwise every argument frozen. Today's date is always part
+    of the key, since loss run years, ages and deadlines all move with it.
+    List results are copied on the way out so callers cannot mutate the cached value.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = _REGISTRY.setdefault(name or func.__qualname__, MemoCache(name or func.__qualname__, maxsize))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            inputs = key(*args, **kwargs) if key else (freeze(args), freeze(kwargs))
+            cache_key = (date.today(), inputs)
+            result = cache.get(cache_key, _MISSING)
+            if result is _MISSING:
+                result = func(*args, **kwargs)
+                cache.put(cache_key, result)
+            return list(result) if isinstance(result, list) else result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def memo_stats() -> List[MemoStats]:
+    """Counters for every memoized function, for the debug panel"""
+    return [cache.stats() for cache in _REGISTRY.values()]
+
+
+def clear_memos() -> None:
+    for cache in _REGISTRY.values():
+        cache.clear()
@@ -0,0 +1,121 @@
+"""In-memory trigram index for finding near-duplicate association names."""
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Generic words that say nothing about which association it is
+_GENERIC_WORDS = {
+    "the", "of", "at", "a", "an", "and", "inc", "incorporated", "llc", "corp", "corporation",
+    "association", "assn", "assoc", "condominium", "condominiums", "condo", "condos",
+    "homeowners", "homeowner", "owners", "hoa", "coa", "poa", "council", "property", "properties",
+}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip punctuation and drop generic words like "Condominium Association, Inc." """
+    tokens = _NON_ALNUM.sub(" ", name.lower()).split()
+    meaningful = [t for t in tokens if t not in _GENERIC_WORDS]
+    return " ".join(meaningful or tokens)
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class NameMatch:
+    name: str
+    score: float
+    agencies: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class _Entry:
+    name: str
+    agencies: Set[str]
+
+
+class NameIndex:
+    """
+    Trigram inverted index over association names with incremental inserts.
+    Each distinct normalized name is one entry; postings are int arrays.
+    Queries score by Dice similarity and use prefix filtering: a match above the
+    threshold must share one of the query's rarest trigrams, so only those
+    postings produce candidates and the common ones just top up their counts.
+    """
+
+    def __init__(self):
+        self._entries: List[_Entry] = []
+        self._sizes = array("H")
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str, agency: Optional[str] = None) -> None:
+        normalized = normalize_name(name)
+        if not normalized:
+            return
+        with self._lock:
+            entry_id = self._ids.get(normalized)
+            if entry_id is None:
+                entry_id = len(self._entries)
+                self._ids[normalized] = entry_id
+                grams = trigrams(normalized)
+                self._entries.append(_Entry(name=name, agencies=set()))
+                self._sizes.append(min(len(grams), 0xFFFF))
+                for gram in grams:
+                    postings = self._postings.get(gram)
+                    if postings is None:
+                        postings = self._postings[gram] = array("I")
+                    postings.append(entry_id)
+            if agency:
+                self._entries[entry_id].agencies.add(agency)
+
+    def add_many(self, names: Iterable[Tuple[str, Optional[str]]]) -> None:
+        for name, agency in names:
+            self.add(name, agency)
+
+    def search(self, name: str, limit: int = 5, threshold: float = 0.6) -> List[NameMatch]:
+        """Ranked near-duplicates of name with Dice similarity >= threshold"""
+        grams = trigrams(normalize_name(name))
+        if not grams:
+            return []
+
+        with self._lock:
+            postings = self._postings
+            ordered = sorted(grams, key=lambda g: len(postings.get(g, ())))
+            # Fewest shared trigrams any match above threshold can have
+            min_overlap = math.ceil(threshold * len(grams) / (2 - threshold))
+            prefix_length = max(len(grams) - min_overlap + 1, 1)
+
+            counts = Counter(chain.from_iterable(postings.get(gram, ()) for gram in ordered[:prefix_length]))
+            candidates = set(counts)
+            for gram in ordered[prefix_length:]:
+                counts.update(filter(candidates.__contains__, postings.get(gram, ())))
+
+            query_size = len(grams)
+            scored = []
+            for entry_id, overlap in counts.items():
+                score = 2 * overlap / (query_size + self._sizes[entry_id])
+                if score >= threshold:
+                    scored.append((score, entry_id))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+
+            return [
+                NameMatch(
+                    name=self._entries[entry_id].name,
+                    score=round(score, 3),
+                    agencies=set(self._entries[entry_id].agencies)
+                )
+                for score, entry_id in scored[:limit]
+            ]
@@ -0,0 +1,499 @@
+"""
+Durable outbound email queue, sent by an asyncio worker over a pooled SMTP connection.
+
+    outbox = Outbox()
+    outbox.start()
+    outbox.enqueue("agent@example.com", "Palm Shores - Declined", body)
+
+enqueue() is a local SQLite insert plus a wake-up, so it never blocks on the
+network. A background thread runs an asyncio loop that claims due messages in
+batches and sends them over one reused SMTP connection; the blocking smtplib
+calls run on a single-thread executor that owns the connection. Failures are
+retried with exponential backoff and jitter up to OUTBOX_MAX_ATTEMPTS, except
+permanent (5xx) rejections. Each message has an idempotency key (by default a
+hash of recipient, subject and body): queueing the same key again is a no-op,
+and the key is used as the Message-ID so downstream systems can dedupe too.
+Workers claim a batch atomically and hold it for OUTBOX_LEASE_SECONDS, so several
+server processes can share one outbox; a batch whose worker died is claimed
+again once its lease runs out.
+
+A local SMTP sink for testing: python -m utils.outbox sink --port 1025
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.message import EmailMessage
+from email.utils import formatdate
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_STARTTLS, SMTP_FROM, SMTP_IDLE_SECONDS,
+    OUTBOX_DB_PATH, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, OUTBOX_BACKOFF_SECONDS, OUTBOX_MAX_BACKOFF_SECONDS,
+    OUTBOX_LEASE_SECONDS
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL DEFAULT '',
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at);
+"""
+
+STATUSES = ("queued", "sending", "sent", "failed")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxMessage:
+    key: str
+    kind: str
+    recipient: str
+    subject: str
+    body: str
+    status: str = "queued"
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    last_error: Optional[str] = None
+    created_at: float = 0.0
+    sent_at: Optional[float] = None
+    # When the current worker claimed it; identifies the claim while status is 'sending'
+    claimed_at: Optional[float] = None
+
+
+def idempotency_key(recipient: str, subject: str, body: str) -> str:
+    return hashlib.sha256("\x1f".join((recipient, subject, body)).encode("utf-8")).hexdigest()[:32]
+
+
+class SmtpPool:
+    """
+    One reusable SMTP connection, opened lazily, checked with NOOP before reuse
+    after being idle, and reopened once if the server dropped it.
+    Only call from a single thread (the outbox executor).
+    """
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        username: str = SMTP_USERNAME,
+        password: str = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        idle_seconds: float = SMTP_IDLE_SECONDS,
+        timeout: float = 30.0
+    ):
+        self.host, self.port = host, port
+        self.username, self.password = username, password
+        self.starttls = starttls
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._conn: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password)
+        self.connections_opened += 1
+        return conn
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._conn is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            try:
+                if self._conn.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def send(self, message: EmailMessage) -> None:
+        try:
+            self._connection().send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # Stale pooled connection; reconnect once and retry
+            self.close()
+            self._connection().send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._conn = None
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies, and messages that could not be built at all, will not succeed on retry"""
+    if not isinstance(error, (smtplib.SMTPException, OSError)):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    code = getattr(error, "smtp_code", None)
+    return isinstance(code, int) and code >= 500
+
+
+class Outbox:
+    def __init__(
+        self,
+        path: str = OUTBOX_DB_PATH,
+        pool_factory: Callable[[], SmtpPool] = SmtpPool,
+        sender: str = SMTP_FROM,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        backoff_seconds: float = OUTBOX_BACKOFF_SECONDS,
+        max_backoff_seconds: float = OUTBOX_MAX_BACKOFF_SECONDS,
+        lease_seconds: float = OUTBOX_LEASE_SECONDS
+    ):
+        self.path = path
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self._pool_factory = pool_factory
+        self._pool: Optional[SmtpPool] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}
+            if "claimed_at" not in columns:
+                # Outboxes created before claims had leases
+                conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -- producer side (Streamlit script thread) ---------------------------------
+
+    def enqueue(self, recipient: str, subject: str, body: str, kind: str = "", key: Optional[str] = None) -> str:
+        """Queue a message and wake the worker. Returns its idempotency key."""
+        key = key or idempotency_key(recipient, subject, body)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, kind, recipient, subject, body, next_attempt_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, recipient, subject, body, now, now)
+            )
+        self._notify()
+        return key
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _notify(self) -> None:
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def get(self, key: str) -> Optional[OutboxMessage]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM outbox WHERE key = ?", (key,)).fetchone()
+        return OutboxMessage(**dict(row)) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        counts = {status: 0 for status in STATUSES}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def retry_failed(self) -> int:
+        """Put permanently failed messages back in the queue"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE outbox SET status = 'queued', attempts = 0, next_attempt_at = ? WHERE status = 'failed'",
+                (time.time(),)
+            )
+        self._notify()
+        return cursor.rowcount
+
+    # -- worker side -----------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent)"""
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox-smtp")
+        self._thread = threading.Thread(target=self._thread_main, args=(ready,), name="outbox", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish the current batch, close the SMTP connection and stop the worker"""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _thread_main(self, ready: threading.Event) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wake = asyncio.Event()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._executor.submit(self._close_pool).result()
+            self._executor.shutdown()
+            self._loop.close()
+            self._loop = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        errors = 0
+        while not self._stopping:
+            self._wake.clear()
+            batch: List[OutboxMessage] = []
+            try:
+                batch = await loop.run_in_executor(self._executor, self._claim_batch)
+                if batch:
+                    results = await loop.run_in_executor(self._executor, self._send_batch, batch)
+                    await loop.run_in_executor(self._executor, self._record, batch, results)
+                    errors = 0
+                    continue
+                delay = await loop.run_in_executor(self._executor, self._seconds_until_due)
+                errors = 0
+            except Exception:
+                # e.g. "database is locked"; one bad iteration must not end the worker
+                errors += 1
+                delay = self._backoff(errors)
+                logger.exception(f"Outbox worker error; retrying in {delay:.1f}s")
+                if batch:
+                    await loop.run_in_executor(self._executor, self._release, batch, delay)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _claim_batch(self) -> List[OutboxMessage]:
+        """
+        Claim due messages, and messages whose claim outlived its lease, in one
+        UPDATE, so two workers can never claim the same row.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE key IN ("
+                "SELECT key FROM outbox"
+                " WHERE (status = 'queued' AND next_attempt_at <= ?)"
+                " OR (status = 'sending' AND COALESCE(claimed_at, 0) <= ?)"
+                " ORDER BY next_attempt_at LIMIT ?"
+                ") RETURNING *",
+                (now, now, now - self.lease_seconds, self.batch_size)
+            ).fetchall()
+        return sorted((OutboxMessage(**dict(row)) for row in rows), key=lambda message: message.next_attempt_at)
+
+    def _release(self, batch: List[OutboxMessage], delay: float) -> None:
+        """Return a claimed batch to the queue after a worker error; lease expiry does it otherwise"""
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "UPDATE outbox SET status = 'queued', next_attempt_at = ?"
+                    " WHERE key = ? AND status = 'sending' AND claimed_at = ?",
+                    [(time.time() + delay, message.key, message.claimed_at) for message in batch]
+                )
+        except sqlite3.Error:
+            logger.exception("Could not release claimed outbox messages")
+
+    def _seconds_until_due(self) -> float:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MIN(due) FROM ("
+                "SELECT MIN(next_attempt_at) AS due FROM outbox WHERE status = 'queued'"
+                " UNION ALL SELECT MIN(COALESCE(claimed_at, 0)) + ? FROM outbox WHERE status = 'sending'"
+                ")",
+                (self.lease_seconds,)
+            ).fetchone()
+        if row[0] is None:
+            return 60.0
+        return min(max(row[0] - time.time(), 0.0), 60.0)
+
+    def _build(self, message: OutboxMessage) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email["Date"] = formatdate(localtime=True)
+        domain = self.sender.rpartition("@")[2] or "localhost"
+        email["Message-ID"] = f"<{message.key}@{domain}>"
+        email.set_content(message.body)
+        return email
+
+    def _send_batch(self, batch: List[OutboxMessage]) -> List[Optional[Exception]]:
+        """Send each message over the pooled connection; returns the error (or None) per message"""
+        if self._pool is None:
+            self._pool = self._pool_factory()
+        results: List[Optional[Exception]] = []
+        for message in batch:
+            try:
+                email = self._build(message)
+            except (ValueError, TypeError) as e:
+                # e.g. a header with a line break; recorded as a permanent failure
+                results.append(e)
+                continue
+            try:
+                self._pool.send(email)
+                results.append(None)
+            except (smtplib.SMTPException, OSError) as e:
+                self._pool.close()
+                results.append(e)
+        return results
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_seconds * 2 ** (attempts - 1), self.max_backoff_seconds)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _record(self, batch: List[OutboxMessage], results: List[Optional[Exception]]) -> None:
+        now = time.time()
+        sent: List[Tuple] = []
+        retry: List[Tuple] = []
+        failed: List[Tuple] = []
+        for message, error in zip(batch, results):
+            attempts = message.attempts + 1
+            claim = (message.key, message.claimed_at)
+            if error is None:
+                sent.append((attempts, now) + claim)
+            elif _is_permanent(error) or attempts >= self.max_attempts:
+                failed.append((attempts, repr(error)) + claim)
+            else:
+                retry.append((attempts, now + self._backoff(attempts), repr(error)) + claim)
+        # Only rows still under this claim; one reclaimed after its lease ran out belongs to its new worker
+        owned = " WHERE key = ? AND status = 'sending' AND claimed_at = ?"
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE outbox SET status = 'sent', attempts = ?, sent_at = ?, last_error = NULL" + owned, sent
+            )
+            conn.executemany(
+                "UPDATE outbox SET status = 'queued', attempts = ?, next_attempt_at = ?, last_error = ?" + owned,
+                retry
+            )
+            conn.executemany("UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?" + owned, failed)
+
+    def _close_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+
+# -- local SMTP sink for testing ---------------------------------------------------------
+
+
+async def _sink_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, on_message) -> None:
+    writer.write(b"220 clearance-sink ESMTP\r\n")
+    in_data, lines = False, []
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if in_data:
+            if line in (b".\r\n", b".\n"):
+                in_data = False
+                on_message(b"".join(lines).decode("utf-8", "replace"))
+                lines = []
+                writer.write(b"250 OK queued\r\n")
+            else:
+                lines.append(line[1:] if line.startswith(b"..") else line)
+            continue
+        command = line.strip().split(b" ", 1)[0].upper()
+        if command in (b"EHLO", b"HELO"):
+            writer.write(b"250 clearance-sink\r\n")
+        elif command == b"DATA":
+            in_data = True
+            writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+        elif command == b"QUIT":
+            writer.write(b"221 Bye\r\n")
+            await writer.drain()
+            break
+        else:
+            writer.write(b"250 OK\r\n")
+        await writer.drain()
+    writer.close()
+
+
+def run_sink(host: str = "127.0.0.1", port: int = 1025, on_message=None) -> None:
+    """Accept and print every message; never delivers anything"""
+    def show(raw: str) -> None:
+        headers = raw.split("\n\n", 1)[0]
+        print(headers.strip(), end="\n\n", flush=True)
+
+    async def serve() -> None:
+        server = await asyncio.start_server(
+            lambda r, w: _sink_session(r, w, on_message or show), host, port
+        )
+        print(f"SMTP sink listening on {host}:{port}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Outbox utilities")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sink = commands.add_parser("sink", help="Run a local SMTP sink that prints received messages")
+    sink.add_argument("--host", default="127.0.0.1")
+    sink.add_argument("--port", type=int, default=1025)
+    commands.add_parser("status", help="Show message counts by status")
+    commands.add_parser("retry-failed", help="Requeue failed messages")
+    args = parser.parse_args(argv)
+
+    if args.command == "sink":
+        run_sink(args.host, args.port)
+    elif args.command == "status":
+        for status, count in Outbox().counts().items():
+            print(f"{status}: {count}")
+    else:
+        print(f"Requeued {Outbox().retry_failed()} message(s)")
+
+
+if __name__ == "__main__":
+    main()
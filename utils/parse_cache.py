@@ -0,0 +1,217 @@
+"""Persistent, content-addressed cache for parsed ACORD results."""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+from config import PARSE_CACHE_PATH, PARSE_CACHE_MAX_BYTES, PARSE_CACHE_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Lookups are read-only on the common path: hit/miss counts are added to the shared
+# counters with the next put or once this many have built up, and last_access is
+# only refreshed once it is this stale, which is plenty of resolution for LRU eviction
+_COUNTER_SAVE_EVERY = 100
+_ACCESS_RESOLUTION_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0);
+"""
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+class ParseCache:
+    """
+    On-disk cache keyed by SHA-256 of the PDF bytes plus the parser version.
+    Backed by SQLite in WAL mode so several server processes on one host can share it.
+    Entries are evicted least-recently-used once the cache exceeds max_bytes,
+    and dropped outright once older than max_age_days.
+    """
+
+    def __init__(
+        self,
+        path: str = PARSE_CACHE_PATH,
+        max_bytes: int = PARSE_CACHE_MAX_BYTES,
+        max_age_days: float = PARSE_CACHE_MAX_AGE_DAYS
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self._unsaved = {"hits": 0, "misses": 0}
+        # Guards the counters; the cache is one object shared by every session thread
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Parse workers get a copy with fresh counters (and lock), so counts the
+        # parent has not saved yet are not saved twice
+        state = dict(self.__dict__, hits=0, misses=0, _unsaved={"hits": 0, "misses": 0})
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per call keeps the cache safe to use from
+        # Streamlit script threads and separate processes alike.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(content: bytes, version: str) -> str:
+        """Cache key for raw PDF bytes"""
+        digest = hashlib.sha256(content)
+        return f"{digest.hexdigest()}:{version}"
+
+    @staticmethod
+    def make_key_for_stream(stream: BinaryIO, version: str) -> str:
+        """Cache key for a seekable PDF stream, hashed in chunks and rewound"""
+        digest = hashlib.sha256()
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        stream.seek(0)
+        return f"{digest.hexdigest()}:{version}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload for key, or None on a miss"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, created_at, last_access FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.max_age_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+
+            with self._lock:
+                if row is None:
+                    self.misses += 1
+                    self._unsaved["misses"] += 1
+                else:
+                    self.hits += 1
+                    self._unsaved["hits"] += 1
+                due = sum(self._unsaved.values()) >= _COUNTER_SAVE_EVERY
+            if row is not None and now - row[2] > _ACCESS_RESOLUTION_SECONDS:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        if due:
+            with self._saving_counters():
+                pass
+        return None if row is None else json.loads(row[0], object_hook=_decode)
+
+    @contextmanager
+    def _saving_counters(self) -> Iterator[sqlite3.Connection]:
+        """A transaction that also adds the unsaved counts; they are kept if it does not commit"""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {"hits": 0, "misses": 0}
+        try:
+            with self._connect() as conn:
+                yield conn
+                conn.executemany(
+                    "UPDATE counters SET value = value + ? WHERE name = ?",
+                    [(count, name) for name, count in unsaved.items() if count]
+                )
+        except BaseException:
+            with self._lock:
+                for name, count in unsaved.items():
+                    self._unsaved[name] += count
+            raise
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        """Store payload under key and evict entries past the age/size limits"""
+        now = time.time()
+        text = json.dumps(payload, default=_encode)
+        with self._saving_counters() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, text, len(text), now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.max_age_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            stale.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+        logger.info(f"Evicted {len(stale)} ACORD cache entries")
+
+    def clear(self) -> None:
+        """Drop every entry and reset the shared counters"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE counters SET value = 0")
+        with self._lock:
+            self._unsaved = {"hits": 0, "misses": 0}
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit/miss counters for this process and shared totals for the cache file.
+        The totals include this process's unsaved counts but not other processes'.
+        """
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters"))
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        with self._lock:
+            hits, misses, unsaved = self.hits, self.misses, dict(self._unsaved)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "total_hits": counters.get("hits", 0) + unsaved["hits"],
+            "total_misses": counters.get("misses", 0) + unsaved["misses"],
+            "entries": entries,
+            "bytes": size
+        }
@@ -0,0 +1,353 @@
+"""
+Shared, bounded pool of ACORD parse worker processes for the Streamlit server.
+
+Parsing runs in separate processes, so a pathological PDF neither stalls the
+session that uploaded it beyond the job time limit nor holds the GIL other
+sessions need. Admission is bounded: at most workers + queue_size jobs are in
+flight and further submissions wait briefly, then are refused with PoolBusy.
+Admitted jobs wait in the pool's own queue and go to the executor only when a
+worker is free, so a job's time limit starts when it starts running, not while
+it waits behind other jobs.
+Each job runs under a wall-clock alarm and an address-space limit, and workers
+are replaced after max_jobs_per_worker jobs so pdfminer's leaks cannot build up.
+Uploads over PDF_SPILL_THRESHOLD_BYTES reach the workers as temp-file paths
+rather than pickled bytes.
+"""
+import io
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from config import (
+    PARSE_POOL_WORKERS, PARSE_POOL_QUEUE_SIZE, PARSE_POOL_WAIT_SECONDS,
+    PARSE_JOB_TIMEOUT_SECONDS, PARSE_JOB_MEMORY_MB, PARSE_WORKER_MAX_JOBS,
+    PDF_SPILL_THRESHOLD_BYTES
+)
+from utils.parse_cache import ParseCache
+from utils.pdf_utils import PdfSource
+
+# Extra time the caller waits past the job limit before giving up on a worker
+# that could not be interrupted
+_RESULT_GRACE_SECONDS = 5.0
+
+
+class PoolBusy(ValueError):
+    """Every worker and queue slot is taken"""
+
+
+class _JobTimeout(BaseException):
+    # BaseException so the parser's own "except Exception" cannot swallow it
+    pass
+
+
+@dataclass
+class ParseResult:
+    fields: Dict[str, Any]
+    page_count: int = 0
+    parse_path: Optional[str] = None
+    cache_hit: bool = False
+    seconds: float = 0.0
+
+
+@dataclass
+class PoolStats:
+    workers: int
+    capacity: int
+    # Admitted jobs, queued or running
+    in_flight: int = 0
+    queued: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    rejected: int = 0
+    restarts: int = 0
+
+
+@dataclass
+class _Job:
+    args: tuple
+    # Returned to the caller; completed from the executor's future
+    future: Future
+    spilled: Optional[str]
+    # Longest the caller waits for a worker before giving up on the job
+    queue_seconds: float
+    started: threading.Event = field(default_factory=threading.Event)
+    started_at: float = 0.0
+
+
+def _on_alarm(signum, frame):
+    raise _JobTimeout()
+
+
+def _init_worker(memory_limit_mb: int) -> None:
+    """Worker process setup: alarm handler, address-space limit, and a warm pdfplumber import"""
+    signal.signal(signal.SIGALRM, _on_alarm)
+    if memory_limit_mb:
+        try:
+            import resource
+        except ImportError:
+            resource = None
+        if resource is not None:
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    # The first job should not pay for the slow pdfminer import
+    import pdfplumber  # noqa: F401
+
+
+def _parse_job(source, cache: Optional[ParseCache], timeout_seconds: float) -> ParseResult:
+    from utils.acord_parser import AcordParser
+
+    start = time.perf_counter()
+    parser = AcordParser(source, cache=cache)
+    signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        fields = parser.extract_fields()
+    except _JobTimeout:
+        raise ValueError(f"ACORD parsing timed out after {timeout_seconds:g}s")
+    except MemoryError:
+        raise ValueError("ACORD parsing ran out of memory")
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    return ParseResult(
+        fields=fields,
+        page_count=parser.page_count,
+        parse_path=parser.parse_path,
+        cache_hit=parser.cache_hit,
+        seconds=time.perf_counter() - start
+    )
+
+
+def _spill(write_to) -> Tuple[str, str]:
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_to(f)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, path
+
+
+def _discard(path: Optional[str]) -> None:
+    if path is not None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _portable(source: PdfSource, spill_threshold: int = PDF_SPILL_THRESHOLD_BYTES) -> Tuple[Any, Optional[str]]:
+    """
+    A picklable form of source, and the temp file behind it if one was written.
+    Paths stay paths and small buffers become bytes; anything over spill_threshold
+    is written to a temp file and passed by path, so a large upload is neither
+    copied into memory nor pickled to the worker.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source), None
+    if hasattr(source, "getvalue"):
+        # Streamlit's UploadedFile is a BytesIO; getvalue() does not copy an unmodified buffer
+        source = source.getvalue()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        if memoryview(source).nbytes <= spill_threshold:
+            return bytes(source), None
+        return _spill(lambda f: f.write(source))
+    if source.seekable() and source.seek(0, io.SEEK_END) <= spill_threshold:
+        source.seek(0)
+        data = source.read()
+        source.seek(0)
+        return data, None
+    if source.seekable():
+        source.seek(0)
+    return _spill(lambda f: shutil.copyfileobj(source, f))
+
+
+class ParsePool:
+    def __init__(
+        self,
+        workers: int = PARSE_POOL_WORKERS,
+        queue_size: int = PARSE_POOL_QUEUE_SIZE,
+        wait_seconds: float = PARSE_POOL_WAIT_SECONDS,
+        timeout_seconds: float = PARSE_JOB_TIMEOUT_SECONDS,
+        memory_limit_mb: int = PARSE_JOB_MEMORY_MB,
+        max_jobs_per_worker: int = PARSE_WORKER_MAX_JOBS
+    ):
+        self.workers = workers
+        self.wait_seconds = wait_seconds
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._stats = PoolStats(workers=workers, capacity=workers + queue_size)
+        self._queue: Deque[_Job] = deque()
+        self._running = 0
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        # Worker recycling needs a start method other than fork; forkserver also keeps
+        # the server's threads and open sockets out of the workers
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.memory_limit_mb,),
+            max_tasks_per_child=self.max_jobs_per_worker
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace the executor after a worker died; jobs already on it fail"""
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._start()
+                self._stats.restarts += 1
+
+    def submit(self, source: PdfSource, cache: Optional[ParseCache] = None) -> Future:
+        """Queue a parse; raises PoolBusy if no slot frees up within wait_seconds"""
+        return self._enqueue(source, cache).future
+
+    def _enqueue(self, source: PdfSource, cache: Optional[ParseCache]) -> _Job:
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            with self._lock:
+                self._stats.rejected += 1
+            raise PoolBusy("The ACORD parser is busy; please try again in a moment.")
+
+        spilled = None
+        try:
+            portable, spilled = _portable(source)
+        except BaseException:
+            self._slots.release()
+            _discard(spilled)
+            raise
+        with self._lock:
+            # Jobs ahead finish within the time limit, a worker's worth at a time
+            rounds = 1 + (len(self._queue) + self._running) // self.workers
+            job = _Job(
+                args=(portable, cache, self.timeout_seconds),
+                future=Future(),
+                spilled=spilled,
+                queue_seconds=rounds * (self.timeout_seconds + _RESULT_GRACE_SECONDS)
+            )
+            self._queue.append(job)
+            self._stats.in_flight += 1
+        self._dispatch()
+        return job
+
+    def _dispatch(self) -> None:
+        """Hand queued jobs to the executor while workers are free"""
+        while True:
+            with self._lock:
+                if self._running >= self.workers or not self._queue:
+                    return
+                job = self._queue.popleft()
+                if not job.future.set_running_or_notify_cancel():
+                    # Cancelled by the caller while it waited
+                    self._stats.in_flight -= 1
+                    self._release(job)
+                    continue
+                self._running += 1
+                job.started_at = time.monotonic()
+            job.started.set()
+            try:
+                future, executor = self._submit(*job.args)
+            except BaseException as e:
+                self._finished(None, job, None, e)
+                continue
+            future.add_done_callback(lambda done, job=job, executor=executor: self._finished(done, job, executor))
+
+    def _release(self, job: _Job) -> None:
+        self._slots.release()
+        _discard(job.spilled)
+
+    def _cancel_queued(self, job: _Job) -> bool:
+        """Drop a job that has not started yet; False if a worker already has it"""
+        with self._lock:
+            if job not in self._queue:
+                return False
+            self._queue.remove(job)
+            self._stats.in_flight -= 1
+            self._stats.rejected += 1
+        job.future.cancel()
+        self._release(job)
+        return True
+
+    def _submit(self, *args):
+        executor = self._executor
+        try:
+            return executor.submit(_parse_job, *args), executor
+        except BrokenProcessPool:
+            # A worker died since the last job; start a fresh pool and retry once
+            self._restart(executor)
+            executor = self._executor
+            return executor.submit(_parse_job, *args), executor
+
+    def _finished(
+        self,
+        future: Optional[Future],
+        job: _Job,
+        executor: Optional[ProcessPoolExecutor],
+        error: Optional[BaseException] = None
+    ) -> None:
+        if future is not None:
+            if future.cancelled():
+                # Cancelled by a restart after another worker died
+                error = BrokenProcessPool("The parse worker pool was restarted")
+            else:
+                error = future.exception()
+        with self._lock:
+            self._running -= 1
+            self._stats.in_flight -= 1
+            if error is None:
+                self._stats.completed += 1
+            else:
+                self._stats.failed += 1
+                if "timed out" in str(error):
+                    self._stats.timed_out += 1
+        self._release(job)
+        if error is None:
+            job.future.set_result(future.result())
+        else:
+            job.future.set_exception(error)
+        if isinstance(error, BrokenProcessPool) and executor is not None:
+            self._restart(executor)
+        self._dispatch()
+
+    def parse(self, source: PdfSource, cache: Optional[ParseCache] = None) -> ParseResult:
+        """
+        Parse in a worker and wait for the result. Errors, timeouts and memory
+        exhaustion surface as ValueError, like AcordParser.extract_fields.
+        The time limit counts from when a worker takes the job; a job still
+        queued when its turn should long have come is dropped with PoolBusy.
+        """
+        job = self._enqueue(source, cache)
+        if not job.started.wait(job.queue_seconds) and self._cancel_queued(job):
+            raise PoolBusy("The ACORD parser is busy; please try again in a moment.")
+        job.started.wait()
+        remaining = job.started_at + self.timeout_seconds + _RESULT_GRACE_SECONDS - time.monotonic()
+        try:
+            return job.future.result(timeout=max(remaining, 0.0))
+        except BrokenProcessPool:
+            raise ValueError("ACORD parsing failed: the worker process exited (likely out of memory).")
+        except TimeoutError:
+            raise ValueError(f"ACORD parsing timed out after {self.timeout_seconds:g}s")
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(**dict(vars(self._stats), queued=len(self._queue)))
+
+    def shutdown(self) -> None:
+        for job in list(self._queue):
+            self._cancel_queued(job)
+        self._executor.shutdown(wait=False, cancel_futures=True)
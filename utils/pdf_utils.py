@@ -0,0 +1,129 @@
+"""Helpers for opening PDFs from paths, in-memory buffers and uploaded files."""
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+from config import PDF_SPILL_THRESHOLD_BYTES
+
+PdfSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Read-only, seekable stream over a buffer without copying it up front.
+    Only the slices pdfminer actually reads are materialised.
+    """
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview]):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        self._pos = max(self._pos, 0)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, target) -> int:
+        data = self.read(len(target))
+        target[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def _stream_size(stream: BinaryIO) -> int:
+    position = stream.tell()
+    size = stream.seek(0, io.SEEK_END)
+    stream.seek(position)
+    return size
+
+
+@contextmanager
+def _spill_to_mmap(write_to) -> Iterator[mmap.mmap]:
+    """Write content to an anonymous temp file and map it read-only."""
+    with tempfile.TemporaryFile() as tmp:
+        write_to(tmp)
+        tmp.flush()
+        if tmp.tell() == 0:
+            raise ValueError("PDF is empty")
+        mapped = mmap.mmap(tmp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+@contextmanager
+def open_pdf_stream(
+    source: PdfSource,
+    spill_threshold: int = PDF_SPILL_THRESHOLD_BYTES
+) -> Iterator[BinaryIO]:
+    """
+    Yield a seekable binary stream for a PDF given as a path, bytes-like object
+    or file-like object (e.g. a Streamlit UploadedFile).
+    In-memory buffers up to spill_threshold are read in place; larger ones, and
+    file-like objects that can't be read in place, are spilled to a memory-mapped
+    temp file so the caller can drop its copy.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield f
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        if len(source) <= spill_threshold:
+            with BufferReader(source) as reader:
+                yield reader
+        else:
+            with _spill_to_mmap(lambda tmp: tmp.write(source)) as mapped:
+                yield mapped
+        return
+
+    if isinstance(source, io.BytesIO):
+        # Streamlit's UploadedFile is a BytesIO; getvalue() hands back the
+        # underlying bytes without a copy while the buffer is unmodified
+        with open_pdf_stream(source.getvalue(), spill_threshold) as stream:
+            yield stream
+        return
+
+    if source.seekable() and _stream_size(source) <= spill_threshold:
+        source.seek(0)
+        yield source
+        return
+
+    if source.seekable():
+        source.seek(0)
+    with _spill_to_mmap(lambda tmp: shutil.copyfileobj(source, tmp, _COPY_CHUNK_SIZE)) as mapped:
+        yield mapped
@@ -0,0 +1,156 @@
+"""
+Pre-aggregated pipeline totals: submission count and TIV per
+(week, agency, region, status) cell, stored beside the submission history.
+"""
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+CUBE_DIMENSIONS = ("week", "agency", "region", "status")
+CUBE_MEASURES = ("submissions", "tiv")
+
+# Matches get_region_for_county's fallback, so cube cells line up with pipeline rows
+UNKNOWN_REGION = "Unknown Region"
+
+# Every combination of dimensions (2^4 "grains") is kept as its own set of cells,
+# with dimensions outside the grain stored as "". A query reads the one grain
+# covering its group-by and filter dimensions, so it touches roughly as many cells
+# as it returns groups instead of re-aggregating the finest cells.
+GRAINS = range(1 << len(CUBE_DIMENSIONS))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipeline_cube (
+    grain INTEGER NOT NULL,
+    week TEXT NOT NULL,
+    agency TEXT NOT NULL,
+    region TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submissions INTEGER NOT NULL,
+    tiv REAL NOT NULL,
+    PRIMARY KEY (grain, week, agency, region, status)
+) WITHOUT ROWID;
+"""
+
+# Source expressions for each dimension when filling the cube from the submissions
+# table; the week is the Monday on or before created_at and must agree with week_start()
+_SOURCE_COLUMNS = {
+    "week": "date(created_at, '-6 days', 'weekday 1')",
+    "agency": "agency",
+    "region": "COALESCE(region, :unknown_region)",
+    "status": "status",
+}
+
+_UPSERT = """
+INSERT INTO pipeline_cube (grain, week, agency, region, status, submissions, tiv) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (grain, week, agency, region, status) DO UPDATE SET
+    submissions = submissions + excluded.submissions,
+    tiv = tiv + excluded.tiv
+"""
+
+
+def grain_of(dimensions: Iterable[str]) -> int:
+    """Bitmask of the grain holding exactly these dimensions"""
+    return sum(1 << CUBE_DIMENSIONS.index(dim) for dim in set(dimensions))
+
+
+def week_start(moment) -> date:
+    """The Monday of moment's week"""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    return day - timedelta(days=day.weekday())
+
+
+def create(conn: sqlite3.Connection) -> None:
+    """
+    Create the cube table. A cube created next to an existing history is filled
+    from it once; after that, cells only change through apply(). The check, the
+    create and the fill share one write transaction, so when several processes
+    open a fresh history together exactly one of them fills the cube.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pipeline_cube'"
+        ).fetchone()
+        if not exists:
+            conn.execute(_SCHEMA)
+            for grain in GRAINS:
+                columns = [
+                    _SOURCE_COLUMNS[dim] if grain >> i & 1 else "''" for i, dim in enumerate(CUBE_DIMENSIONS)
+                ]
+                conn.execute(
+                    "INSERT INTO pipeline_cube (grain, week, agency, region, status, submissions, tiv)"
+                    f" SELECT {grain}, {', '.join(columns)}, COUNT(*), COALESCE(SUM(tiv), 0)"
+                    " FROM submissions GROUP BY 2, 3, 4, 5",
+                    {"unknown_region": UNKNOWN_REGION}
+                )
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def apply(conn: sqlite3.Connection, records: Iterable) -> None:
+    """
+    Add a batch of history records to their cell in every grain. The batch is
+    summed in memory first, so each touched cell is upserted once. Call inside the
+    batch's transaction.
+    """
+    cells: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0.0])
+    for record in records:
+        values = (
+            week_start(record.created_at).isoformat(),
+            record.agency,
+            record.region or UNKNOWN_REGION,
+            record.status
+        )
+        tiv = record.tiv or 0.0
+        for grain in GRAINS:
+            cell = cells[(grain,) + tuple(value if grain >> i & 1 else "" for i, value in enumerate(values))]
+            cell[0] += 1
+            cell[1] += tiv
+    conn.executemany(_UPSERT, [key + (count, tiv) for key, (count, tiv) in cells.items()])
+
+
+def query(
+    conn: sqlite3.Connection,
+    group_by: Sequence[str],
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    agency: Optional[str] = None,
+    region: Optional[str] = None,
+    status: Optional[str] = None
+) -> List[Dict]:
+    """
+    Submission count and TIV summed over the cells matching the filters, one dict
+    per group. since/until bound the week start (inclusive/exclusive).
+    """
+    unknown = [dim for dim in group_by if dim not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown cube dimensions: {', '.join(unknown)}")
+
+    filters = {"agency": agency, "region": region, "status": status}
+    dimensions = set(group_by) | {dim for dim, value in filters.items() if value}
+    if since or until:
+        dimensions.add("week")
+
+    clauses, params = ["grain = ?"], [grain_of(dimensions)]
+    if since:
+        clauses.append("week >= ?")
+        params.append(week_start(since).isoformat())
+    if until:
+        clauses.append("week < ?")
+        params.append(until.isoformat())
+    for column, value in filters.items():
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    where = " AND ".join(clauses)
+    columns = ", ".join(group_by)
+    select = f"{columns}, " if group_by else ""
+    group = f"GROUP BY {columns} ORDER BY {columns}" if group_by else ""
+    rows = conn.execute(
+        f"SELECT {select}SUM(submissions), SUM(tiv) FROM pipeline_cube WHERE {where} {group}", params
+    ).fetchall()
+    names = list(group_by) + list(CUBE_MEASURES)
+    return [dict(zip(names, row)) for row in rows if row[-2] is not None]
@@ -0,0 +1,198 @@
+"""Bulk export of pipeline rows to TSV, CSV or XLSX with upsert semantics."""
+import csv
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from config import PIPELINE_COLUMNS, PIPELINE_KEY_COLUMNS
+
+_KEY_INDEXES = [PIPELINE_COLUMNS.index(col) for col in PIPELINE_KEY_COLUMNS]
+_WRITE_CHUNK_ROWS = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def row_key(row: Sequence[str]) -> Tuple[str, ...]:
+    """(effective date, insured, agency) identity of a pipeline row"""
+    return tuple(row[i] for i in _KEY_INDEXES)
+
+
+def row_hash(row: Sequence[str]) -> str:
+    return hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class ExportStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+class PipelineExporter:
+    """
+    Upserts pipeline rows into a spreadsheet file keyed by (effective date, insured, agency).
+
+        with PipelineExporter("exports/pipeline.tsv") as exporter:
+            exporter.upsert(rows)
+
+    A hash index of the existing file is built once when opened. New rows are appended
+    in buffered chunks, unchanged rows are skipped, and the file is only rewritten (once,
+    on close) when an existing row actually changed. The format follows the extension:
+    .tsv, .csv or .xlsx (XLSX needs openpyxl). Rows upserted before an exception in
+    the with block are still written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower().lstrip(".")
+        if self.format not in ("tsv", "csv", "xlsx"):
+            raise ValueError(f"Unsupported pipeline export format: {path}")
+        self.stats = ExportStats()
+        self._index: Dict[Tuple[str, ...], str] = {}
+        self._changed: Dict[Tuple[str, ...], List[str]] = {}
+        self._pending: List[List[str]] = []
+        self._workbook = None
+
+    def __enter__(self) -> "PipelineExporter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Keep the rows upserted before the error; the original exception still propagates
+        try:
+            self.close()
+        except Exception:
+            logger.exception(
+                f"Could not save {self.path} after an error: dropped {len(self._pending)} new"
+                f" and {len(self._changed)} changed pipeline rows"
+            )
+
+    # -- delimited text ---------------------------------------------------------
+
+    @property
+    def _delimiter(self) -> str:
+        return "\t" if self.format == "tsv" else ","
+
+    def _read_rows(self, path: str) -> Iterable[List[str]]:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f, delimiter=self._delimiter)
+            header = next(reader, None)
+            if header is not None and header != PIPELINE_COLUMNS:
+                raise ValueError(f"{path} does not have the pipeline column schema")
+            for row in reader:
+                yield row + [""] * (len(PIPELINE_COLUMNS) - len(row))
+
+    def _flush_pending(self) -> None:
+        if not self._pending:
+            return
+        if self.format == "xlsx":
+            sheet = self._workbook.active
+            for row in self._pending:
+                sheet.append(row)
+        else:
+            is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, delimiter=self._delimiter)
+                if is_new:
+                    writer.writerow(PIPELINE_COLUMNS)
+                writer.writerows(self._pending)
+        self._pending = []
+
+    def _rewrite_changed(self) -> None:
+        """Stream the file through a temp copy, substituting changed rows in place."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=f".{self.format}")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as out:
+                writer = csv.writer(out, delimiter=self._delimiter)
+                writer.writerow(PIPELINE_COLUMNS)
+                buffer = []
+                for row in self._read_rows(self.path):
+                    buffer.append(self._changed.get(row_key(row), row))
+                    if len(buffer) >= _WRITE_CHUNK_ROWS:
+                        writer.writerows(buffer)
+                        buffer = []
+                writer.writerows(buffer)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    # -- public API -------------------------------------------------------------
+
+    def open(self) -> None:
+        """Build the hash index of rows already in the file"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if self.format == "xlsx":
+            try:
+                import openpyxl
+            except ImportError:
+                raise ImportError("XLSX pipeline export requires openpyxl (pip install openpyxl)")
+            if os.path.exists(self.path):
+                self._workbook = openpyxl.load_workbook(self.path)
+                rows = self._workbook.active.iter_rows(values_only=True)
+                header = [str(v) for v in next(rows, ())]
+                if header and header != PIPELINE_COLUMNS:
+                    raise ValueError(f"{self.path} does not have the pipeline column schema")
+                for values in rows:
+                    row = ["" if v is None else str(v) for v in values]
+                    self._index[row_key(row)] = row_hash(row)
+            else:
+                self._workbook = openpyxl.Workbook()
+                self._workbook.active.append(PIPELINE_COLUMNS)
+        elif os.path.exists(self.path):
+            for row in self._read_rows(self.path):
+                self._index[row_key(row)] = row_hash(row)
+
+    def upsert(self, rows: Iterable[Sequence[str]]) -> ExportStats:
+        """Insert new rows, record changed rows and skip identical ones"""
+        for row in rows:
+            row = [str(value) for value in row]
+            if len(row) != len(PIPELINE_COLUMNS):
+                raise ValueError(f"Pipeline rows must have {len(PIPELINE_COLUMNS)} columns, got {len(row)}")
+            key, digest = row_key(row), row_hash(row)
+            existing = self._index.get(key)
+            if existing is None:
+                self._pending.append(row)
+                self.stats.inserted += 1
+            elif existing != digest:
+                self._changed[key] = row
+                self.stats.updated += 1
+            else:
+                self.stats.unchanged += 1
+                continue
+            self._index[key] = digest
+            if len(self._pending) >= _WRITE_CHUNK_ROWS:
+                self._flush_pending()
+        return self.stats
+
+    def close(self) -> ExportStats:
+        """Write remaining inserts and apply any changed rows"""
+        self._flush_pending()
+        if self.format == "xlsx":
+            if self._changed:
+                sheet = self._workbook.active
+                for cells in sheet.iter_rows(min_row=2):
+                    row = ["" if c.value is None else str(c.value) for c in cells]
+                    replacement = self._changed.get(row_key(row))
+                    if replacement is not None:
+                        for cell, value in zip(cells, replacement):
+                            cell.value = value
+            self._workbook.save(self.path)
+        elif self._changed:
+            self._rewrite_changed()
+        self._changed = {}
+        return self.stats
+
+
+def export_pipeline_rows(path: str, rows: Iterable[Sequence[str]]) -> ExportStats:
+    """Upsert pipeline rows into the spreadsheet at path"""
+    with PipelineExporter(path) as exporter:
+        exporter.upsert(rows)
+    return exporter.stats
@@ -1,19 +1,17 @@
-def get_missing_premiums_text(received_additional_docs: dict) -> str:
+from typing import Optional
+
+from utils.doc_catalog import CATALOG, DocumentChecklist
+
+# (short name, catalog bit) of each premium, in the order the text lists them
+_PREMIUMS = tuple((name, CATALOG.get(f"{name} Premium").bit) for name in ("Target", "Renewal", "Expiring"))
+
+
+def get_missing_premiums_text(checklist: DocumentChecklist) -> Optional[str]:
     """
     Generate text for missing premiums based on which ones were received
     """
-    target_received = any("Target Premium" in doc and received for doc, received in received_additional_docs.items())
-    renewal_received = any("Renewal Premium" in doc and received for doc, received in received_additional_docs.items())
-    expiring_received = any("Expiring Premium" in doc and received for doc, received in received_additional_docs.items())
-    
-    missing_premiums = []
-    if not target_received:
-        missing_premiums.append("Target")
-    if not renewal_received:
-        missing_premiums.append("Renewal")
-    if not expiring_received:
-        missing_premiums.append("Expiring")
-    
+    missing_premiums = [name for name, bit in _PREMIUMS if not checklist.received & bit]
+
     if not missing_premiums:
         return None  # All premiums received
         
@@ -22,4 +20,4 @@ def get_missing_premiums_text(received_additional_docs: dict) -> str:
     elif len(missing_premiums) == 2:
         return f"• {missing_premiums[0]} and {missing_premiums[1]} Premiums"
     else:
-        return f"• Target, Renewal and Expiring Premiums"
\ No newline at end of file
+        return f"• Target, Renewal and Expiring Premiums"
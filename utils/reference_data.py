@@ -0,0 +1,120 @@
+"""
+Frozen, integer-coded lookup tables for agencies, counties, regions, construction
+types and submission statuses, built once from config.py at import time.
+"""
+import re
+import sys
+from types import MappingProxyType
+from typing import Iterable, List, Optional, Sequence
+
+from config import (
+    AGENCIES, COUNTIES, CONSTRUCTION_TYPES, REGION_COUNTY_MAPPING, SUBMISSION_STATUSES
+)
+
+UNKNOWN_CODE = -1
+
+_DASHES = re.compile(r"\s*[\u2010-\u2015\u2212-]\s*")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_alias(name: str) -> str:
+    """Case, dash and spacing-insensitive form: "Acentria – Destin" -> "acentria-destin" """
+    name = _DASHES.sub("-", name.casefold().replace(".", ""))
+    return _SPACES.sub(" ", name).strip()
+
+
+class ReferenceTable:
+    """
+    An ordered set of canonical names, each identified by its position.
+    Names are interned and every lookup is a dict hit: exact name first, then the
+    normalized alias, so en-dash/hyphen and case variants resolve to the same code.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.names = tuple(sys.intern(name) for name in names)
+        self.ids = MappingProxyType({name: code for code, name in enumerate(self.names)})
+        self.aliases = MappingProxyType({normalize_alias(name): code for code, name in enumerate(self.names)})
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return self.code(name) != UNKNOWN_CODE
+
+    def code(self, name: Optional[str]) -> int:
+        """Integer code for name, or UNKNOWN_CODE"""
+        if name is None:
+            return UNKNOWN_CODE
+        code = self.ids.get(name)
+        if code is None:
+            code = self.aliases.get(normalize_alias(name), UNKNOWN_CODE)
+        return code
+
+    def codes(self, names: Iterable[Optional[str]]) -> List[int]:
+        return [self.code(name) for name in names]
+
+    def name(self, code: int) -> Optional[str]:
+        return self.names[code] if 0 <= code < len(self.names) else None
+
+    def canonical(self, name: Optional[str]) -> Optional[str]:
+        """The canonical spelling of name, or None if it is not in the table"""
+        return self.name(self.code(name))
+
+    def index_of(self, name: Optional[str], default: int = 0) -> int:
+        """Position of name for a selectbox index, or default"""
+        code = self.code(name)
+        return default if code == UNKNOWN_CODE else code
+
+    def categorical(self, values):
+        """pandas.Categorical of values over this table; unknown values become NaN"""
+        import pandas as pd
+
+        values = pd.Series(values)
+        # Codes are computed once per distinct value rather than once per row
+        uniques = values.dropna().unique()
+        lookup = {value: self.code(str(value)) for value in uniques}
+        codes = values.map(lookup).fillna(UNKNOWN_CODE).astype("int16")
+        return pd.Categorical.from_codes(codes, categories=list(self.names))
+
+
+AGENCY_TABLE = ReferenceTable(AGENCIES)
+COUNTY_TABLE = ReferenceTable(COUNTIES)
+REGION_TABLE = ReferenceTable(list(REGION_COUNTY_MAPPING))
+CONSTRUCTION_TABLE = ReferenceTable(CONSTRUCTION_TYPES)
+STATUS_TABLE = ReferenceTable(SUBMISSION_STATUSES)
+
+# County code -> region code
+COUNTY_REGION_CODES = tuple(
+    next(
+        (REGION_TABLE.code(region) for region, counties in REGION_COUNTY_MAPPING.items() if county in counties),
+        UNKNOWN_CODE
+    )
+    for county in COUNTY_TABLE.names
+)
+
+
+def region_for_county(county: Optional[str]) -> Optional[str]:
+    """Region of a county, accepting alias spellings; None if unknown"""
+    code = COUNTY_TABLE.code(county)
+    return None if code == UNKNOWN_CODE else REGION_TABLE.name(COUNTY_REGION_CODES[code])
+
+
+def encode_frame(df):
+    """
+    Copy of a submissions DataFrame with agency, county and construction_type as
+    categoricals over the reference tables, plus a categorical region column.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = df.copy()
+    for column, table in (("agency", AGENCY_TABLE), ("county", COUNTY_TABLE),
+                          ("construction_type", CONSTRUCTION_TABLE)):
+        if column in df.columns:
+            df[column] = table.categorical(df[column].to_numpy())
+    if "county" in df.columns:
+        # Unknown counties have code -1, which picks the trailing UNKNOWN_CODE entry
+        lookup = np.asarray(COUNTY_REGION_CODES + (UNKNOWN_CODE,), dtype="int16")
+        region_codes = lookup[df["county"].cat.codes.to_numpy()]
+        df["region"] = pd.Categorical.from_codes(region_codes, categories=list(REGION_TABLE.names))
+    return df
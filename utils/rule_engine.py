@@ -0,0 +1,291 @@
+"""
+Declarative underwriting rule table and the compiled evaluator shared by the UI,
+the decline email generator and the bulk clearance path.
+"""
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config import (
+    MIN_TIV, MAX_TIV, MAX_GARDEN_STYLE_TIV, MAX_GARDEN_STYLE_STORIES,
+    MAX_FRAME_STORIES, MAX_EFFECTIVE_DATE_DAYS, MAX_BUILDING_AGE, MAX_ROOF_AGE,
+    DECLINE_REASONS
+)
+from utils.reference_data import AGENCY_TABLE, CONSTRUCTION_TABLE
+
+FACT_COLUMNS = [
+    "agency", "construction_type", "stories", "effective_date",
+    "tiv", "year_built", "roof_replacement"
+]
+
+
+def _millions(value: float) -> str:
+    return f"${value / 1_000_000:g}M"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A single decline rule.
+    check receives the submission facts and must only use operators (no and/or/if),
+    so the same predicate works on scalars and on pandas columns.
+    Rules sharing a group are mutually exclusive: the first one that fires wins.
+    Supplemental rules are only reported alongside a non-supplemental reason.
+    """
+    name: str
+    reason: str
+    check: Callable[[Any], Any]
+    group: Optional[str] = None
+    supplemental: bool = False
+
+
+def build_rules() -> List[Rule]:
+    """Build the rule table from the config.py thresholds, in reporting order"""
+    return [
+        Rule(
+            "agency_not_appointed",
+            "Agency Not Appointed",
+            lambda f: f.agency == "Unknown"
+        ),
+        Rule(
+            "frame_stories",
+            f"Frame > {MAX_FRAME_STORIES} stories: The subject property includes predominantly"
+            f" frame building(s) > {MAX_FRAME_STORIES} stories.",
+            lambda f: (f.construction_type == "Frame") & (f.stories > MAX_FRAME_STORIES)
+        ),
+        Rule(
+            "effective_date",
+            f"Effective Date: Requested effective date is > {MAX_EFFECTIVE_DATE_DAYS} days past"
+            " the submission date; account cannot be reserved at this time.",
+            lambda f: f.days_until_effective > MAX_EFFECTIVE_DATE_DAYS
+        ),
+        # TIV limits in the order step 1 has always checked them: a garden style
+        # risk over both limits is declined with the garden style reason
+        Rule(
+            "min_tiv",
+            f"TIV < {_millions(MIN_TIV)}: TIV is less than ${MIN_TIV:,}",
+            lambda f: f.tiv < MIN_TIV,
+            group="tiv"
+        ),
+        Rule(
+            "garden_style_tiv",
+            f"Garden Style TIV > {_millions(MAX_GARDEN_STYLE_TIV)}: Per premises TIV exceeds"
+            f" {_millions(MAX_GARDEN_STYLE_TIV)}. We are generally looking for"
+            f" {_millions(MIN_TIV)}-{_millions(MAX_GARDEN_STYLE_TIV)} TIVs for garden style risks"
+            f" (1-{MAX_GARDEN_STYLE_STORIES} stories).",
+            lambda f: (f.stories <= MAX_GARDEN_STYLE_STORIES) & (f.tiv > MAX_GARDEN_STYLE_TIV),
+            group="tiv"
+        ),
+        Rule(
+            "max_tiv",
+            f"TIV > {_millions(MAX_TIV)}: Per premises TIV exceeds {_millions(MAX_TIV)}",
+            lambda f: f.tiv > MAX_TIV,
+            group="tiv"
+        ),
+        Rule(
+            "regional_capacity",
+            DECLINE_REASONS["Regional Capacity"],
+            lambda f: f.over_capacity
+        ),
+        Rule(
+            "building_age",
+            DECLINE_REASONS["Building Age"],
+            lambda f: f.building_age > MAX_BUILDING_AGE,
+            supplemental=True
+        ),
+        Rule(
+            "roof_age",
+            DECLINE_REASONS["Roof Age"],
+            lambda f: f.roof_age > MAX_ROOF_AGE,
+            supplemental=True
+        ),
+    ]
+
+
+@dataclass
+class RuleCounter:
+    calls: int = 0
+    hits: int = 0
+    nanoseconds: int = 0
+
+
+class _Facts:
+    """
+    Derived facts for one submission, computed once per evaluation. Agency and
+    construction type are canonicalized like encode_frame does for the bulk path,
+    so alias spellings (e.g. "frame", hyphen vs en dash) match the rule constants.
+    """
+    __slots__ = (
+        "agency", "construction_type", "stories", "tiv",
+        "days_until_effective", "building_age", "roof_age", "over_capacity"
+    )
+
+    def __init__(self, agency, construction_type, stories, tiv, effective_date,
+                 year_built, roof_replacement, today: date, region=None, capacity=None):
+        if isinstance(effective_date, datetime):
+            effective_date = effective_date.date()
+        if agency not in AGENCY_TABLE.ids:
+            agency = AGENCY_TABLE.canonical(agency) or agency
+        if construction_type not in CONSTRUCTION_TABLE.ids:
+            construction_type = CONSTRUCTION_TABLE.canonical(construction_type) or construction_type
+        self.agency = agency
+        self.construction_type = construction_type
+        self.stories = stories
+        self.tiv = tiv
+        self.days_until_effective = (effective_date - today).days
+        self.building_age = today.year - year_built
+        self.roof_age = today.year - roof_replacement
+        self.over_capacity = capacity is not None and capacity.exceeded(region, tiv)
+
+
+class RuleEngine:
+    """
+    Compiled evaluator over a rule table.
+    Grouped rules short-circuit after the first hit, and supplemental rules are
+    skipped entirely unless a hard rule fired. Per-rule call/hit counters are always
+    kept; per-rule timing is recorded while timing is True.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = tuple(rules)
+        self.timing = False
+        self.counters: Dict[str, RuleCounter] = {rule.name: RuleCounter() for rule in self.rules}
+        self._hard_steps = self._compile([r for r in self.rules if not r.supplemental])
+        self._supplemental_steps = self._compile([r for r in self.rules if r.supplemental])
+
+    def _compile(self, rules: List[Rule]) -> List[tuple]:
+        """Collapse consecutive rules into steps; a grouped step is a chain of alternatives"""
+        steps = []
+        for rule in rules:
+            entry = (rule.check, rule.reason, self.counters[rule.name])
+            if rule.group is not None and steps and steps[-1][0] == rule.group:
+                steps[-1][1].append(entry)
+            else:
+                steps.append((rule.group, [entry]))
+        return [tuple(entries) for _, entries in steps]
+
+    def _run(self, steps: List[tuple], facts: _Facts, reasons: List[str]) -> None:
+        timing = self.timing
+        for alternatives in steps:
+            for check, reason, counter in alternatives:
+                counter.calls += 1
+                if timing:
+                    start = time.perf_counter_ns()
+                    hit = check(facts)
+                    counter.nanoseconds += time.perf_counter_ns() - start
+                else:
+                    hit = check(facts)
+                if hit:
+                    counter.hits += 1
+                    reasons.append(reason)
+                    break
+
+    def evaluate(
+        self,
+        agency: str,
+        construction_type: str,
+        stories: int,
+        tiv: float,
+        effective_date: date,
+        year_built: int,
+        roof_replacement: int,
+        today: Optional[date] = None,
+        region: Optional[str] = None,
+        capacity=None
+    ) -> List[str]:
+        """
+        Return the decline reasons for one submission, in rule table order.
+        Regional capacity is only checked when a CapacityTracker and region are given.
+        """
+        facts = _Facts(
+            agency, construction_type, stories, tiv, effective_date,
+            year_built, roof_replacement, today or datetime.today().date(),
+            region, capacity
+        )
+        reasons: List[str] = []
+        self._run(self._hard_steps, facts, reasons)
+        if reasons:
+            self._run(self._supplemental_steps, facts, reasons)
+        return reasons
+
+    def evaluate_frame(self, df, today: Optional[date] = None, capacity=None):
+        """
+        Evaluate every rule as a column operation over a pandas DataFrame.
+        Returns a boolean DataFrame with one column per rule, aligned to df.
+        Regional capacity is checked per row against capacity's current totals when
+        a CapacityTracker is given and df has a region column.
+        """
+        import pandas as pd
+
+        missing = [col for col in FACT_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+        today = today or datetime.today().date()
+        stories = df["stories"].astype(int)
+        tiv = df["tiv"].astype(float)
+        over_capacity = False
+        if capacity is not None and "region" in df.columns:
+            over_capacity = capacity.exceeded_frame(df["region"], tiv)
+        facts = SimpleNamespace(
+            agency=df["agency"],
+            construction_type=df["construction_type"],
+            stories=stories,
+            tiv=tiv,
+            days_until_effective=(pd.to_datetime(df["effective_date"]) - pd.Timestamp(today)).dt.days,
+            building_age=today.year - df["year_built"].astype(int),
+            roof_age=today.year - df["roof_replacement"].astype(int),
+            over_capacity=over_capacity,
+        )
+
+        matrix = self.check_columns(facts, df.index)
+        hard = [r.name for r in self.rules if not r.supplemental]
+        supplemental = [r.name for r in self.rules if r.supplemental]
+        if supplemental:
+            matrix[supplemental] = matrix[supplemental].mul(matrix[hard].any(axis=1), axis=0)
+        return matrix
+
+    def check_columns(self, facts, index, names: Optional[Sequence[str]] = None):
+        """
+        Boolean DataFrame of the named rules (default: all) over column facts, with
+        grouped rules kept mutually exclusive. Supplemental rules are not gated here.
+        """
+        import pandas as pd
+
+        columns = {}
+        taken = {}
+        for rule in self.rules:
+            if names is not None and rule.name not in names:
+                continue
+            hit = pd.Series(rule.check(facts), index=index).astype(bool)
+            if rule.group is not None:
+                previous = taken.get(rule.group)
+                if previous is not None:
+                    hit &= ~previous
+                    taken[rule.group] = previous | hit
+                else:
+                    taken[rule.group] = hit
+            columns[rule.name] = hit
+        return pd.DataFrame(columns, index=index)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-rule call/hit counts and cumulative seconds"""
+        return {
+            name: {
+                "calls": counter.calls,
+                "hits": counter.hits,
+                "seconds": counter.nanoseconds / 1e9
+            }
+            for name, counter in self.counters.items()
+        }
+
+    def reset_stats(self) -> None:
+        for counter in self.counters.values():
+            counter.calls = counter.hits = counter.nanoseconds = 0
+
+
+# Compiled once at import; every caller shares this evaluator
+ENGINE = RuleEngine(build_rules())
+REASONS = {rule.name: rule.reason for rule in ENGINE.rules}
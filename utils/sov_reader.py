@@ -0,0 +1,326 @@
+"""
+Streaming statement of values (SOV) reader for CSV and XLSX, with the
+underwriting rules checked per location.
+"""
+import csv
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from config import SOV_CHUNK_ROWS, SOV_MIN_VALUE_PER_SQFT, CONSTRUCTION_TYPES
+from utils.reference_data import CONSTRUCTION_TABLE, UNKNOWN_CODE, normalize_alias
+from utils.rule_engine import ENGINE, REASONS
+
+# Canonical column -> accepted headers, most specific first
+SOV_COLUMNS = {
+    "location": ["location", "location number", "loc", "loc no", "loc #", "bldg", "bldg #", "building", "building number"],
+    "address": ["address", "street address", "location address", "street"],
+    "tiv": ["tiv", "total insured value", "total insurable value", "total tiv", "total value",
+            "insured value", "building value", "building limit", "replacement cost"],
+    "year_built": ["year built", "yr built", "year of construction", "built"],
+    "stories": ["stories", "# stories", "# of stories", "no of stories", "number of stories", "floors"],
+    "construction_type": ["construction", "construction type", "const type", "const", "iso construction"],
+    "square_feet": ["square feet", "square footage", "sq ft", "sqft", "total sq ft", "total square feet", "area"],
+    "roof_replacement": ["roof year", "roof replaced", "roof replacement", "roof replacement year", "year roof replaced"],
+}
+NUMERIC_COLUMNS = ("tiv", "year_built", "stories", "square_feet", "roof_replacement")
+
+# SOV spellings of construction classes, including ISO class numbers
+CONSTRUCTION_ALIASES = {
+    "wood frame": "Frame", "joisted masonry": "JM", "non-combustible": "NC", "noncombustible": "NC",
+    "masonry non-combustible": "MNC", "masonry noncombustible": "MNC", "modified fire resistive": "MFR",
+    "fire resistive": "FR", "fire-resistive": "FR", "superior": "FR",
+    **{str(iso_class): name for iso_class, name in enumerate(CONSTRUCTION_TYPES, start=1)},
+}
+
+# Rule engine rules that apply to a single building. The TIV minimum is a premises
+# total, so it is checked against the SOV total instead of each location.
+LOCATION_RULES = ("max_tiv", "garden_style_tiv", "frame_stories", "building_age", "roof_age")
+PREMISES_RULES = ("min_tiv", "max_tiv", "garden_style_tiv")
+VALUE_PER_SQFT = "value_per_sqft"
+
+EXCEPTION_COLUMNS = ["Row", "Location", "Check", "Detail"]
+
+_HEADER_SCAN_ROWS = 20
+_HEADER_SCAN_BYTES = 64 * 1024
+_NON_NUMERIC = re.compile(r"[$,\s]")
+# Location or address cells of the summary row agent SOVs often end with
+_TOTAL_LABEL = re.compile(r"^\s*(grand\s+)?(sub)?totals?\b", re.IGNORECASE)
+# Excel's plain "CSV" export is Windows-1252; "CSV UTF-8" and most tools write UTF-8
+_FALLBACK_ENCODING = "cp1252"
+_ALIAS_LOOKUP = {
+    normalize_alias(alias): column for column, aliases in SOV_COLUMNS.items() for alias in aliases
+}
+_ALIAS_RANK = {
+    normalize_alias(alias): rank for aliases in SOV_COLUMNS.values() for rank, alias in enumerate(aliases)
+}
+
+
+def check_label(name: str) -> str:
+    """Short label of a check for the exceptions table: "TIV > $100M", "Roof Age", ..."""
+    if name == VALUE_PER_SQFT:
+        return f"Value < ${SOV_MIN_VALUE_PER_SQFT}/sf"
+    return REASONS[name].split(":")[0]
+
+
+@dataclass
+class SovReport:
+    """Totals and per-location exceptions of one SOV"""
+    locations: int = 0
+    total_tiv: float = 0.0
+    max_stories: int = 0
+    missing_tiv: int = 0
+    columns: Dict[str, str] = field(default_factory=dict)
+    premises_reasons: List[str] = field(default_factory=list)
+    exceptions: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=EXCEPTION_COLUMNS))
+
+    @property
+    def missing_columns(self) -> List[str]:
+        return [column for column in NUMERIC_COLUMNS if column not in self.columns]
+
+
+def header_map(headers) -> Dict[int, str]:
+    """Column position -> canonical column for recognized headers; the best alias wins per column"""
+    best: Dict[str, tuple] = {}
+    for position, header in enumerate(headers):
+        if header is None:
+            continue
+        key = normalize_alias(str(header))
+        column = _ALIAS_LOOKUP.get(key)
+        if column is not None and (column not in best or _ALIAS_RANK[key] < best[column][0]):
+            best[column] = (_ALIAS_RANK[key], position)
+    return {position: column for column, (_, position) in best.items()}
+
+
+def _find_header(rows) -> Optional[int]:
+    """Index of the first row that names a TIV column and at least one other known column"""
+    for index, row in enumerate(rows):
+        mapping = header_map(row)
+        if "tiv" in mapping.values() and len(mapping) >= 2:
+            return index
+    return None
+
+
+def _format(source, filename: Optional[str]) -> str:
+    name = filename or getattr(source, "name", None) or (source if isinstance(source, str) else "")
+    extension = os.path.splitext(str(name))[1].lower()
+    if extension not in (".csv", ".xlsx"):
+        raise ValueError(f"Unsupported SOV format {extension or '(none)'}; expected .csv or .xlsx")
+    return extension[1:]
+
+
+def _headers(header_row, mapping: Dict[int, str]) -> Dict[str, str]:
+    """Canonical column -> the SOV's own header text"""
+    return {column: str(header_row[position]).strip() for position, column in mapping.items()}
+
+
+def _csv_chunks(source, chunk_rows: int, encoding: str = "utf-8-sig") -> Iterator[tuple]:
+    # Title rows above the header usually have fewer fields, so the header is found
+    # with the csv module on the first few lines rather than with pandas
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            head = f.read(_HEADER_SCAN_BYTES)
+    else:
+        source.seek(0)
+        head = source.read(_HEADER_SCAN_BYTES)
+        source.seek(0)
+    lines = head.decode(encoding, errors="replace").splitlines()[:_HEADER_SCAN_ROWS]
+    preview = list(csv.reader(lines))
+    header_row = _find_header(preview)
+    if header_row is None:
+        raise ValueError("No SOV header row with a TIV column was found")
+    mapping = header_map(preview[header_row])
+    headers = _headers(preview[header_row], mapping)
+
+    reader = pd.read_csv(
+        source, header=None, skiprows=header_row + 1, usecols=sorted(mapping), dtype=str,
+        chunksize=chunk_rows, skip_blank_lines=False, encoding=encoding,
+        # The fallback encoding is the last resort, so undefined bytes become U+FFFD
+        encoding_errors="strict" if encoding != _FALLBACK_ENCODING else "replace"
+    )
+    first_row = header_row + 2
+    for chunk in reader:
+        yield first_row, chunk.rename(columns=mapping), headers
+        first_row += len(chunk)
+
+
+def _xlsx_chunks(source, chunk_rows: int) -> Iterator[tuple]:
+    from openpyxl import load_workbook
+
+    # read_only streams rows from the sheet XML instead of building the whole workbook
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        preview = list(islice(rows, _HEADER_SCAN_ROWS))
+        header_row = _find_header(preview)
+        if header_row is None:
+            raise ValueError("No SOV header row with a TIV column was found")
+        mapping = header_map(preview[header_row])
+        headers = _headers(preview[header_row], mapping)
+        positions = sorted(mapping)
+        columns = [mapping[position] for position in positions]
+        pending = iter(preview[header_row + 1:])
+        first_row = header_row + 2
+        while True:
+            batch = list(islice(pending, chunk_rows)) or list(islice(rows, chunk_rows))
+            if not batch:
+                break
+            data = [[row[p] if p < len(row) else None for p in positions] for row in batch]
+            yield first_row, pd.DataFrame(data, columns=columns), headers
+            first_row += len(batch)
+    finally:
+        workbook.close()
+
+
+def _numbers(values: pd.Series) -> pd.Series:
+    if not pd.api.types.is_numeric_dtype(values):
+        values = values.astype(str).str.replace(_NON_NUMERIC, "", regex=True)
+    return pd.to_numeric(values, errors="coerce")
+
+
+def _construction(values: pd.Series) -> pd.Categorical:
+    """Construction classes as CONSTRUCTION_TABLE categoricals, resolving SOV spellings per distinct value"""
+    lookup = {}
+    for value in values.dropna().unique():
+        text = str(value).strip()
+        if text.endswith(".0"):
+            text = text[:-2]
+        name = CONSTRUCTION_TABLE.canonical(text)
+        if name is None:
+            name = CONSTRUCTION_ALIASES.get(normalize_alias(text))
+        lookup[value] = CONSTRUCTION_TABLE.code(name)
+    codes = values.map(lookup).fillna(UNKNOWN_CODE).astype("int16")
+    return pd.Categorical.from_codes(codes, categories=list(CONSTRUCTION_TABLE.names))
+
+
+def _total_rows(chunk: pd.DataFrame) -> pd.Series:
+    """Rows whose location or address cell is a total label such as "Total" or "Grand Total" """
+    labelled = pd.Series(False, index=chunk.index)
+    for column in ("location", "address"):
+        if column in chunk:
+            labelled |= chunk[column].astype(str).str.match(_TOTAL_LABEL)
+    return labelled
+
+
+def normalize_chunk(chunk: pd.DataFrame, first_row: int) -> pd.DataFrame:
+    """
+    Typed columns for one chunk of raw SOV rows, indexed by file row number;
+    blank rows and labelled total rows are dropped
+    """
+    chunk = chunk.set_axis(pd.RangeIndex(first_row, first_row + len(chunk))).dropna(how="all")
+    chunk = chunk[~_total_rows(chunk)]
+    out = pd.DataFrame(index=chunk.index)
+    out["row"] = chunk.index
+    for column in NUMERIC_COLUMNS:
+        out[column] = _numbers(chunk[column]) if column in chunk else float("nan")
+    construction = chunk["construction_type"] if "construction_type" in chunk else pd.Series(None, index=chunk.index)
+    out["construction_type"] = _construction(construction)
+    location = chunk["location"] if "location" in chunk else pd.Series(None, index=chunk.index, dtype=object)
+    out["location"] = location.astype(object).where(location.notna(), out["row"].astype(str))
+    return out
+
+
+def _whole(values: pd.Series) -> pd.Series:
+    return values.map("{:,.0f}".format)
+
+
+# Exception detail text per check, built only for the locations that hit it
+_DETAILS = {
+    "max_tiv": lambda hits, _: "TIV $" + _whole(hits["tiv"]),
+    "garden_style_tiv": lambda hits, _: "TIV $" + _whole(hits["tiv"]) + ", " + _whole(hits["stories"]) + " stories",
+    "frame_stories": lambda hits, _: "Frame, " + _whole(hits["stories"]) + " stories",
+    "building_age": lambda hits, _: "Built " + hits["year_built"].map("{:.0f}".format),
+    "roof_age": lambda hits, _: "Roof replaced " + hits["roof_replacement"].map("{:.0f}".format),
+    VALUE_PER_SQFT: lambda hits, value: "$" + _whole(value) + "/sf",
+}
+
+
+def location_exceptions(locations: pd.DataFrame, today: date) -> pd.DataFrame:
+    """Exceptions table (EXCEPTION_COLUMNS) for a normalized chunk of locations"""
+    tiv = locations["tiv"]
+    facts = SimpleNamespace(
+        construction_type=locations["construction_type"],
+        stories=locations["stories"],
+        tiv=tiv,
+        building_age=today.year - locations["year_built"],
+        roof_age=today.year - locations["roof_replacement"],
+    )
+    matrix = ENGINE.check_columns(facts, locations.index, LOCATION_RULES)
+    value_per_sqft = tiv / locations["square_feet"].where(locations["square_feet"] > 0)
+    matrix[VALUE_PER_SQFT] = value_per_sqft < SOV_MIN_VALUE_PER_SQFT
+
+    frames = []
+    for name in matrix.columns:
+        hit = matrix[name].to_numpy()
+        if hit.any():
+            hits = locations[hit]
+            frames.append(pd.DataFrame({
+                "Row": hits["row"],
+                "Location": hits["location"],
+                "Check": check_label(name),
+                "Detail": _DETAILS[name](hits, value_per_sqft[hit]),
+            }))
+    if not frames:
+        return pd.DataFrame(columns=EXCEPTION_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _unlabelled_totals(locations: pd.DataFrame, counted: int, running_tiv: float) -> pd.Series:
+    """
+    Summary rows without a total label: no year built, and a TIV equal to the sum
+    of the two or more locations above it
+    """
+    tiv = locations["tiv"]
+    above = running_tiv + tiv.fillna(0).cumsum().shift(fill_value=0)
+    count_above = counted + pd.Series(range(len(locations)), index=locations.index)
+    return (tiv - above).abs().lt(0.5) & locations["year_built"].isna() & count_above.ge(2)
+
+
+def review_sov(source, filename: Optional[str] = None, today: Optional[date] = None,
+               chunk_rows: int = SOV_CHUNK_ROWS) -> SovReport:
+    """
+    Stream an SOV (path or file object) chunk by chunk, checking every location.
+    Only running totals and the exceptions are kept, so memory stays flat as the
+    number of locations grows.
+    """
+    today = today or datetime.today().date()
+    if _format(source, filename) == "xlsx":
+        return _review(_xlsx_chunks(source, chunk_rows), today)
+    try:
+        return _review(_csv_chunks(source, chunk_rows), today)
+    except UnicodeDecodeError:
+        return _review(_csv_chunks(source, chunk_rows, encoding=_FALLBACK_ENCODING), today)
+
+
+def _review(chunks, today: date) -> SovReport:
+    report = SovReport()
+    exceptions = []
+    for first_row, raw, headers in chunks:
+        report.columns = headers
+        locations = normalize_chunk(raw, first_row)
+        locations = locations[~_unlabelled_totals(locations, report.locations, report.total_tiv)]
+        report.locations += len(locations)
+        report.missing_tiv += int(locations["tiv"].isna().sum())
+        report.total_tiv += float(locations["tiv"].sum())
+        stories = locations["stories"].max()
+        if pd.notna(stories):
+            report.max_stories = max(report.max_stories, int(stories))
+        found = location_exceptions(locations, today)
+        if len(found):
+            exceptions.append(found)
+
+    if exceptions:
+        report.exceptions = pd.concat(exceptions, ignore_index=True)
+    # The TIV rules share a group, so at most one applies to the premises total
+    premises = SimpleNamespace(tiv=report.total_tiv, stories=report.max_stories)
+    report.premises_reasons = [
+        REASONS[rule.name] for rule in ENGINE.rules
+        if rule.name in PREMISES_RULES and bool(rule.check(premises))
+    ][:1]
+    return report
@@ -0,0 +1,177 @@
+"""
+Lightweight span tracing for Streamlit reruns and the clearance hot paths.
+
+Enabled with CLEARANCE_TRACE=1. When disabled, traced() returns the function
+unchanged and span() returns a shared no-op context, so instrumentation costs
+nothing but a flag check. When enabled, spans nest per thread (each Streamlit
+session runs its script on its own thread); a rerun's spans are buffered and
+appended to TRACE_PATH as JSON lines in one write when the rerun ends.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import TRACE_ENABLED, TRACE_PATH
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: int
+    parent_id: Optional[int]
+    depth: int
+    start: float
+    duration_ms: float = 0.0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def to_json(self) -> Dict[str, Any]:
+        data = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.start).isoformat(timespec="microseconds"),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+@dataclass
+class Trace:
+    """All spans recorded during one rerun (or one untraced top-level call)"""
+    trace_id: str
+    spans: List[Span] = field(default_factory=list)
+
+    @property
+    def root(self) -> Optional[Span]:
+        return self.spans[0] if self.spans else None
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms if self.root else 0.0
+
+
+class _NoopSpan:
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Writer:
+    """Appends JSON lines to the trace file; one write per finished trace"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, trace: Trace) -> None:
+        lines = "".join(json.dumps(span.to_json(), default=str) + "\n" for span in trace.spans)
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+class Tracer:
+    def __init__(self, enabled: bool = TRACE_ENABLED, path: str = TRACE_PATH):
+        self.enabled = enabled
+        self._writer = _Writer(path)
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, **attrs):
+        """Context manager timing a block; nests under the current span on this thread"""
+        if not self.enabled:
+            return _NOOP
+        return _ActiveSpan(self, name, attrs)
+
+    def traced(self, name: Optional[str] = None) -> Callable[[Callable], Callable]:
+        """Decorator form of span(); a no-op (returns func itself) when tracing is disabled"""
+        def decorator(func: Callable) -> Callable:
+            if not self.enabled:
+                return func
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with _ActiveSpan(self, span_name, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _open(self, name: str, attrs: Dict[str, Any]) -> Span:
+        stack = self._stack()
+        if stack:
+            parent = stack[-1]
+            trace = self._local.trace
+            span = Span(name, trace.trace_id, len(trace.spans), parent.span_id, parent.depth + 1, time.time(), attrs=attrs)
+        else:
+            trace = self._local.trace = Trace(os.urandom(8).hex())
+            span = Span(name, trace.trace_id, 0, None, 0, time.time(), attrs=attrs)
+        trace.spans.append(span)
+        stack.append(span)
+        return span
+
+    def _close(self, span: Span, elapsed: float, exc: Optional[BaseException]) -> None:
+        span.duration_ms = elapsed * 1000
+        if exc is not None:
+            span.error = type(exc).__name__
+        stack = self._stack()
+        stack.pop()
+        if not stack:
+            trace = self._local.trace
+            self._local.last_trace = trace
+            self._writer.write(trace)
+
+    def last_trace(self) -> Optional[Trace]:
+        """The most recently finished top-level trace on this thread"""
+        return getattr(self._local, "last_trace", None)
+
+
+class _ActiveSpan:
+    __slots__ = ("tracer", "name", "attrs", "span", "started")
+
+    def __init__(self, tracer: Tracer, name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> Span:
+        self.span = self.tracer._open(self.name, self.attrs)
+        self.started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.tracer._close(self.span, time.perf_counter() - self.started, exc)
+
+
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced